@@ -0,0 +1,4 @@
+"""Benchmarks for pyuntl. Run a benchmark as a module, for example:
+
+    python -m benchmarks.memory
+"""
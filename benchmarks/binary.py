@@ -0,0 +1,53 @@
+"""Compare the binary UNTL encoding with UNTL XML and JSON.
+
+    python -m benchmarks.binary [--records N]
+"""
+import argparse
+import json
+import sys
+import time
+from io import BytesIO
+
+from benchmarks.records import make_records
+from pyuntl.binary import untlbinary2py, untlbinary2pydict, untlpy2binary
+from pyuntl.untldoc import generate_untl_json, untljson2py, untlxml2py
+
+
+def timed(function, inputs):
+    """Return the seconds taken to call the function on every input."""
+    start = time.perf_counter()
+    for value in inputs:
+        function(value)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Compare the binary UNTL encoding with UNTL XML and JSON.'
+    )
+    parser.add_argument('-n', '--records', type=int, default=2000,
+                        help='number of records to encode (default: 2000)')
+    args = parser.parse_args(argv)
+    records = make_records(args.records)
+    encodings = [
+        ('xml', [record.create_xml_string() for record in records],
+         lambda untl_xml: untlxml2py(BytesIO(untl_xml))),
+        ('json', [generate_untl_json(record, None).encode('utf-8') for record in records],
+         untljson2py),
+        ('binary', [untlpy2binary(record) for record in records], untlbinary2py),
+    ]
+    print('{:<8}{:>18}{:>22}'.format('format', 'bytes per record', 'decodes per second'))
+    for name, encoded, decode in encodings:
+        size = sum(len(value) for value in encoded) / len(records)
+        seconds = timed(decode, encoded)
+        print('{:<8}{:>18.0f}{:>22.0f}'.format(name, size, len(records) / seconds))
+    # Decoding to a dictionary skips building the UNTL Python objects.
+    json_seconds = timed(json.loads, encodings[1][1])
+    binary_seconds = timed(untlbinary2pydict, encodings[2][1])
+    print('dictionary decodes per second: json {:.0f}, binary {:.0f}'.format(
+        len(records) / json_seconds, len(records) / binary_seconds))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Measure the memory held by parsed UNTL records.
+
+    python -m benchmarks.memory [--records N]
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+
+from benchmarks.records import make_untl_dict
+from pyuntl.untldoc import untldict2py
+
+
+def count_elements(element):
+    """Count an element and all of its descendants."""
+    return 1 + sum(count_elements(child) for child in element.children)
+
+
+def measure(count):
+    """Build count records and report the memory they hold."""
+    untl_dicts = [make_untl_dict(number) for number in range(count)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    records = [untldict2py(untl_dict) for untl_dict in untl_dicts]
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    elements = sum(count_elements(record) for record in records)
+    return {
+        'records': count,
+        'elements': elements,
+        'bytes': total,
+        'bytes_per_record': total / count,
+        'bytes_per_element': total / elements,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Measure the memory held by parsed UNTL records.'
+    )
+    parser.add_argument('-n', '--records', type=int, default=10000,
+                        help='number of records to build (default: 10000)')
+    args = parser.parse_args(argv)
+    result = measure(args.records)
+    print('records:           {records}'.format(**result))
+    print('elements:          {elements}'.format(**result))
+    print('bytes per record:  {bytes_per_record:.0f}'.format(**result))
+    print('bytes per element: {bytes_per_element:.0f}'.format(**result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Compare the ways of parsing UNTL XML into a UNTL dictionary.
+
+    python -m benchmarks.parsing [--records N]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+from benchmarks.records import make_untl_xml
+from pyuntl.untldoc import untlpy2dict, untlxml2py, untlxml2pydict
+
+
+def two_stage(untl_xml):
+    """Parse to a UNTL Python object, then convert it to a dictionary."""
+    return untlpy2dict(untlxml2py(BytesIO(untl_xml)))
+
+
+def single_pass(untl_xml):
+    """Parse straight to a dictionary."""
+    return untlxml2pydict(BytesIO(untl_xml))
+
+
+PARSERS = [
+    ('untlxml2py + untlpy2dict', two_stage),
+    ('untlxml2pydict', single_pass),
+]
+
+
+def measure(parser, records):
+    """Time a parser over the records and trace its allocations."""
+    start = time.perf_counter()
+    for untl_xml in records:
+        parser(untl_xml)
+    seconds = time.perf_counter() - start
+    # Memory is traced in a separate run, as tracing is slow. Each
+    # result is discarded, so the peak is the most memory used to
+    # parse a single record.
+    tracemalloc.start()
+    for untl_xml in records:
+        parser(untl_xml)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'seconds': seconds,
+        'records_per_second': len(records) / seconds,
+        'peak_bytes': peak,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Compare the ways of parsing UNTL XML into a dictionary.'
+    )
+    parser.add_argument('-n', '--records', type=int, default=2000,
+                        help='number of records to parse (default: 2000)')
+    args = parser.parse_args(argv)
+    records = [make_untl_xml(number) for number in range(args.records)]
+    for name, function in PARSERS:
+        result = measure(function, records)
+        print('{}:'.format(name))
+        print('  records per second: {records_per_second:.0f}'.format(**result))
+        print('  seconds:            {seconds:.3f}'.format(**result))
+        print('  peak bytes:         {peak_bytes}'.format(**result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""Synthetic UNTL records and vocabularies for the benchmarks."""
+from pyuntl.metadata_generator import pydict2xmlstring
+from pyuntl.untldoc import untldict2py
+
+
+SUBJECT_QUALIFIERS = ('LCSH', 'UNTL-BS', 'KWD', 'AAT')
+
+# Record shapes for the benchmarks, as make_untl_dict keyword arguments.
+RECORD_SHAPES = {
+    'typical': {},
+    'subjects-10': {'subjects': 10},
+    'subjects-100': {'subjects': 100},
+    'subjects-1000': {'subjects': 1000},
+    'creators-100': {'creators': 100},
+    'long-description': {'description_length': 50000},
+}
+
+DESCRIPTION = ('Yearbook for Hardin-Simmons University in Abilene, Texas '
+               'includes photos of and information about the school, '
+               'student body, professors, and organizations.')
+
+
+def make_untl_dict(number, subjects=4, creators=2, description_length=None):
+    """Create a UNTL dictionary.
+
+    By default the record is of typical size and shape. The number of
+    subjects and creators, and the length of the content description,
+    can be changed to create larger records.
+    """
+    description = DESCRIPTION
+    if description_length is not None:
+        description = ' '.join([DESCRIPTION] * (description_length // len(DESCRIPTION) + 1))
+        description = description[:description_length].strip()
+    return {
+        'title': [
+            {'qualifier': 'officialtitle',
+             'content': 'The Bronco, Yearbook of Hardin-Simmons University, %d' % number},
+            {'qualifier': 'serialtitle', 'content': 'The Bronco'},
+        ],
+        'creator': [
+            {'qualifier': 'aut' if i % 2 == 0 else 'edt',
+             'content': {'type': 'per' if i % 2 else 'org',
+                         'name': 'Mahoney, Doris %d-%d' % (number, i)}}
+            for i in range(creators)
+        ],
+        'publisher': [
+            {'content': {'name': 'Hardin-Simmons University',
+                         'location': 'Abilene, Texas'}},
+        ],
+        'date': [
+            {'qualifier': 'creation', 'content': str(1900 + number % 100)},
+            {'qualifier': 'digitized', 'content': '2008'},
+        ],
+        'language': [{'content': 'eng'}],
+        'description': [
+            {'qualifier': 'content', 'content': description},
+            {'qualifier': 'physical', 'content': 'Not paginated : ill ; 31 cm.'},
+        ],
+        'subject': [
+            {'qualifier': SUBJECT_QUALIFIERS[i % len(SUBJECT_QUALIFIERS)],
+             'content': 'Hardin-Simmons University -- Students -- %d.' % i}
+            for i in range(subjects)
+        ],
+        'coverage': [
+            {'qualifier': 'placeName', 'content': 'United States - Texas'},
+            {'qualifier': 'timePeriod', 'content': 'mod-tim'},
+        ],
+        'collection': [{'content': 'HSUY'}],
+        'institution': [{'content': 'HSUL'}],
+        'rights': [{'qualifier': 'access', 'content': 'public'}],
+        'resourceType': [{'content': 'text_yearbook'}],
+        'format': [{'content': 'text'}],
+        'identifier': [
+            {'qualifier': 'OCLC', 'content': str(14281668 + number)},
+            {'qualifier': 'LOCAL-CONT-NO', 'content': str(number)},
+        ],
+        'meta': [
+            {'qualifier': 'ark', 'content': 'ark:/67531/metapth%d' % number},
+            {'qualifier': 'metadataCreator', 'content': 'mphillips'},
+            {'qualifier': 'hidden', 'content': 'False'},
+        ],
+    }
+
+
+def make_records(count, **kwargs):
+    """Create a list of UNTL Python objects."""
+    return [untldict2py(make_untl_dict(number, **kwargs)) for number in range(count)]
+
+
+def make_untl_xml(number, **kwargs):
+    """Create a UNTL XML byte string."""
+    return pydict2xmlstring(make_untl_dict(number, **kwargs))
+
+
+def make_post(untl_dict):
+    """Create the posted form data for a UNTL dictionary.
+
+    Returns a dictionary of value lists keyed like the record edit
+    form's fields, as taken by post2pydict.
+    """
+    post = {}
+    for element_name, element_list in untl_dict.items():
+        # Every field of an element needs a value for each element.
+        fields = {'qualifier'}
+        for element_dict in element_list:
+            content = element_dict.get('content')
+            fields.update(content if isinstance(content, dict) else ['content'])
+        for field in sorted(fields):
+            values = []
+            for element_dict in element_list:
+                content = element_dict.get('content')
+                if field == 'qualifier':
+                    values.append(element_dict.get('qualifier', ''))
+                elif isinstance(content, dict):
+                    values.append(content.get(field, ''))
+                else:
+                    values.append(content if field == 'content' else '')
+            post['%s-%s' % (element_name, field)] = values
+    return post
+
+
+# Terms of the synthetic vocabularies, covering the values above.
+VOCABULARY_TERMS = {
+    'title-qualifiers': ['officialtitle', 'serialtitle'],
+    'identifier-qualifiers': ['OCLC', 'LOCAL-CONT-NO'],
+    'note-qualifiers': [],
+    'subject-qualifiers': list(SUBJECT_QUALIFIERS),
+    'description-qualifiers': ['content', 'physical'],
+    'date-qualifiers': ['creation', 'digitized'],
+    'sourceQualifiers': [],
+    'coverage-qualifiers': ['placeName', 'timePeriod'],
+    'relation-qualifiers': [],
+    'rights-qualifiers': ['access'],
+    'degree-information': [],
+    'meta-qualifiers': ['ark', 'metadataCreator', 'hidden'],
+    'citationQualifiers': [],
+    'agent-type': ['org', 'per'],
+    'agent-qualifiers': ['aut', 'edt'],
+    'institutions': ['HSUL'],
+    'collections': ['HSUY'],
+    'languages': ['eng'],
+    'resource-types': ['text_yearbook'],
+    'formats': ['text'],
+    'coverage-eras': ['mod-tim'],
+    'rights-access': ['public'],
+    'rights-licenses': [],
+    'publication-types': [],
+}
+
+
+def make_vocabularies():
+    """Create verbose vocabularies for the synthetic records."""
+    return {
+        vocab_name: [
+            {'name': name,
+             'label': 'Label for %s' % name,
+             'url': 'https://example.com/vocabularies/%s/#%s' % (vocab_name, name)}
+            for name in names
+        ]
+        for vocab_name, names in VOCABULARY_TERMS.items()
+    }
@@ -0,0 +1,214 @@
+"""Time the pyuntl conversion paths over records of several shapes.
+
+    python -m benchmarks.suite [--shape NAME] [--benchmark NAME] [--output FILE]
+
+Results are written as JSON, to standard output by default, with a
+summary table on standard error. The vocabularies are synthetic and
+kept in memory, so no network access is needed.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from io import BytesIO
+
+from benchmarks.records import (RECORD_SHAPES, make_post, make_untl_dict,
+                                make_vocabularies)
+from pyuntl import DC_ORDER, UNTL_PTH_ORDER, VOCABULARIES_URL
+from pyuntl.form_logic import FormTemplateCache
+from pyuntl.metadata_generator import write_anvl
+from pyuntl.quality import determine_completeness
+from pyuntl.rdf_generator import write_rdf
+from pyuntl.render_cache import RenderCache
+from pyuntl.solr import SolrDocumentBuilder
+from pyuntl.untl_structure import set_vocabulary_store
+from pyuntl.untldoc import (DCConverter, HighwireConverter, dcpy2dict, generate_highwire_xml,
+                            generate_rdf_xml, get_record_version, post2pydict, untldict2py,
+                            untlpy2dcpy, untlpy2highwirepy, untlpydict2dcformatteddict,
+                            untlxml2py, untlxml2pydict)
+from pyuntl.view import untlxml2view
+from pyuntl.vocabulary import VocabularyStore
+
+
+def prepare(untl_dict, vocabularies):
+    """Create the inputs of the benchmarks for a record."""
+    untl_elements = untldict2py(untl_dict)
+    return {
+        'untl_dict': untl_dict,
+        'untl_elements': untl_elements,
+        'untl_xml': untl_elements.create_xml_string(),
+        'post': make_post(untl_dict),
+        'dc_dict': dcpy2dict(untlpy2dcpy(untl_elements)),
+        'vocabularies': vocabularies,
+    }
+
+
+def bench_get_record_version(inputs):
+    untl_elements = inputs['untl_elements']
+    # Start from scratch, without the hashes or version of an earlier call.
+    untl_elements.hash_cache.clear()
+    untl_elements.metrics_cache.clear()
+    return get_record_version(untl_elements)
+
+
+def bench_get_record_version_edited(inputs):
+    untl_elements = inputs['untl_elements']
+    untl_elements.children[0].set_content('The Bronco, edited')
+    return get_record_version(untl_elements)
+
+
+SOLR_BUILDER = SolrDocumentBuilder()
+DC_CONVERTER = DCConverter()
+HIGHWIRE_CONVERTER = HighwireConverter(escape=True)
+RENDER_CACHE = RenderCache(escape=True)
+FORM_TEMPLATE_CACHE = FormTemplateCache()
+
+# Benchmarks, each taking the inputs created by prepare.
+BENCHMARKS = {
+    'untlxml2py': lambda inputs: untlxml2py(BytesIO(inputs['untl_xml'])),
+    'untlxml2pydict': lambda inputs: untlxml2pydict(BytesIO(inputs['untl_xml'])),
+    'untlxml2view': lambda inputs: untlxml2view(BytesIO(inputs['untl_xml'])).values('title'),
+    'untldict2py': lambda inputs: untldict2py(inputs['untl_dict']),
+    'post2pydict': lambda inputs: post2pydict(inputs['post'], []),
+    'create_xml_string': lambda inputs: inputs['untl_elements'].create_xml_string(),
+    'untlpy2dcpy': lambda inputs: untlpy2dcpy(inputs['untl_elements']),
+    'untlpy2dcpy-resolved': lambda inputs: untlpy2dcpy(
+        inputs['untl_elements'],
+        resolve_values=True,
+        resolve_urls=True,
+        verbose_vocabularies=inputs['vocabularies'],
+    ),
+    'untlpydict2dcformatteddict': lambda inputs: untlpydict2dcformatteddict(
+        inputs['untl_dict'],
+    ),
+    'DCConverter': lambda inputs: DC_CONVERTER.untlpydict2dcformatteddict(inputs['untl_dict']),
+    'generate_highwire_xml': lambda inputs: generate_highwire_xml(
+        untlpy2highwirepy(inputs['untl_elements'], escape=True),
+    ),
+    'HighwireConverter': lambda inputs: HIGHWIRE_CONVERTER.create_xml(inputs['untl_elements']),
+    'RenderCache': lambda inputs: RENDER_CACHE.render(inputs['untl_elements'], 'highwire-xml'),
+    'generate_rdf_xml': lambda inputs: generate_rdf_xml(inputs['dc_dict']),
+    'write_rdf': lambda inputs: write_rdf(BytesIO(), [inputs['dc_dict']], rdf_format='xml'),
+    'write_anvl': lambda inputs: write_anvl(BytesIO(), [inputs['dc_dict']], DC_ORDER),
+    'get_record_version': bench_get_record_version,
+    'get_record_version-edited': bench_get_record_version_edited,
+    'determine_completeness': lambda inputs: determine_completeness(inputs['untl_elements']),
+    'SolrDocumentBuilder': lambda inputs: SOLR_BUILDER.document(inputs['untl_dict']),
+    # Forms are made for a new record each time, as making them
+    # changes the record's elements.
+    'FormGenerator': lambda inputs: untldict2py(inputs['untl_dict']).generate_form_data(
+        sort_order=UNTL_PTH_ORDER,
+        form_cache=FORM_TEMPLATE_CACHE,
+    ),
+    'FormGenerator-uncached': lambda inputs: untldict2py(inputs['untl_dict']).generate_form_data(
+        sort_order=UNTL_PTH_ORDER,
+    ),
+}
+
+
+def measure(function, inputs, min_time=0.2, min_rounds=5):
+    """Call the function repeatedly, timing each call.
+
+    Calls continue until both min_time seconds and min_rounds calls
+    have passed. Returns the statistics of the call times in seconds.
+    """
+    times = []
+    start = time.perf_counter()
+    while len(times) < min_rounds or time.perf_counter() - start < min_time:
+        call_start = time.perf_counter()
+        function(inputs)
+        times.append(time.perf_counter() - call_start)
+    return {
+        'rounds': len(times),
+        'min': min(times),
+        'max': max(times),
+        'mean': statistics.mean(times),
+        'median': statistics.median(times),
+        'stddev': statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def get_version():
+    """Get the installed pyuntl version, if it can be found."""
+    try:
+        from importlib.metadata import version
+        return version('pyuntl')
+    except Exception:
+        return None
+
+
+def run(shapes, benchmarks, min_time=0.2, min_rounds=5, report=None):
+    """Run the benchmarks on each record shape.
+
+    Returns the results as a dictionary ready to be written as JSON.
+    If report is a file object, a line is written to it per result.
+    """
+    vocabularies = make_vocabularies()
+    # Serve the synthetic vocabularies to get_vocabularies.
+    store = VocabularyStore()
+    store.entries[VOCABULARIES_URL.replace('all', 'all-verbose')] = {
+        'vocabularies': vocabularies,
+        'fetched': time.time(),
+    }
+    set_vocabulary_store(store)
+    results = []
+    try:
+        for shape in shapes:
+            inputs = prepare(make_untl_dict(0, **RECORD_SHAPES[shape]), vocabularies)
+            for name in benchmarks:
+                result = {'benchmark': name, 'shape': shape}
+                result.update(measure(BENCHMARKS[name], inputs, min_time, min_rounds))
+                results.append(result)
+                if report is not None:
+                    report.write('{:<28}{:<18}{:>12.1f} us{:>8} rounds\n'.format(
+                        name, shape, result['median'] * 1e6, result['rounds']))
+    finally:
+        set_vocabulary_store(None)
+    return {
+        'pyuntl_version': get_version(),
+        'python_version': platform.python_version(),
+        'python_implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'unit': 'seconds',
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Time the pyuntl conversion paths.'
+    )
+    parser.add_argument('-s', '--shape', dest='shapes', action='append',
+                        choices=list(RECORD_SHAPES),
+                        help='record shape to use; may be repeated (default: all)')
+    parser.add_argument('-b', '--benchmark', dest='benchmarks', action='append',
+                        choices=list(BENCHMARKS),
+                        help='benchmark to run; may be repeated (default: all)')
+    parser.add_argument('-t', '--min-time', type=float, default=0.2,
+                        help='minimum seconds to run each benchmark (default: 0.2)')
+    parser.add_argument('-r', '--min-rounds', type=int, default=5,
+                        help='minimum calls of each benchmark (default: 5)')
+    parser.add_argument('-o', '--output',
+                        help='file to write the JSON results to (default: stdout)')
+    args = parser.parse_args(argv)
+    results = run(
+        args.shapes or list(RECORD_SHAPES),
+        args.benchmarks or list(BENCHMARKS),
+        min_time=args.min_time,
+        min_rounds=args.min_rounds,
+        report=sys.stderr,
+    )
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
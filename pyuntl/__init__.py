@@ -91,6 +91,58 @@ HIGHWIRE_ORDER = [
     'citation_technical_report_number',
 ]
 
+
+def create_order_ranks(ordering):
+    """Create a dictionary of the position of each name in an ordered
+    list, for sorting by rank instead of by ordering.index.
+    """
+    ranks = {}
+    for rank, name in enumerate(ordering):
+        # Keep the first position of a repeated name, as index does.
+        ranks.setdefault(name, rank)
+    return ranks
+
+
+# Rank dictionaries of the ordered lists, keyed by the ordering's names.
+ORDER_RANKS = {
+    tuple(ordering): create_order_ranks(ordering)
+    for ordering in (UNTL_XML_ORDER, UNTL_PTH_ORDER, DC_ORDER, HIGHWIRE_ORDER)
+}
+
+# Rank dictionaries of the module's orderings, keyed by their id, so
+# they are found without building a tuple. The module keeps the
+# orderings, so their ids are never reused.
+MODULE_ORDER_RANKS = {
+    id(ordering): ORDER_RANKS[tuple(ordering)]
+    for ordering in (UNTL_XML_ORDER, UNTL_PTH_ORDER, DC_ORDER, HIGHWIRE_ORDER)
+}
+
+# Most rank dictionaries kept in ORDER_RANKS.
+MAX_ORDER_RANKS = 256
+
+
+def get_order_ranks(ordering):
+    """Get the rank dictionary of an ordered list.
+
+    Ranks are created once for each distinct ordering and reused.
+    Orderings are looked up by their names, so a list changed in place
+    gets the ranks of its new names.
+    """
+    ranks = MODULE_ORDER_RANKS.get(id(ordering))
+    if ranks is not None:
+        return ranks
+    key = ordering if isinstance(ordering, tuple) else tuple(ordering)
+    ranks = ORDER_RANKS.get(key)
+    if ranks is None:
+        if len(ORDER_RANKS) >= MAX_ORDER_RANKS:
+            # Evict the oldest ordering that is not one of the module's.
+            oldest_key = next(key for index, key in enumerate(ORDER_RANKS)
+                              if index >= len(MODULE_ORDER_RANKS))
+            del ORDER_RANKS[oldest_key]
+        ranks = ORDER_RANKS[key] = create_order_ranks(key)
+    return ranks
+
+
 # Namespaces for the UNTL xml
 UNTL_NAMESPACES = {
     'untl': 'http://digitalprojects.library.unt.edu/'
@@ -111,6 +163,12 @@ CREATION_MONTH_REGEX = re.compile(r'^(\d\d\d\d)[- /.](0[1-9]|1[012])$')
 
 CREATION_YEAR_REGEX = re.compile(r'(\d\d\d\d)')
 
+# A creation date, year and month, or the year at the start of the value,
+# trying each in the order of the three regular expressions above.
+CREATION_DATE_PARTS_REGEX = re.compile(
+    r'(\d\d\d\d)(?:[- /.](0[1-9]|1[012])(?:[- /.](0[1-9]|[12][0-9]|3[01]))?$)?'
+)
+
 META_CREATION_DATE_REGEX = re.compile(
     r'(\d\d\d\d)[- /.](0[1-9]|1[012])[- /.](0[1-9]|[12][0-9]|3[01])'
 )
@@ -0,0 +1,268 @@
+"""
+    Convert many UNTL records at once, spread over a pool of processes.
+
+    from pyuntl.batch import convert_records
+    from pyuntl.untldoc import iter_untl_records
+    records = iter_untl_records('collection.untl.xml')
+    for output in convert_records(records, formats=['dc-xml', 'untl-json']):
+        print(output['dc-xml'])
+"""
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import islice
+
+from pyuntl.untldoc import (PyuntlException, DCConverter, HighwireConverter,
+                            iter_untl_records, untlxml2py, untldict2py, untlpy2dcpy,
+                            dcpy2dict, generate_dc_xml, generate_dc_json, generate_dc_txt,
+                            generate_untl_json, retrieve_vocab)
+
+
+# Conversion options taken by DCConverter.
+DC_CONVERTER_OPTIONS = ('domain_name', 'scheme', 'resolve_values', 'resolve_urls',
+                        'verbose_vocabularies')
+
+
+def create_dc_converter(options):
+    """Create the DCConverter for a dictionary of conversion options."""
+    return DCConverter(**{name: options[name] for name in DC_CONVERTER_OPTIONS
+                          if name in options})
+
+
+def untl2dc_dict(untl_elements, dc_converter=None, **kwargs):
+    """Convert a UNTL Python object to a DC dictionary.
+
+    dc_converter is a DCConverter to convert the record with, in place
+    of the DC options in kwargs, so that many records are converted
+    with vocabularies retrieved and indexed once.
+    """
+    if dc_converter is None:
+        return dcpy2dict(untlpy2dcpy(untl_elements, **kwargs))
+    return dcpy2dict(dc_converter.untlpy2dcpy(untl_elements, ark=kwargs.get('ark')))
+
+
+def untl2dc_xml(untl_elements, **kwargs):
+    """Convert a UNTL Python object to a DC XML string."""
+    return generate_dc_xml(untl2dc_dict(untl_elements, **kwargs))
+
+
+def untl2dc_json(untl_elements, **kwargs):
+    """Convert a UNTL Python object to a DC JSON string."""
+    return generate_dc_json(untl2dc_dict(untl_elements, **kwargs))
+
+
+def untl2dc_txt(untl_elements, **kwargs):
+    """Convert a UNTL Python object to a DC ANVL string."""
+    return generate_dc_txt(untl2dc_dict(untl_elements, **kwargs))
+
+
+# Highwire converters, by whether they escape the content.
+HIGHWIRE_CONVERTERS = {
+    False: HighwireConverter(),
+    True: HighwireConverter(escape=True),
+}
+
+
+def untl2highwire_xml(untl_elements, **kwargs):
+    """Convert a UNTL Python object to a highwire XML string."""
+    return HIGHWIRE_CONVERTERS[bool(kwargs.get('escape'))].create_xml(untl_elements)
+
+
+def untl2highwire_json(untl_elements, **kwargs):
+    """Convert a UNTL Python object to a highwire JSON string."""
+    return HIGHWIRE_CONVERTERS[bool(kwargs.get('escape'))].create_json(untl_elements)
+
+
+def untl2highwire_txt(untl_elements, **kwargs):
+    """Convert a UNTL Python object to a highwire ANVL string."""
+    return HIGHWIRE_CONVERTERS[bool(kwargs.get('escape'))].create_text(untl_elements)
+
+
+def untl2untl_json(untl_elements, **kwargs):
+    """Convert a UNTL Python object to a UNTL JSON string."""
+    return generate_untl_json(untl_elements)
+
+
+CONVERSION_DISPATCH = {
+    'dc-xml': untl2dc_xml,
+    'dc-json': untl2dc_json,
+    'dc-txt': untl2dc_txt,
+    'highwire-xml': untl2highwire_xml,
+    'highwire-json': untl2highwire_json,
+    'highwire-txt': untl2highwire_txt,
+    'untl-json': untl2untl_json,
+}
+
+DEFAULT_FORMATS = ['dc-xml']
+
+# Output formats, conversion options and DC converter of a worker
+# process, set once per worker by init_worker.
+WORKER_FORMATS = DEFAULT_FORMATS
+WORKER_OPTIONS = {}
+WORKER_DC_CONVERTER = None
+
+
+def record2py(record):
+    """Get a UNTL Python object from a record.
+
+    A record can be a UNTL XML string, a UNTL dictionary or a UNTL
+    Python object.
+    """
+    if isinstance(record, (bytes, str)):
+        if isinstance(record, str):
+            record = record.encode('utf-8')
+        return untlxml2py(BytesIO(record))
+    elif isinstance(record, dict):
+        return untldict2py(record)
+    return record
+
+
+def convert_record(record, formats=DEFAULT_FORMATS, **kwargs):
+    """Convert a record into each of the requested formats.
+
+    Returns a dictionary of the output keyed by format name.
+    """
+    untl_elements = record2py(record)
+    return {
+        output_format: CONVERSION_DISPATCH[output_format](untl_elements, **kwargs)
+        for output_format in formats
+    }
+
+
+def convert_chunk(records, formats=DEFAULT_FORMATS, **kwargs):
+    """Convert a list of records. Used as the unit of work per process."""
+    return [convert_record(record, formats, **kwargs) for record in records]
+
+
+def init_worker(formats, options):
+    """Set the output formats and conversion options of a worker process,
+    and create its DC converter.
+    """
+    global WORKER_FORMATS, WORKER_OPTIONS, WORKER_DC_CONVERTER
+    WORKER_FORMATS = formats
+    WORKER_OPTIONS = options
+    WORKER_DC_CONVERTER = create_dc_converter(options)
+
+
+def convert_worker_chunk(records):
+    """Convert a list of records in a worker process, with the formats
+    and options set by init_worker.
+    """
+    return convert_chunk(records, WORKER_FORMATS, dc_converter=WORKER_DC_CONVERTER,
+                         **WORKER_OPTIONS)
+
+
+def convert_records(records, formats=DEFAULT_FORMATS, workers=None,
+                    chunk_size=100, **kwargs):
+    """Convert an iterable of records, returning an iterator of the
+    results in input order.
+
+    formats: List of output formats from CONVERSION_DISPATCH.
+    workers: Number of worker processes. Defaults to the number of
+    processors; 1 converts the records in the current process.
+    chunk_size: Number of records sent to a worker at a time.
+
+    Any other kwargs are passed to untlpy2dcpy, except escape, which
+    escapes the highwire content. If values or URLs are to be
+    resolved, the vocabularies are retrieved once here rather than in
+    every worker, and each worker indexes them once in its DC converter.
+
+    The arguments are checked and the vocabularies retrieved when this
+    is called, not when the results are first read. The options are
+    sent to each worker process once, when it starts.
+    """
+    for output_format in formats:
+        if output_format not in CONVERSION_DISPATCH:
+            raise PyuntlException(
+                'Output format "%s" is not supported.' % (output_format)
+            )
+    if chunk_size < 1:
+        raise PyuntlException('chunk_size must be a positive integer.')
+    if ((kwargs.get('resolve_values') or kwargs.get('resolve_urls'))
+            and not kwargs.get('verbose_vocabularies')):
+        kwargs['verbose_vocabularies'] = retrieve_vocab()
+    return iter_conversions(records, formats, workers, chunk_size, kwargs)
+
+
+def iter_conversions(records, formats, workers, chunk_size, options):
+    """Convert an iterable of records, yielding results in input order.
+
+    Used by convert_records, once the arguments are checked.
+    """
+    records = iter(records)
+    chunks = iter(lambda: list(islice(records, chunk_size)), [])
+    if workers == 1:
+        dc_converter = create_dc_converter(options)
+        for chunk in chunks:
+            for output in convert_chunk(chunk, formats, dc_converter=dc_converter, **options):
+                yield output
+        return
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(formats, options)) as executor:
+        # Keep a bounded window of chunks in flight so the input is
+        # consumed as fast as it is converted, not all at once.
+        window = workers * 2
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(convert_worker_chunk, chunk))
+            if len(pending) >= window:
+                for output in pending.popleft().result():
+                    yield output
+        while pending:
+            for output in pending.popleft().result():
+                yield output
+
+
+def main(argv=None):
+    """Convert UNTL XML files from the command line.
+
+    Writes one JSON object per record to standard output, mapping each
+    requested format to the converted record.
+    """
+    parser = argparse.ArgumentParser(
+        description='Convert UNTL XML records to other formats.'
+    )
+    parser.add_argument('files', nargs='+',
+                        help='UNTL XML files, each holding one or more records')
+    parser.add_argument('-f', '--format', dest='formats', action='append',
+                        choices=sorted(CONVERSION_DISPATCH),
+                        help='output format; may be repeated (default: dc-xml)')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='number of worker processes (default: CPU count)')
+    parser.add_argument('-c', '--chunk-size', type=int, default=100,
+                        help='records sent to a worker at a time (default: 100)')
+    parser.add_argument('--resolve-values', action='store_true',
+                        help='resolve DC vocabulary values to labels')
+    parser.add_argument('--resolve-urls', action='store_true',
+                        help='resolve DC vocabulary values to URLs')
+    args = parser.parse_args(argv)
+
+    def iter_files(filenames):
+        for filename in filenames:
+            for record in iter_untl_records(filename):
+                yield record
+
+    outputs = convert_records(
+        iter_files(args.files),
+        formats=args.formats or DEFAULT_FORMATS,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        resolve_values=args.resolve_values,
+        resolve_urls=args.resolve_urls,
+    )
+    for output in outputs:
+        output = {
+            key: value.decode('utf-8') if isinstance(value, bytes) else value
+            for key, value in output.items()
+        }
+        sys.stdout.write(json.dumps(output, ensure_ascii=False) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""
+    Load many UNTL records into columns for querying a whole collection.
+
+    from pyuntl.corpus import UNTLCorpus
+    corpus = UNTLCorpus()
+    corpus.add_xml('collection.untl.xml')
+    undated = corpus.missing('date', 'creation')
+    subjects = corpus.distinct('subject', 'LCSH')
+    top_subjects = corpus.facet_counts('subject', 'LCSH').most_common(10)
+
+    Records are numbered in the order they are added. Each element
+    and qualifier pair has a column of arrays holding, for every
+    element, the number of its record, its position in the record,
+    and the index of its content in a table where every distinct
+    string is stored once. Content with children, such as a creator's
+    name and type, has an array for each child. Queries compare string
+    indexes instead of strings, and records can be exported back into
+    the UNTL dictionaries they were loaded from.
+
+    A qualifier of None matches elements with any qualifier.
+"""
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from pyuntl.metadata_generator import py2dict
+from pyuntl.untldoc import iter_untl_records
+
+
+# Index of the string table standing for no content.
+NO_CONTENT = 0
+# Content index of elements whose content is a dictionary of children.
+CHILD_CONTENT = 0xFFFFFFFF
+
+
+class CorpusException(Exception):
+    """Base exception for UNTL corpora."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return '%s' % (self.value,)
+
+
+class CorpusColumn(object):
+    """The elements of a corpus with the same tag and qualifier."""
+
+    __slots__ = ('records', 'positions', 'contents', 'children')
+
+    def __init__(self):
+        # The number of each element's record, in ascending order.
+        self.records = array('I')
+        # The position of each element among its record's elements.
+        self.positions = array('I')
+        # The string index of each element's content.
+        self.contents = array('I')
+        # String indexes of the content of each child, by child tag.
+        self.children = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def get_child_contents(self, child_tag):
+        """Get the array of content of a child, creating it if needed."""
+        contents = self.children.get(child_tag)
+        if contents is None:
+            # Elements added before the child was first seen lack it.
+            contents = self.children[child_tag] = array('I', [NO_CONTENT]) * len(self)
+        return contents
+
+    def get_contents(self, child_tag=None):
+        """Get the array of content of the elements, or of a child."""
+        if child_tag is None:
+            return self.contents
+        return self.children.get(child_tag)
+
+
+class UNTLCorpus(object):
+    """A collection of UNTL records stored in columns.
+
+    Records can be added from UNTL dictionaries, UNTL Python objects or
+    UNTL XML files holding one or many records.
+    """
+
+    def __init__(self):
+        # Distinct strings, with the string at NO_CONTENT standing for none.
+        self.strings = [None]
+        self.string_indexes = {}
+        self.columns = {}
+        # The position and tag of empty element lists, by record number.
+        self.empty_tags = {}
+        self.record_count = 0
+
+    def __len__(self):
+        return self.record_count
+
+    def check_string(self, value):
+        """Raise a CorpusException if a value cannot be stored."""
+        if not isinstance(value, str):
+            raise CorpusException('Only strings can be stored, not %r' % (value,))
+
+    def intern(self, value):
+        """Get the index of a string in the string table, adding it."""
+        self.check_string(value)
+        index = self.string_indexes.get(value)
+        if index is None:
+            index = self.string_indexes[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+    def add(self, record):
+        """Add a UNTL dictionary or UNTL Python object.
+
+        Returns the number of the record in the corpus. The whole
+        record is checked before it is added, so a record raising a
+        CorpusException leaves the corpus unchanged.
+        """
+        if not isinstance(record, dict):
+            record = py2dict(record)
+        record_number = self.record_count
+        # The column key, position and content of each element.
+        elements = []
+        empty_tags = []
+        position = 0
+        for tag, element_list in record.items():
+            if not element_list:
+                empty_tags.append((position, tag))
+                position += 1
+            for element_dict in element_list:
+                content = element_dict.get('content')
+                if isinstance(content, dict):
+                    for child_content in content.values():
+                        self.check_string(child_content)
+                elif content is not None:
+                    self.check_string(content)
+                elements.append(((tag, element_dict.get('qualifier')), position, content))
+                position += 1
+        if empty_tags:
+            self.empty_tags[record_number] = empty_tags
+        for key, position, content in elements:
+            column = self.columns.get(key)
+            if column is None:
+                column = self.columns[key] = CorpusColumn()
+            if isinstance(content, dict):
+                for child_tag, child_content in content.items():
+                    child_contents = column.get_child_contents(child_tag)
+                    child_contents.append(self.intern(child_content))
+                content_index = CHILD_CONTENT
+            elif content is None:
+                content_index = NO_CONTENT
+            else:
+                content_index = self.intern(content)
+            column.records.append(record_number)
+            column.positions.append(position)
+            column.contents.append(content_index)
+            # Children the element does not have get no content.
+            for child_contents in column.children.values():
+                if len(child_contents) < len(column.records):
+                    child_contents.append(NO_CONTENT)
+        self.record_count += 1
+        return record_number
+
+    def add_records(self, records):
+        """Add many UNTL dictionaries or UNTL Python objects.
+
+        Returns the numbers of the records, as a range.
+        """
+        start = self.record_count
+        for record in records:
+            self.add(record)
+        return range(start, self.record_count)
+
+    def add_xml(self, untl_source):
+        """Add the records of a UNTL XML file object.
+
+        Returns the numbers of the records, as a range.
+        """
+        return self.add_records(iter_untl_records(untl_source))
+
+    def get_columns(self, tag, qualifier=None):
+        """Get the columns of a tag, and optionally a qualifier."""
+        if qualifier is not None:
+            column = self.columns.get((tag, qualifier))
+            return [column] if column is not None else []
+        return [column for (column_tag, _), column in self.columns.items()
+                if column_tag == tag]
+
+    def iter_contents(self, tag, qualifier=None, child=None):
+        """Iterate over the record number and content index of the
+        elements with a tag, skipping elements without content.
+        """
+        for column in self.get_columns(tag, qualifier):
+            contents = column.get_contents(child)
+            if contents is None:
+                continue
+            for record_number, content_index in zip(column.records, contents):
+                if content_index != NO_CONTENT and content_index != CHILD_CONTENT:
+                    yield record_number, content_index
+
+    def having(self, tag, qualifier=None, value=None, child=None):
+        """Get the sorted numbers of the records with content for a tag.
+
+        If a value is given, only records with that content are
+        included. child selects the content of a child, such as the
+        name of a creator.
+        """
+        if value is None:
+            record_numbers = {record_number for record_number, _
+                              in self.iter_contents(tag, qualifier, child)}
+        else:
+            value_index = self.string_indexes.get(value)
+            if value_index is None:
+                return []
+            record_numbers = {record_number for record_number, content_index
+                              in self.iter_contents(tag, qualifier, child)
+                              if content_index == value_index}
+        return sorted(record_numbers)
+
+    def missing(self, tag, qualifier=None, child=None):
+        """Get the sorted numbers of the records without content for a tag."""
+        present = set(self.having(tag, qualifier, child=child))
+        return [record_number for record_number in range(self.record_count)
+                if record_number not in present]
+
+    def facet_counts(self, tag, qualifier=None, child=None):
+        """Count the records having each content of a tag.
+
+        Returns a Counter keyed by content.
+        """
+        counts = Counter(
+            content_index for _, content_index
+            in set(self.iter_contents(tag, qualifier, child))
+        )
+        strings = self.strings
+        return Counter({strings[index]: count for index, count in counts.items()})
+
+    def distinct(self, tag, qualifier=None, child=None):
+        """Get the set of distinct content of a tag."""
+        strings = self.strings
+        return {strings[content_index] for _, content_index
+                in self.iter_contents(tag, qualifier, child)}
+
+    def get_record(self, record_number):
+        """Export a record as the UNTL dictionary it was added as."""
+        if not 0 <= record_number < self.record_count:
+            raise CorpusException('Record %s is not in the corpus.' % (record_number,))
+        elements = []
+        for (tag, qualifier), column in self.columns.items():
+            # Each column's records are in ascending order.
+            row = bisect_left(column.records, record_number)
+            while row < len(column) and column.records[row] == record_number:
+                elements.append((column.positions[row], tag,
+                                 self.create_element_dict(column, row, qualifier)))
+                row += 1
+        return self.create_untl_dict(record_number, elements)
+
+    def iter_records(self):
+        """Export every record as a UNTL dictionary, in order."""
+        records = [[] for _ in range(self.record_count)]
+        for (tag, qualifier), column in self.columns.items():
+            for row, (record_number, position) in enumerate(zip(column.records,
+                                                                column.positions)):
+                records[record_number].append(
+                    (position, tag, self.create_element_dict(column, row, qualifier))
+                )
+        for record_number, elements in enumerate(records):
+            yield self.create_untl_dict(record_number, elements)
+
+    def create_untl_dict(self, record_number, elements):
+        """Create the UNTL dictionary of a record from a list of the
+        position, tag and dictionary of its elements.
+        """
+        for position, tag in self.empty_tags.get(record_number, ()):
+            elements.append((position, tag, None))
+        elements.sort(key=lambda element: element[0])
+        untl_dict = {}
+        for _, tag, element_dict in elements:
+            element_list = untl_dict.setdefault(tag, [])
+            if element_dict is not None:
+                element_list.append(element_dict)
+        return untl_dict
+
+    def create_element_dict(self, column, row, qualifier):
+        """Create the dictionary of an element in a column."""
+        element_dict = {}
+        if qualifier is not None:
+            element_dict['qualifier'] = qualifier
+        content_index = column.contents[row]
+        if content_index == CHILD_CONTENT:
+            element_dict['content'] = {
+                child_tag: self.strings[child_contents[row]]
+                for child_tag, child_contents in column.children.items()
+                if child_contents[row] != NO_CONTENT
+            }
+        elif content_index != NO_CONTENT:
+            element_dict['content'] = self.strings[content_index]
+        return element_dict
@@ -1,4 +1,5 @@
 from pyuntl import DC_ORDER
+from pyuntl.vocabulary import get_vocabulary_index
 
 
 XSI = 'http://www.w3.org/2001/XMLSchema-instance'
@@ -26,6 +27,20 @@ VOCAB_INDEX = {
 }
 
 
+def determine_vocab(tag, qualifier):
+    """Determine the vocab of a DC element from its tag and qualifier."""
+    vocab_value = VOCAB_INDEX.get(tag, None)
+    if isinstance(vocab_value, dict):
+        if qualifier is None:
+            qualifier = 'None'
+        # Find the value based on the qualifier.
+        return vocab_value.get(qualifier, None)
+    elif vocab_value is not None:
+        return vocab_value
+    else:
+        return None
+
+
 class DC_StructureException(Exception):
     """Base exception for the DC Python structure."""
 
@@ -88,28 +103,20 @@ class DCElement(object):
 
     def determine_vocab(self, qualifier):
         """Determine the vocab from the qualifier."""
-        vocab_value = VOCAB_INDEX.get(self.tag, None)
-        if isinstance(vocab_value, dict):
-            if qualifier is None:
-                qualifier = 'None'
-            # Find the value based on the qualifier.
-            return vocab_value.get(qualifier, None)
-        elif vocab_value is not None:
-            return vocab_value
-        else:
-            return None
+        return determine_vocab(self.tag, qualifier)
 
     def resolver(self, vocab_data, attribute):
         """Pull the requested attribute based on the given vocabulary
         and content.
         """
-        term_list = vocab_data.get(self.content_vocab, [])
-        # Loop through the terms from the vocabulary.
-        for term_dict in term_list:
-            # Match the name to the current content.
-            if term_dict['name'] == self.content:
-                return term_dict[attribute]
-        return self.content
+        vocab_index = get_vocabulary_index(vocab_data)
+        # Match the name to the current content.
+        return vocab_index.lookup(
+            self.content_vocab,
+            self.content,
+            attribute,
+            self.content,
+        )
 
 
 class DC(DCElement):
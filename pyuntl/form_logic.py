@@ -1,5 +1,6 @@
 import json
 from pyuntl import UNTL_USAGE_LINK
+from pyuntl.vocabulary import get_vocabulary_index
 
 
 REQUIRES_QUALIFIER = [
@@ -111,6 +112,10 @@ class FormGroup(object):
             adjustable_form[key] = element_dispatch[key]()
         return adjustable_form
 
+    def get_vocabulary_json(self, vocab_name):
+        """Get a vocabulary as JSON, serialized once per vocabularies."""
+        return get_vocabulary_index(self.vocabularies).to_json(vocab_name)
+
     def set_qualified_input(self):
         """Determine the properties for the blank qualified input
         fields.
@@ -159,7 +164,7 @@ class CoverageGroup(FormGroup):
         content_dict = get_content_dict(self.vocabularies, 'coverage-eras')
         form_dict = {
             'view_type': 'dd-value',
-            'value_json': json.dumps(content_dict, ensure_ascii=False),
+            'value_json': self.get_vocabulary_json('coverage-eras'),
             'value_py': content_dict,
         }
         return form_dict
@@ -185,7 +190,7 @@ class RightsGroup(FormGroup):
         content_dict = get_content_dict(self.vocabularies, 'rights-access')
         form_dict = {
             'view_type': 'dd-value',
-            'value_json': json.dumps(content_dict, ensure_ascii=False),
+            'value_json': self.get_vocabulary_json('rights-access'),
             'value_py': content_dict,
         }
         return form_dict
@@ -195,7 +200,7 @@ class RightsGroup(FormGroup):
         content_dict = get_content_dict(self.vocabularies, 'rights-licenses')
         form_dict = {
             'view_type': 'dd-value',
-            'value_json': json.dumps(content_dict, ensure_ascii=False),
+            'value_json': self.get_vocabulary_json('rights-licenses'),
             'value_py': content_dict,
         }
         return form_dict
@@ -225,15 +230,17 @@ class CitationGroup(FormGroup):
         # (datastructure for adjusting form with JavaScript).
         self.adjustable_form = self.get_adjustable_form(citation_dispatch)
 
+    PEER_REVIEWED_LIST = [
+        {'name': 'True', 'label': 'True'},
+        {'name': 'False', 'label': 'False'}
+    ]
+    PEER_REVIEWED_JSON = json.dumps(PEER_REVIEWED_LIST, ensure_ascii=False)
+
     def set_citation_peerReviewed(self):
-        content_list = [
-            {'name': 'True', 'label': 'True'},
-            {'name': 'False', 'label': 'False'}
-        ]
         form_dict = {
             'view_type': 'dd-value',
-            'value_json': json.dumps(content_list, ensure_ascii=False),
-            'value_py': content_list,
+            'value_json': self.PEER_REVIEWED_JSON,
+            'value_py': self.PEER_REVIEWED_LIST,
         }
         return form_dict
 
@@ -264,7 +271,7 @@ class DegreeGroup(FormGroup):
         content_dict = get_content_dict(self.vocabularies, 'publication-types')
         form_dict = {
             'view_type': 'dd-value',
-            'value_json': json.dumps(content_dict, ensure_ascii=False),
+            'value_json': self.get_vocabulary_json('publication-types'),
             'value_py': content_dict,
         }
         return form_dict
@@ -281,6 +288,9 @@ class HiddenGroup(FormGroup):
 class FormElement(object):
     """Class for containing UNTL form elements."""
 
+    # Whether the form's attributes depend on the element's qualifier.
+    qualifier_dependent = False
+
     def __init__(self, **kwargs):
         # Set all the defaults if inheriting class hasn't defined them.
         # Set name of the element.
@@ -503,6 +513,8 @@ class Description(FormElement):
 
 
 class Date(FormElement):
+    qualifier_dependent = True
+
     def __init__(self, **kwargs):
         # Get the UNTL object associated with the form object.
         self.untl_object = kwargs.get('untl_object', None)
@@ -607,6 +619,8 @@ class Language(FormElement):
 
 
 class Coverage(FormElement):
+    qualifier_dependent = True
+
     def __init__(self, **kwargs):
         # Get the UNTL object associated with the form object.
         self.untl_object = kwargs.get('untl_object', None)
@@ -726,6 +740,8 @@ class Degree(FormElement):
 
 
 class Meta(FormElement):
+    qualifier_dependent = True
+
     def __init__(self, **kwargs):
         # Get the UNTL object associated with the form object.
         self.untl_object = kwargs.get('untl_object', None)
@@ -876,6 +892,83 @@ class Location(FormElement):
         super(Location, self).__init__(**kwargs)
 
 
+class FormTemplateCache(object):
+    """A cache of form element attributes, shared between records.
+
+    A form element's attributes depend only on its class, the
+    vocabularies, its parent's tag, the superuser flag and, for some
+    elements, its qualifier. The first form made for each combination
+    is kept as a template, and later forms are made by copying the
+    template's attributes and binding the UNTL object. Each form gets
+    its own copies of the template's lists and dictionaries, so
+    changing them does not change other forms.
+
+    The templates are kept for one version of the vocabularies at a
+    time. The version is passed by the caller, such as the ETag of
+    the vocabularies in a VocabularyStore. Without a version, the
+    templates are discarded whenever a different vocabularies object
+    is passed.
+
+    FormGenerator only uses a cache passed to it as its form_cache.
+    """
+
+    def __init__(self):
+        self.vocabularies = None
+        self.version = None
+        self.templates = {}
+
+    def get_form(self, form_class, vocabularies, untl_object,
+                 parent_tag=None, superuser=False, version=None):
+        """Get a form of the form class for a UNTL object."""
+        if version is None:
+            changed = vocabularies is not self.vocabularies
+        else:
+            changed = version != self.version
+        if changed:
+            self.templates = {}
+        self.vocabularies = vocabularies
+        self.version = version
+        qualifier = untl_object.qualifier if form_class.qualifier_dependent else None
+        key = (form_class, qualifier, parent_tag, superuser)
+        template = self.templates.get(key)
+        if template is None:
+            form_kwargs = {
+                'vocabularies': vocabularies,
+                'untl_object': untl_object,
+                'superuser': superuser,
+            }
+            if parent_tag is not None:
+                form_kwargs['parent_tag'] = parent_tag
+            form = form_class(**form_kwargs)
+            attributes = {
+                name: value for name, value in vars(form).items()
+                if name not in ('untl_object', 'vocabularies')
+            }
+            # The names of the attributes copied for each form.
+            copied_names = tuple(name for name, value in attributes.items()
+                                 if isinstance(value, (list, dict)))
+            # Keep copies, so changing this form does not change the template.
+            for name in copied_names:
+                attributes[name] = attributes[name].copy()
+            self.templates[key] = (attributes, copied_names)
+            return form
+        attributes, copied_names = template
+        form = form_class.__new__(form_class)
+        form_attributes = form.__dict__
+        form_attributes.update(attributes)
+        for name in copied_names:
+            form_attributes[name] = attributes[name].copy()
+        form.vocabularies = vocabularies
+        form.untl_object = untl_object
+        return form
+
+    def clear(self):
+        """Discard all templates."""
+        self.vocabularies = None
+        self.version = None
+        self.templates = {}
+
+
 UNTL_GROUP_DISPATCH = {
     'title': FormGroup,
     'identifier': FormGroup,
@@ -1,8 +1,7 @@
 import html
 import datetime
 
-from pyuntl import (CREATION_DATE_REGEX, CREATION_MONTH_REGEX,
-                    CREATION_YEAR_REGEX, META_CREATION_DATE_REGEX)
+from pyuntl import CREATION_DATE_PARTS_REGEX, META_CREATION_DATE_REGEX
 
 
 def format_date_string(date_value):
@@ -14,6 +13,64 @@ def format_date_string(date_value):
         return str(date_value)
 
 
+def escape_content(content):
+    """Escape content for HTML, with non-ASCII characters as references."""
+    return html.escape(
+        content,
+        1
+    ).encode('ascii', 'xmlcharrefreplace').decode()
+
+
+def format_publication_date(date_string):
+    """Format a creation date as a publication date.
+
+    Returns the date as MM/DD/YYYY, MM/YYYY or YYYY, depending on how
+    much of the date is given, or None if it is not a date.
+    """
+    date_match = CREATION_DATE_PARTS_REGEX.match(date_string)
+    if not date_match:
+        return None
+    (year, month, day) = date_match.groups()
+    if month is None:
+        return year
+    # Create the date.
+    try:
+        creation_date = datetime.date(int(year), int(month), int(day or 1))
+    except ValueError:
+        return None
+    if day is None:
+        return '%s/%s' % (
+            format_date_string(creation_date.month),
+            creation_date.year,
+        )
+    return '%s/%s/%s' % (
+        format_date_string(creation_date.month),
+        format_date_string(creation_date.day),
+        creation_date.year,
+    )
+
+
+def format_online_date(date_string):
+    """Format a metadata creation date as an online date.
+
+    Returns the date as MM/DD/YYYY, or None if it is not a date.
+    """
+    date_match = META_CREATION_DATE_REGEX.match(date_string)
+    if not date_match:
+        return None
+    (year, month, day) = date_match.groups()
+    # Create the date.
+    try:
+        creation_date = datetime.date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+    return '%s/%s/%s' % (
+        format_date_string(creation_date.month),
+        format_date_string(creation_date.day),
+        creation_date.year,
+    )
+
+
 class HighwireElement(object):
     """A class for containing DC elements."""
 
@@ -27,10 +84,7 @@ class HighwireElement(object):
         escape = kwargs.get('escape', False)
         # Escape the content if needed.
         if escape and self.content:
-            self.content = html.escape(
-                self.content,
-                1
-            ).encode('ascii', 'xmlcharrefreplace').decode()
+            self.content = escape_content(self.content)
 
 
 class CitationTitle(HighwireElement):
@@ -93,40 +147,7 @@ class CitationPublicationDate(HighwireElement):
     def get_publication_date(self, **kwargs):
         """Determine the creation date for the publication date."""
         date_string = kwargs.get('content', '')
-        date_match = CREATION_DATE_REGEX.match(date_string)
-        month_match = CREATION_MONTH_REGEX.match(date_string)
-        year_match = CREATION_YEAR_REGEX.match(date_string)
-        # Check if a date match exists.
-        if date_match:
-            (year, month, day) = date_match.groups('')
-            # Create the date.
-            try:
-                creation_date = datetime.date(int(year), int(month), int(day))
-            except ValueError:
-                return None
-            else:
-                return '%s/%s/%s' % (
-                    format_date_string(creation_date.month),
-                    format_date_string(creation_date.day),
-                    creation_date.year,
-                )
-        elif month_match:
-            (year, month) = month_match.groups('')
-            # Create the date.
-            try:
-                creation_date = datetime.date(int(year), int(month), 1)
-            except ValueError:
-                return None
-            else:
-                return '%s/%s' % (
-                    format_date_string(creation_date.month),
-                    creation_date.year,
-                )
-        elif year_match:
-            year = year_match.groups('')[0]
-            return year
-        else:
-            return None
+        return format_publication_date(date_string)
 
 
 class CitationOnlineDate(HighwireElement):
@@ -278,3 +299,18 @@ HIGHWIRE_CONVERSION_DISPATCH = {
     'identifier': identifier_director,
     'degree': CitationDissertationInstitution,
 }
+
+# Highwire names of UNTL values that are used as they are, by tag and
+# qualifier, with whether the value is escaped when escaping is requested.
+HIGHWIRE_VALUE_NAMES = {
+    ('citation', 'publicationTitle'): ('citation_journal_title', False),
+    ('citation', 'volume'): ('citation_volume', False),
+    ('citation', 'issue'): ('citation_issue', False),
+    ('citation', 'pageStart'): ('citation_firstpage', False),
+    ('citation', 'pageEnd'): ('citation_lastpage', False),
+    ('identifier', 'ISBN'): ('citation_isbn', False),
+    ('identifier', 'ISSN'): ('citation_issn', False),
+    ('identifier', 'DOI'): ('citation_doi', False),
+    ('identifier', 'REP-NO'): ('citation_technical_report_number', False),
+    ('degree', 'grantor'): ('citation_dissertation_insitution', True),
+}
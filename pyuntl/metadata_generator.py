@@ -1,7 +1,11 @@
-from lxml.etree import Element, SubElement, tostring
+from contextlib import ExitStack
 
-from pyuntl import UNTL_XML_ORDER, HIGHWIRE_ORDER
+from lxml.etree import Element, SubElement, tostring, xmlfile
 
+from pyuntl import UNTL_XML_ORDER, HIGHWIRE_ORDER, get_order_ranks
+
+
+XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8"?>\n'
 
 XSI = 'http://www.w3.org/2001/XMLSchema-instance'
 
@@ -32,29 +36,40 @@ def py2dict(elements):
         # list hasn't been made in the dictionary.
         if element.tag not in metadata_dict:
             metadata_dict[element.tag] = []
-        element_dict = {}
-        if hasattr(element, 'qualifier') and element.qualifier is not None:
-            element_dict['qualifier'] = element.qualifier
-        # Set the element's content as a dictionary
-        # of children elements.
-        if element.children:
-            child_dict = {}
-            for child in element.children:
-                if child.content is not None:
-                    child_dict[child.tag] = child.content
-            element_dict['content'] = child_dict
-        # Set element content that is not children.
-        elif element.content is not None:
-            if element.content.strip() != '':
-                element_dict['content'] = element.content
+        element_dict = element2dict(element)
         # Append the dictionary to the element list
         # if the element has content or children.
-        if element_dict.get('content', False):
+        if element_dict is not None:
             metadata_dict[element.tag].append(element_dict)
 
     return metadata_dict
 
 
+def element2dict(element):
+    """Convert a Python element into a Python dictionary.
+
+    Returns None if the element has no content or children.
+    """
+    element_dict = {}
+    if hasattr(element, 'qualifier') and element.qualifier is not None:
+        element_dict['qualifier'] = element.qualifier
+    # Set the element's content as a dictionary
+    # of children elements.
+    if element.children:
+        child_dict = {}
+        for child in element.children:
+            if child.content is not None:
+                child_dict[child.tag] = child.content
+        element_dict['content'] = child_dict
+    # Set element content that is not children.
+    elif element.content is not None:
+        if element.content.strip() != '':
+            element_dict['content'] = element.content
+    if element_dict.get('content', False):
+        return element_dict
+    return None
+
+
 def pydict2xml(filename, metadata_dict, **kwargs):
     """Create an XML file.
 
@@ -73,6 +88,19 @@ def pydict2xml(filename, metadata_dict, **kwargs):
 
 def pydict2xmlstring(metadata_dict, **kwargs):
     """Create an XML string from a metadata dictionary."""
+    return XML_DECLARATION + tostring(
+        pydict2xmlelement(metadata_dict, **kwargs),
+        encoding='UTF-8',
+        xml_declaration=False,
+        pretty_print=True
+    )
+
+
+def pydict2xmlelement(metadata_dict, **kwargs):
+    """Create an XML element tree from a metadata dictionary.
+
+    Takes the same keyword arguments as pydict2xmlstring.
+    """
     ordering = kwargs.get('ordering', UNTL_XML_ORDER)
     root_label = kwargs.get('root_label', 'metadata')
     root_namespace = kwargs.get('root_namespace', None)
@@ -125,13 +153,7 @@ def pydict2xmlstring(metadata_dict, **kwargs):
                         element['content'],
                         namespace=elements_namespace,
                     )
-    # Create the XML tree.
-    return b'<?xml version="1.0" encoding="UTF-8"?>\n' + tostring(
-        root,
-        encoding='UTF-8',
-        xml_declaration=False,
-        pretty_print=True
-    )
+    return root
 
 
 def create_dict_subelement(root, subelement, content, **kwargs):
@@ -157,16 +179,113 @@ def create_dict_subelement(root, subelement, content, **kwargs):
             sub_descriptors.text = value
 
 
+def record2xmlelement(record, **kwargs):
+    """Create an XML element tree from a UNTL Python object or dictionary.
+
+    Keyword arguments are passed on to pydict2xmlelement for dictionaries.
+    """
+    if isinstance(record, dict):
+        return pydict2xmlelement(record, **kwargs)
+    return record.create_xml()
+
+
+class UNTLXMLWriter(object):
+    """Write UNTL records to a binary file object one at a time.
+
+    With a wrapper, the records are written as children of a single
+    wrapper element, making one XML document. With wrapper set to None,
+    every record is written as an XML document of its own, one after
+    another. Only the record being written is held in memory, so any
+    number of records can be written.
+
+    with open('collection.untl.xml', 'wb') as f:
+        with UNTLXMLWriter(f) as writer:
+            for untl_elements in records:
+                writer.write(untl_elements)
+    """
+
+    def __init__(self, output, wrapper='records', namespace_map=None, **kwargs):
+        self.output = output
+        self.wrapper = wrapper
+        self.namespace_map = namespace_map
+        # Keyword arguments for creating the XML of UNTL dictionaries.
+        self.element_kwargs = kwargs
+        self.count = 0
+        self.xml_file = None
+        self.contexts = None
+
+    def __enter__(self):
+        self.contexts = ExitStack()
+        if self.wrapper is not None:
+            self.output.write(XML_DECLARATION)
+            self.xml_file = self.contexts.enter_context(
+                xmlfile(self.output, encoding='UTF-8')
+            )
+            self.contexts.enter_context(
+                self.xml_file.element(self.wrapper, nsmap=self.namespace_map)
+            )
+            self.xml_file.write('\n')
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        contexts, self.contexts, self.xml_file = self.contexts, None, None
+        suppress = contexts.__exit__(exc_type, exc_value, traceback)
+        if self.wrapper is not None and exc_type is None:
+            # End the document with a newline, like pydict2xmlstring.
+            self.output.write(b'\n')
+        return suppress
+
+    def write(self, record):
+        """Write a UNTL Python object or UNTL dictionary."""
+        if self.contexts is None:
+            raise MetadataGeneratorException(
+                'UNTLXMLWriter must be used as a context manager.'
+            )
+        element = record2xmlelement(record, **self.element_kwargs)
+        if self.xml_file is not None:
+            self.xml_file.write(element, pretty_print=True)
+        else:
+            self.output.write(XML_DECLARATION + tostring(
+                element,
+                encoding='UTF-8',
+                xml_declaration=False,
+                pretty_print=True
+            ))
+        self.count += 1
+
+
+def write_untl_xml(output, records, wrapper='records', **kwargs):
+    """Write UNTL records to a binary file object.
+
+    Takes an iterable of UNTL Python objects or UNTL dictionaries,
+    which can be a generator such as iter_untl_records, and the same
+    arguments as UNTLXMLWriter. Returns the number of records written.
+    """
+    with UNTLXMLWriter(output, wrapper=wrapper, **kwargs) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.count
+
+
 def highwiredict2xmlstring(highwire_elements, ordering=HIGHWIRE_ORDER):
     """Create an XML string from the highwire data dictionary."""
-    # Sort the elements by the ordering list.
-    highwire_elements.sort(key=lambda obj: ordering.index(obj.name))
+    # Sort the elements by their rank in the ordering list.
+    ranks = get_order_ranks(ordering)
+    highwire_elements.sort(key=lambda obj: ranks[obj.name])
+    return highwirevalues2xmlstring(
+        [(element.name, element.content) for element in highwire_elements],
+        ordering,
+    )
+
+
+def highwirevalues2xmlstring(highwire_values, ordering=HIGHWIRE_ORDER):
+    """Create an XML string from a list of highwire name and content pairs."""
+    ranks = get_order_ranks(ordering)
     root = Element('metadata')
-    for element in highwire_elements:
-        attribs = {'name': element.name, 'content': element.content}
-        SubElement(root, 'meta', attribs)
+    for name, content in sorted(highwire_values, key=lambda value: ranks[value[0]]):
+        SubElement(root, 'meta', {'name': name, 'content': content})
     # Create the XML tree.
-    return b'<?xml version="1.0" encoding="UTF-8"?>\n' + tostring(
+    return XML_DECLARATION + tostring(
         root,
         encoding='UTF-8',
         xml_declaration=False,
@@ -181,46 +300,118 @@ def breakString(text, width=79, firstLineOffset=0):
     If externally additional text will be added to the first line,
     such as an ANVL key, use firstLineOffset to reduce the allowed
     width we have available for the line.
+
+    Lines are broken before a single space, so every line after the
+    first starts with a space.
     """
-    originalWidth = width
-    # Use firstLineOffset to adjust width allowed for this line.
-    width = width - firstLineOffset
-    if len(text) < width + 1:
-        # string all fits on one line, so return it as is.
+    length = len(text)
+    # Use firstLineOffset to adjust width allowed for the first line.
+    line_width = width - firstLineOffset
+    lines = []
+    start = 0
+    while 0 < line_width < length - start:
+        # Find the last single space the line can be broken at.
+        end = start + line_width
+        index = text.rfind(' ', start + 1, end + 1)
+        while index != -1 and not (index + 1 < length
+                                   and not text[index + 1].isspace()
+                                   and not text[index - 1].isspace()):
+            index = text.rfind(' ', start + 1, index)
+        if index == -1:
+            # There was insufficient whitespace to break the string in a way
+            # that keeps all lines under the desired width. Exceed the width.
+            break
+        lines.append(text[start:index])
+        start = index
+        line_width = width
+    if not lines:
         return text
-    index = width
-    while index > 0:
-        if ' ' == text[index]:
-            if not text[index + 1].isspace() and not text[index - 1].isspace():
-                stringPart1 = text[0:index]
-                stringPart2 = text[index:]
-                # Do not pass firstLineOffset.
-                return stringPart1 + '\n' + breakString(
-                    stringPart2,
-                    originalWidth
-                )
-
-        index = index - 1
-    # There was insufficient whitespace to break the string in a way that keeps
-    # all lines under the desired width. Exceed the width.
-    return text
+    lines.append(text[start:])
+    return '\n'.join(lines)
 
 
-def writeANVLString(ANVLDict, ordering=UNTL_XML_ORDER):
-    """Take a dictionary and write out the key/value pairs
-    in ANVL format.
+def iter_anvl_lines(ANVLDict, ordering=UNTL_XML_ORDER):
+    """Iterate over the ANVL lines of a dictionary's key/value pairs.
+
+    Long values are broken over continuation lines, which are
+    yielded as part of the line they continue.
     """
-    lines = []
     # Loop through the ordering for the data.
     for key in ordering:
         # Make sure the element exists in the data set.
         if key in ANVLDict:
-            # Get the list of elements.
-            element_list = ANVLDict[key]
+            offset = len(key) + 1
             # Loop through the element contents.
-            for element in element_list:
+            for element in ANVLDict[key]:
                 value = element.get('content', '')
-                offset = len(key) + 1
-                line = '%s: %s' % (key, breakString(value, 79, offset))
-                lines.append(line)
-    return '\n'.join(lines)
+                yield '%s: %s' % (key, breakString(value, 79, offset))
+
+
+def writeANVLString(ANVLDict, ordering=UNTL_XML_ORDER):
+    """Take a dictionary and write out the key/value pairs
+    in ANVL format.
+    """
+    return '\n'.join(iter_anvl_lines(ANVLDict, ordering))
+
+
+# Comment line written for a record without values, which would
+# otherwise be written as nothing.
+EMPTY_ANVL_RECORD = '# empty record'
+
+
+class ANVLWriter(object):
+    """Write ANVL records to a binary file object one at a time.
+
+    Each record is written as the lines writeANVLString creates,
+    encoded as UTF-8, and records are separated by a blank line. A
+    record without values is written as the EMPTY_ANVL_RECORD comment,
+    so it is read back as an empty record. Only the record being
+    written is held in memory, so any number of records can be
+    written.
+
+    with open('collection.anvl', 'wb') as f:
+        with ANVLWriter(f, ordering=DC_ORDER) as writer:
+            for dc_dict in dc_dicts:
+                writer.write(dc_dict)
+    """
+
+    def __init__(self, output, ordering=UNTL_XML_ORDER):
+        self.output = output
+        self.ordering = ordering
+        self.count = 0
+        self.is_open = False
+
+    def __enter__(self):
+        self.is_open = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.is_open = False
+        return False
+
+    def write(self, record):
+        """Write a dictionary, or the dictionary of a Python object."""
+        if not self.is_open:
+            raise MetadataGeneratorException(
+                'ANVLWriter must be used as a context manager.'
+            )
+        if not isinstance(record, dict):
+            record = py2dict(record)
+        text = writeANVLString(record, self.ordering) or EMPTY_ANVL_RECORD
+        if self.count:
+            text = '\n' + text
+        self.output.write((text + '\n').encode('utf-8'))
+        self.count += 1
+
+
+def write_anvl(output, records, ordering=UNTL_XML_ORDER):
+    """Write ANVL records to a binary file object.
+
+    Takes an iterable of dictionaries or Python objects, such as DC
+    or highwire dictionaries, and the ordering of their keys. Returns
+    the number of records written.
+    """
+    with ANVLWriter(output, ordering=ordering) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.count
@@ -0,0 +1,332 @@
+"""
+    Build OAI-PMH responses for UNTL records.
+
+    Responses are written to a binary file object one record at a time,
+    in the oai_dc format or the native UNTL format, without creating an
+    XML document for each record:
+    from pyuntl.oai import OAIResponseBuilder
+    builder = OAIResponseBuilder('https://example.com/oai/', page_size=100)
+    resumption_token = builder.list_records(output, records, 'oai_dc')
+
+    Records can be UNTL dictionaries or UNTL Python objects. Lists longer
+    than the page size are split into pages, each ending with an opaque
+    resumption token for requesting the next page.
+"""
+import base64
+import datetime
+import json
+import re
+from contextlib import contextmanager
+from itertools import islice
+
+from lxml.etree import xmlfile
+
+from pyuntl.metadata_generator import XML_DECLARATION, XSI
+from pyuntl.untldoc import (DCConverter, dcdict2xmlelement, dcpy2dict, untldict2py,
+                            untlpy2dcpy)
+
+
+OAI_NAMESPACE = 'http://www.openarchives.org/OAI/2.0/'
+OAI = '{%s}' % OAI_NAMESPACE
+OAI_SCHEMA_LOCATION = ('http://www.openarchives.org/OAI/2.0/ '
+                       'http://www.openarchives.org/OAI/2.0/OAI-PMH.xsd')
+
+DEFAULT_PAGE_SIZE = 100
+
+# Matches the dates of the UNTL meta elements, such as "2008-06-29, 00:31:14".
+META_DATE_REGEX = re.compile(
+    r'^(\d{4})-(\d{2})-(\d{2})(?:,?\s+(\d{2}):(\d{2}):(\d{2}))?'
+)
+
+
+class OAIException(Exception):
+    """Base exception for OAI-PMH responses.
+
+    The code is the OAI-PMH error code to respond with, if any.
+    """
+
+    def __init__(self, value, code=None):
+        self.value = value
+        self.code = code
+
+    def __str__(self):
+        return '%s' % (self.value,)
+
+
+def untl2oai_dc(record, dc_converter=None, **kwargs):
+    """Create the oai_dc XML element tree of a UNTL record.
+
+    dc_converter is a DCConverter to convert the record with, so that
+    many records are converted with vocabularies retrieved once.
+    """
+    if isinstance(record, dict):
+        record = untldict2py(record)
+    if dc_converter is None:
+        dc_elements = untlpy2dcpy(record, **kwargs)
+    else:
+        dc_elements = dc_converter.untlpy2dcpy(record, **kwargs)
+    return dcdict2xmlelement(dcpy2dict(dc_elements))
+
+
+def untl2untl(record, **kwargs):
+    """Create the namespaced UNTL XML element tree of a UNTL record."""
+    if isinstance(record, dict):
+        record = untldict2py(record)
+    return record.create_xml(useNamespace=True)
+
+
+# Functions creating the XML of each metadata format, keyed by prefix.
+METADATA_FORMATS = {
+    'oai_dc': untl2oai_dc,
+    'untl': untl2untl,
+}
+
+
+def get_record_values(record, tag):
+    """Get the qualifier and content of a UNTL record's elements with a tag."""
+    if isinstance(record, dict):
+        return [(element.get('qualifier'), element.get('content'))
+                for element in record.get(tag, [])]
+    return [(element.qualifier, element.content) for element in record.find(tag)]
+
+
+def format_datestamp(meta_date):
+    """Convert a UNTL meta date into an OAI-PMH datestamp.
+
+    Datestamps are always at the granularity of seconds, as the
+    datestamps of a response must all have the same granularity, so
+    a date without a time is at midnight.
+    """
+    date_match = META_DATE_REGEX.match(meta_date or '')
+    if not date_match:
+        raise OAIException('Could not get a datestamp from "%s".' % (meta_date,))
+    year, month, day, hour, minute, second = date_match.groups()
+    if hour is None:
+        hour, minute, second = '00', '00', '00'
+    return '%s-%s-%sT%s:%s:%sZ' % (year, month, day, hour, minute, second)
+
+
+def record_header(record):
+    """Get the OAI-PMH header of a UNTL record.
+
+    Returns the identifier, made from the record's ark, the datestamp
+    of the metadata modification date, or the creation date if it has
+    not been modified, and the set specs of the record's institutions
+    and collections.
+    """
+    meta = {}
+    for qualifier, content in get_record_values(record, 'meta'):
+        meta.setdefault(qualifier, content)
+    ark = meta.get('ark')
+    if not ark or not ark.startswith('ark:'):
+        raise OAIException('Record has no ark to identify it.')
+    identifier = 'info:ark' + ark[len('ark:'):]
+    datestamp = format_datestamp(
+        meta.get('metadataModificationDate') or meta.get('metadataCreationDate')
+    )
+    set_specs = ['partner:%s' % content
+                 for qualifier, content in get_record_values(record, 'institution')]
+    set_specs.extend('collection:%s' % content
+                     for qualifier, content in get_record_values(record, 'collection'))
+    return identifier, datestamp, set_specs
+
+
+def encode_resumption_token(arguments):
+    """Encode the arguments of a list request as a resumption token."""
+    token_json = json.dumps(arguments, sort_keys=True, separators=(',', ':'))
+    return base64.urlsafe_b64encode(token_json.encode('utf-8')).rstrip(b'=').decode('ascii')
+
+
+def decode_resumption_token(resumption_token):
+    """Decode the arguments of a list request from a resumption token.
+
+    Raises an OAIException with the badResumptionToken code if the
+    token is not one created by encode_resumption_token.
+    """
+    try:
+        padding = '=' * (-len(resumption_token) % 4)
+        arguments = json.loads(
+            base64.urlsafe_b64decode((resumption_token + padding).encode('ascii'))
+        )
+    except (ValueError, TypeError, UnicodeError):
+        arguments = None
+    if (not isinstance(arguments, dict)
+            or not isinstance(arguments.get('cursor'), int)
+            or arguments['cursor'] < 0
+            or arguments.get('metadataPrefix') not in METADATA_FORMATS):
+        raise OAIException(
+            'The resumption token "%s" is not valid.' % (resumption_token,),
+            'badResumptionToken',
+        )
+    return arguments
+
+
+def format_response_date(response_date=None):
+    """Format a UTC datetime, or the current time, as an OAI-PMH date."""
+    if response_date is None:
+        response_date = datetime.datetime.now(datetime.timezone.utc)
+    return response_date.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def write_text_element(xml_file, tag, text, attrib=None):
+    """Write an element holding only text to an lxml xmlfile."""
+    with xml_file.element(tag, attrib):
+        xml_file.write(text)
+
+
+class OAIResponseBuilder(object):
+    """Write OAI-PMH responses for UNTL records.
+
+    base_url is the URL of the OAI-PMH endpoint, and page_size the
+    number of records in each page of a list. get_header takes a record
+    and returns its identifier, datestamp and set specs. Any other
+    keyword arguments are passed to DCConverter, such as resolve_values
+    and verbose_vocabularies, which converts every oai_dc record.
+    """
+
+    def __init__(self, base_url, page_size=DEFAULT_PAGE_SIZE, get_header=record_header,
+                 **kwargs):
+        self.base_url = base_url
+        self.page_size = page_size
+        self.get_header = get_header
+        self.dc_converter = DCConverter(**kwargs)
+
+    def get_converter(self, metadata_prefix):
+        """Get the function creating the XML of a metadata format."""
+        if metadata_prefix not in METADATA_FORMATS:
+            raise OAIException(
+                'The metadata format "%s" is not supported.' % (metadata_prefix,),
+                'cannotDisseminateFormat',
+            )
+        return METADATA_FORMATS[metadata_prefix]
+
+    @contextmanager
+    def response(self, output, request_arguments, response_date=None):
+        """Write the OAI-PMH element and the request around a response."""
+        output.write(XML_DECLARATION)
+        with xmlfile(output, encoding='UTF-8') as xml_file:
+            with xml_file.element(
+                OAI + 'OAI-PMH',
+                {'{%s}schemaLocation' % XSI: OAI_SCHEMA_LOCATION},
+                nsmap={None: OAI_NAMESPACE, 'xsi': XSI},
+            ):
+                write_text_element(xml_file, OAI + 'responseDate',
+                                   format_response_date(response_date))
+                write_text_element(xml_file, OAI + 'request', self.base_url,
+                                   request_arguments)
+                yield xml_file
+        output.write(b'\n')
+
+    def prepare_record(self, record, converter):
+        """Get the header and metadata XML of a record to write.
+
+        Errors in the record, such as a missing ark, are raised here,
+        so that they are raised before a response is started.
+        """
+        return self.get_header(record), converter(record, dc_converter=self.dc_converter)
+
+    def write_record(self, xml_file, header, metadata):
+        """Write a record with its header and metadata, as returned
+        by prepare_record.
+        """
+        identifier, datestamp, set_specs = header
+        with xml_file.element(OAI + 'record'):
+            with xml_file.element(OAI + 'header'):
+                write_text_element(xml_file, OAI + 'identifier', identifier)
+                write_text_element(xml_file, OAI + 'datestamp', datestamp)
+                for set_spec in set_specs:
+                    write_text_element(xml_file, OAI + 'setSpec', set_spec)
+            with xml_file.element(OAI + 'metadata'):
+                xml_file.write(metadata)
+
+    def list_records(self, output, records, metadata_prefix=None, resumption_token=None,
+                     request_arguments=None, complete_list_size=None, offset=0,
+                     response_date=None):
+        """Write a page of a ListRecords response.
+
+        records is an iterable of all the records of the list, or of
+        the records from position offset onward, so that a database
+        query can start at the page requested by a resumption token.
+        The set, from and until arguments of the request can be given
+        in request_arguments, and are kept in the resumption tokens;
+        use decode_resumption_token to get them back. Only the records
+        of the requested page are read from the iterable.
+
+        The headers and metadata of the page's records are all created
+        before the response is written, and are held in memory until
+        then, so that an error in any record of the page is raised
+        before anything is written.
+
+        Returns the resumption token of the next page, or None if this
+        is the last page. Raises an OAIException, before anything is
+        written, for an error response or a record without a header.
+        """
+        if resumption_token is not None:
+            token_arguments = decode_resumption_token(resumption_token)
+            cursor = token_arguments.pop('cursor')
+            request = {'verb': 'ListRecords', 'resumptionToken': resumption_token}
+        else:
+            token_arguments = dict(request_arguments or {}, metadataPrefix=metadata_prefix)
+            cursor = 0
+            request = dict(token_arguments, verb='ListRecords')
+        converter = self.get_converter(token_arguments['metadataPrefix'])
+        if cursor < offset:
+            raise OAIException(
+                'Records before position %s were not given.' % (offset,),
+                'badResumptionToken',
+            )
+        records = iter(records)
+        page = [
+            self.prepare_record(record, converter)
+            for record in islice(records, cursor - offset, cursor - offset + self.page_size)
+        ]
+        if not page:
+            if cursor:
+                raise OAIException('The resumption token is past the end of the list.',
+                                   'badResumptionToken')
+            raise OAIException('No records match the request.', 'noRecordsMatch')
+        next_cursor = cursor + self.page_size
+        if complete_list_size is not None:
+            has_more = next_cursor < complete_list_size
+        else:
+            # Check that the list goes on past this page.
+            has_more = next(islice(records, 1), None) is not None
+        next_token = None
+        if has_more:
+            next_token = encode_resumption_token(dict(token_arguments, cursor=next_cursor))
+        with self.response(output, request, response_date) as xml_file:
+            with xml_file.element(OAI + 'ListRecords'):
+                for header, metadata in page:
+                    self.write_record(xml_file, header, metadata)
+                # Every page of a list split into pages ends with a
+                # resumption token, which is empty on the last page.
+                if has_more or cursor:
+                    token_attributes = {'cursor': str(cursor)}
+                    if complete_list_size is not None:
+                        token_attributes['completeListSize'] = str(complete_list_size)
+                    write_text_element(xml_file, OAI + 'resumptionToken', next_token or '',
+                                       token_attributes)
+        return next_token
+
+    def get_record(self, output, record, metadata_prefix, identifier=None,
+                   response_date=None):
+        """Write a GetRecord response.
+
+        identifier is the identifier requested, which defaults to the
+        identifier in the record's header.
+        """
+        converter = self.get_converter(metadata_prefix)
+        header, metadata = self.prepare_record(record, converter)
+        if identifier is None:
+            identifier = header[0]
+        request = {'verb': 'GetRecord', 'identifier': identifier,
+                   'metadataPrefix': metadata_prefix}
+        with self.response(output, request, response_date) as xml_file:
+            with xml_file.element(OAI + 'GetRecord'):
+                self.write_record(xml_file, header, metadata)
+
+    def write_error(self, output, code, message, request_arguments=None,
+                    response_date=None):
+        """Write an error response, such as for an OAIException."""
+        with self.response(output, request_arguments or {}, response_date) as xml_file:
+            write_text_element(xml_file, OAI + 'error', message, {'code': code})
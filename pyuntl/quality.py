@@ -1,4 +1,12 @@
 import re
+from array import array
+
+from pyuntl.metadata_generator import element2dict
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 # These are common legacy values for attributes that do not have data.
@@ -23,6 +31,169 @@ PYUNTL_COMPLETENESS_SCORED_ATTRIBUTES = [
     'meta',
 ]
 
+# Weights of the scored children, in the order their scores are summed.
+COMPLETENESS_WEIGHTS = {
+    'title': 10,
+    'description': 1,
+    'language': 1,
+    'collection': 10,
+    'institution': 10,
+    'resourceType': 5,
+    'format': 1,
+    'subject': 1,
+    'meta': 20,
+}
+
+# Matches content that is a legacy placeholder or holds a new default
+# placeholder, as a single check.
+PLACEHOLDER_REGEX = re.compile(
+    r'(?:%s)\Z|[\s\S]*?%s' % (
+        '|'.join(re.escape(value) for value in COMMON_DEFAULT_ATTRIBUTE_VALUES),
+        DEFAULT_VALUE_REGEX.pattern,
+    ),
+    re.IGNORECASE,
+)
+
+
+class QualityException(Exception):
+    """Base exception for metadata quality."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return '%s' % (self.value,)
+
+
+class CompletenessScorer(object):
+    """Score the completeness of many records with the same weights.
+
+    Weights map the tags of the scored children to their weights, and
+    are summed once when the scorer is created. Records can be UNTL
+    Python objects or UNTL dictionaries.
+    """
+
+    def __init__(self, weights=None):
+        if weights is None:
+            weights = COMPLETENESS_WEIGHTS
+        self.fields = tuple(weights)
+        self.weights = tuple(weights[field] for field in self.fields)
+        self.total_points = sum(self.weights)
+        self.field_index = {field: i for i, field in enumerate(self.fields)}
+
+    def is_present(self, tag, qualifier, content):
+        """Determine if an element counts toward completeness."""
+        # Content of elements with children is not scored.
+        if not content or not isinstance(content, str):
+            return False
+        # Only consider <meta qualifier="system"> records.
+        if tag == 'meta' and qualifier != 'system':
+            return False
+        # The content is not a placeholder.
+        return PLACEHOLDER_REGEX.match(content) is None
+
+    def presence(self, record):
+        """Get a list of flags of the scored fields present in a record."""
+        present = [False] * len(self.fields)
+        if isinstance(record, dict):
+            for i, field in enumerate(self.fields):
+                for element in record.get(field, ()):
+                    content = element.get('content')
+                    # Strip the content, as setting it on an element does.
+                    if isinstance(content, str):
+                        content = content.strip()
+                    if self.is_present(field, element.get('qualifier'), content):
+                        present[i] = True
+                        break
+        else:
+            field_index = self.field_index
+            is_present = self.is_present
+            for element in record.children:
+                tag = element.tag
+                i = field_index.get(tag)
+                # Skip elements not scored or already found present.
+                if i is None or present[i]:
+                    continue
+                if is_present(tag, element.qualifier, element.content):
+                    present[i] = True
+        return present
+
+    def score(self, record):
+        """Calculate the completeness of a record as a float 0.0 - 1.0."""
+        points = 0.0
+        for present, weight in zip(self.presence(record), self.weights):
+            if present:
+                points += weight
+        return points / self.total_points
+
+    def score_batch(self, records, use_numpy=False, with_presence=False):
+        """Calculate the completeness of many records.
+
+        Returns an array('d') of the scores, in the order of the records.
+        With use_numpy, a NumPy float array is returned instead.
+
+        With with_presence, a presence matrix is returned along with the
+        scores. Using NumPy it is a boolean array with a row per record
+        and a column per field of the scorer's fields. Otherwise, it is
+        a dictionary of an array('B') of 0s and 1s for each field.
+        """
+        if use_numpy:
+            if numpy is None:
+                raise QualityException('NumPy is required to score with use_numpy.')
+            # Collect the flags of every record as rows of a flat matrix.
+            flags = bytearray()
+            for record in records:
+                flags.extend(self.presence(record))
+            presence = numpy.frombuffer(flags, dtype=numpy.uint8).reshape(
+                -1, len(self.fields)
+            )
+            scores = presence @ numpy.array(self.weights, dtype=numpy.float64)
+            scores /= self.total_points
+            if with_presence:
+                return scores, presence.astype(bool)
+            return scores
+        scores = array('d')
+        columns = {field: array('B') for field in self.fields}
+        for record in records:
+            points = 0.0
+            present = self.presence(record)
+            for is_present, weight in zip(present, self.weights):
+                if is_present:
+                    points += weight
+            scores.append(points / self.total_points)
+            if with_presence:
+                for field, is_present in zip(self.fields, present):
+                    columns[field].append(is_present)
+        if with_presence:
+            return scores, columns
+        return scores
+
+
+DEFAULT_COMPLETENESS_SCORER = CompletenessScorer()
+
+# Scorers of the completeness profiles, by name.
+COMPLETENESS_PROFILES = {
+    'default': DEFAULT_COMPLETENESS_SCORER,
+}
+
+
+def register_completeness_profile(name, weights):
+    """Register weights for scoring completeness as a named profile.
+
+    Returns the profile's scorer. The profile's name can then be passed
+    to the get_completeness method of UNTL elements.
+    """
+    scorer = COMPLETENESS_PROFILES[name] = CompletenessScorer(weights)
+    return scorer
+
+
+def get_completeness_scorer(profile='default'):
+    """Get the scorer of a registered completeness profile."""
+    try:
+        return COMPLETENESS_PROFILES[profile]
+    except KeyError:
+        raise QualityException('Completeness profile "%s" is not registered.' % (profile,))
+
 
 def determine_completeness(py_untl):
     """Take a Python untl and calculate the completeness.
@@ -30,47 +201,66 @@ def determine_completeness(py_untl):
     Completeness is based on this: metadata_quality.rst documentation.
     Returns a float 0.0 - 1.0.
     """
-    # Default values for the completeness dictionary.
-    completeness_dict = {
-        'title': {'present': False, 'weight': 10, },
-        'description': {'present': False, 'weight': 1, },
-        'language': {'present': False, 'weight': 1, },
-        'collection': {'present': False, 'weight': 10, },
-        'institution': {'present': False, 'weight': 10, },
-        'resourceType': {'present': False, 'weight': 5, },
-        'format': {'present': False, 'weight': 1, },
-        'subject': {'present': False, 'weight': 1, },
-        'meta': {'present': False, 'weight': 20, },
-    }
-
-    total_points = sum(item['weight'] for item in completeness_dict.values())
-    py_untl_object_score = 0.0
-
-    # Iterate through the attributes of the pyuntl record.
-    # This loop will toggle the Boolean for scoring.
-    for i in py_untl.children:
-        # Process attribute that is scorable and has content.
-        if i.tag in PYUNTL_COMPLETENESS_SCORED_ATTRIBUTES:
-            if i.content:
-                content = i.content.lower()
-                # Try and match against new default placeholders.
-                match = bool(DEFAULT_VALUE_REGEX.search(content))
-                # The content is not a legacy placeholder.
-                if content not in COMMON_DEFAULT_ATTRIBUTE_VALUES and not match:
-                    # Only consider <meta qualifier="system"> records.
-                    if i.tag == 'meta':
-                        if i.qualifier == 'system':
-                            completeness_dict['%s' % i.tag]['present'] = True
-                    else:
-                        completeness_dict['%s' % i.tag]['present'] = True
-    # Get total score of the pyuntl object.
-    for k, v in completeness_dict.items():
-        # If presence was toggled true, adjust score based on weight.
-        if v['present']:
-            py_untl_object_score += completeness_dict[k]['weight']
-    # Calculate the float score completeness.
-    completeness = py_untl_object_score / total_points
-    return completeness
+    return DEFAULT_COMPLETENESS_SCORER.score(py_untl)
+
+
+def score_completeness(records, weights=None, use_numpy=False, with_presence=False):
+    """Calculate the completeness of many UNTL Python objects or dictionaries.
+
+    See CompletenessScorer.score_batch for what is returned.
+    """
+    if weights is None:
+        scorer = DEFAULT_COMPLETENESS_SCORER
+    else:
+        scorer = CompletenessScorer(weights)
+    return scorer.score_batch(records, use_numpy=use_numpy, with_presence=with_presence)
+
+
+def sequence_repr_length(item_lengths):
+    """Get the length of a list or dictionary as a string, from the
+    lengths of its items.
+    """
+    # Items are separated by ", " and enclosed in brackets.
+    return sum(item_lengths) + 2 * max(len(item_lengths) - 1, 0) + 2
+
+
+def element_group_lengths(py_untl):
+    """Get the length as a string of each element list in the record's
+    dictionary, by tag.
+
+    Only the dictionaries of single elements are made into strings,
+    never the whole record's.
+    """
+    item_lengths = {}
+    for element in py_untl.children:
+        lengths = item_lengths.setdefault(element.tag, [])
+        element_dict = element2dict(element)
+        if element_dict is not None:
+            lengths.append(len(repr(element_dict)))
+    return {tag: sequence_repr_length(lengths) for tag, lengths in item_lengths.items()}
+
+
+def untl_dict_length(group_lengths, excluded_tags=()):
+    """Get the length of a record's dictionary as a string, from the
+    lengths of its element lists.
+    """
+    return sequence_repr_length([
+        # Each item is "'tag': [...]".
+        len(repr(tag)) + 2 + length
+        for tag, length in group_lengths.items() if tag not in excluded_tags
+    ])
+
+
+def record_length(py_untl):
+    """Calculate the length of a record's dictionary as a string."""
+    return untl_dict_length(element_group_lengths(py_untl))
+
+
+def record_content_length(py_untl):
+    """Calculate the length of a record's dictionary as a string,
+    excluding the meta elements.
+    """
+    return untl_dict_length(element_group_lengths(py_untl), excluded_tags=('meta',))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,209 @@
+"""
+    Write the RDF of many DC records without building rdflib graphs.
+
+    The triples of each DC dictionary are written straight to a binary
+    file object as N-Triples, Turtle or RDF/XML:
+    from pyuntl.rdf_generator import write_rdf
+    with open('collection.nt', 'wb') as f:
+        write_rdf(f, dc_dicts, rdf_format='nt')
+
+    The triples are the same as dcdict2rdfpy adds to its graph. For
+    working with rdflib, dcdicts2rdfpy loads many records into one
+    shared graph instead.
+"""
+import re
+from contextlib import ExitStack
+
+from lxml.etree import xmlfile
+from rdflib import ConjunctiveGraph, Literal, Namespace, URIRef
+
+from pyuntl import DC_ORDER
+from pyuntl.metadata_generator import XML_DECLARATION
+
+
+DC_NAMESPACE = 'http://purl.org/dc/elements/1.1/'
+RDF_NAMESPACE = 'http://www.w3.org/1999/02/22-rdf-syntax-ns#'
+RDF = '{%s}' % RDF_NAMESPACE
+DC = '{%s}' % DC_NAMESPACE
+
+# Prefix of the identifier holding a record's ark.
+ARK_PREFIX = 'ark: ark:'
+
+RDF_FORMATS = ('nt', 'turtle', 'xml')
+
+# Characters to escape in a quoted N-Triples or Turtle literal.
+LITERAL_ESCAPE_REGEX = re.compile(r'[\\"\n\r]')
+LITERAL_ESCAPES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r'}
+
+# Characters not allowed in an N-Triples or Turtle IRI.
+IRI_ESCAPE_REGEX = re.compile(r'[\x00-\x20<>"{}|^`\\]')
+
+
+class RDFGeneratorException(Exception):
+    """Base exception for RDF generation."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return '%s' % (self.value,)
+
+
+def get_subject_uri(dc_dict):
+    """Get the URI of a DC record from its ark identifier."""
+    uri = ''
+    for element_value in dc_dict['identifier']:
+        if element_value['content'].startswith(ARK_PREFIX):
+            uri = element_value['content'].replace(ARK_PREFIX, 'info:ark')
+    return uri
+
+
+def is_uri_value(content):
+    """Determine if a DC value is written as a URI instead of a literal."""
+    return 'http' in content and ' ' not in content
+
+
+def dcdict2triples(dc_dict):
+    """Get the triples of a DC dictionary.
+
+    Returns the record's URI and a list of the element name, content
+    and whether the content is a URI, for each value.
+    """
+    triples = []
+    # Get the values for each element in the ordered DC elements.
+    for element_name in DC_ORDER:
+        for element_value in dc_dict.get(element_name, []):
+            content = element_value['content']
+            triples.append((element_name, content, is_uri_value(content)))
+    return get_subject_uri(dc_dict), triples
+
+
+def dcdicts2rdfpy(dc_dicts, rdf_py=None):
+    """Add the triples of many DC dictionaries to one RDF Python object.
+
+    A new ConjunctiveGraph is created unless a graph is given.
+    """
+    if rdf_py is None:
+        rdf_py = ConjunctiveGraph()
+    dc_namespace = Namespace(DC_NAMESPACE)
+    # Bind the prefix/namespace pair.
+    rdf_py.bind('dc', dc_namespace)
+    # Triples are added to the default graph of a ConjunctiveGraph.
+    context = getattr(rdf_py, 'default_context', rdf_py)
+    for dc_dict in dc_dicts:
+        uri, triples = dcdict2triples(dc_dict)
+        subject = URIRef(uri)
+        rdf_py.addN(
+            (subject, dc_namespace[element_name],
+             URIRef(content) if is_uri else Literal(content), context)
+            for element_name, content, is_uri in triples
+        )
+    return rdf_py
+
+
+def escape_literal(content):
+    """Quote a literal for N-Triples or Turtle."""
+    return '"%s"' % LITERAL_ESCAPE_REGEX.sub(
+        lambda match: LITERAL_ESCAPES[match.group()], content
+    )
+
+
+def escape_iri(iri):
+    """Enclose an IRI for N-Triples or Turtle."""
+    return '<%s>' % IRI_ESCAPE_REGEX.sub(
+        lambda match: '\\u%04X' % ord(match.group()), iri
+    )
+
+
+def format_object(content, is_uri):
+    """Format the object of a triple for N-Triples or Turtle."""
+    if is_uri:
+        return escape_iri(content)
+    return escape_literal(content)
+
+
+class RDFWriter(object):
+    """Write the RDF of DC records to a binary file object one at a time.
+
+    rdf_format is one of RDF_FORMATS: 'nt' for N-Triples, 'turtle' or
+    'xml' for RDF/XML. Only the record being written is held in memory.
+
+    with open('collection.ttl', 'wb') as f:
+        with RDFWriter(f, rdf_format='turtle') as writer:
+            for dc_dict in dc_dicts:
+                writer.write(dc_dict)
+    """
+
+    def __init__(self, output, rdf_format='nt'):
+        if rdf_format not in RDF_FORMATS:
+            raise RDFGeneratorException('RDF format "%s" is not supported.' % (rdf_format,))
+        self.output = output
+        self.rdf_format = rdf_format
+        self.count = 0
+        self.xml_file = None
+        self.contexts = None
+
+    def __enter__(self):
+        self.contexts = ExitStack()
+        if self.rdf_format == 'turtle':
+            self.output.write(('@prefix dc: <%s> .\n' % (DC_NAMESPACE,)).encode('utf-8'))
+        elif self.rdf_format == 'xml':
+            self.output.write(XML_DECLARATION)
+            self.xml_file = self.contexts.enter_context(
+                xmlfile(self.output, encoding='UTF-8')
+            )
+            self.contexts.enter_context(self.xml_file.element(
+                RDF + 'RDF', nsmap={'rdf': RDF_NAMESPACE, 'dc': DC_NAMESPACE}
+            ))
+            self.xml_file.write('\n')
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        contexts, self.contexts, self.xml_file = self.contexts, None, None
+        suppress = contexts.__exit__(exc_type, exc_value, traceback)
+        if self.rdf_format == 'xml' and exc_type is None:
+            self.output.write(b'\n')
+        return suppress
+
+    def write(self, dc_dict):
+        """Write the triples of a DC dictionary."""
+        if self.contexts is None:
+            raise RDFGeneratorException('RDFWriter must be used as a context manager.')
+        uri, triples = dcdict2triples(dc_dict)
+        if self.rdf_format == 'nt':
+            subject = escape_iri(uri)
+            self.output.write(''.join(
+                '%s <%s%s> %s .\n' % (subject, DC_NAMESPACE, element_name,
+                                      format_object(content, is_uri))
+                for element_name, content, is_uri in triples
+            ).encode('utf-8'))
+        elif self.rdf_format == 'turtle':
+            if triples:
+                self.output.write(('\n%s\n    %s .\n' % (escape_iri(uri), ' ;\n    '.join(
+                    'dc:%s %s' % (element_name, format_object(content, is_uri))
+                    for element_name, content, is_uri in triples
+                ))).encode('utf-8'))
+        else:
+            with self.xml_file.element(RDF + 'Description', {RDF + 'about': uri}):
+                for element_name, content, is_uri in triples:
+                    if is_uri:
+                        with self.xml_file.element(DC + element_name,
+                                                   {RDF + 'resource': content}):
+                            pass
+                    else:
+                        with self.xml_file.element(DC + element_name):
+                            self.xml_file.write(content)
+            self.xml_file.write('\n')
+        self.count += 1
+
+
+def write_rdf(output, dc_dicts, rdf_format='nt'):
+    """Write the RDF of DC dictionaries to a binary file object.
+
+    Takes an iterable of DC dictionaries, such as dcpy2dict returns.
+    Returns the number of records written.
+    """
+    with RDFWriter(output, rdf_format=rdf_format) as writer:
+        for dc_dict in dc_dicts:
+            writer.write(dc_dict)
+    return writer.count
@@ -0,0 +1,263 @@
+"""
+    Cache the rendered outputs of UNTL records by record version.
+
+    Records change rarely, but their highwire meta tags, DC and ANVL
+    text (the dc-txt and highwire-txt formats) are rendered on every
+    view. A RenderCache keeps each output under the record's version
+    hash from get_full_record_version:
+    from pyuntl.render_cache import RenderCache
+    render_cache = RenderCache(escape=True)
+    meta_tags = render_cache.render(untl_elements, 'highwire-xml')
+
+    The output formats are those of pyuntl.batch. Any change to a
+    record, including its metadata modification date and modifier,
+    gives it a new version, so it is rendered again and the outputs of
+    its old version are never returned. They are evicted once they
+    are the least recently used. When vocabulary values or URLs are
+    resolved, the keys also hold the version of the vocabularies, so
+    outputs are rendered again once the vocabularies change.
+
+    Outputs are kept in memory by default. To share them between the
+    processes of a server, keep them in a dbm file:
+    from pyuntl.render_cache import DBMRenderStore
+    render_cache = RenderCache(DBMRenderStore('/var/cache/untl-render'))
+"""
+import dbm
+import threading
+from collections import OrderedDict
+
+from pyuntl.batch import CONVERSION_DISPATCH
+from pyuntl.untl_structure import get_vocabularies_version
+from pyuntl.untldoc import generate_hash, get_full_record_version, retrieve_vocab
+from pyuntl.vocabulary import VocabularyIndex
+
+
+# Conversion options that are not part of the cache keys. The
+# vocabularies are keyed by their version instead.
+UNKEYED_OPTIONS = ('verbose_vocabularies',)
+
+# Conversion options that resolve values with the vocabularies.
+RESOLVE_OPTIONS = ('resolve_values', 'resolve_urls')
+
+
+class RenderCacheException(Exception):
+    """Base exception for the render cache."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return '%s' % (self.value,)
+
+
+class RenderStore(object):
+    """Keep rendered outputs in memory.
+
+    max_entries: Number of outputs kept. Once it is reached, the least
+    recently used output is evicted for each one added.
+
+    Stores are safe to share between threads.
+    """
+
+    def __init__(self, max_entries=1024):
+        if max_entries < 1:
+            raise RenderCacheException('max_entries must be a positive integer.')
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Get the output stored under the key, or None."""
+        with self.lock:
+            output = self.entries.get(key)
+            if output is not None:
+                self.entries.move_to_end(key)
+            return output
+
+    def set(self, key, output):
+        """Store an output under the key, evicting the least recently used."""
+        with self.lock:
+            self.entries[key] = output
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """Discard all outputs."""
+        with self.lock:
+            self.entries.clear()
+
+
+class DBMRenderStore(RenderStore):
+    """Keep rendered outputs in a dbm file.
+
+    path: The dbm file, created if it does not exist. Outputs stored
+    by earlier processes are used.
+    max_entries: Number of outputs kept in the file. Outputs are
+    evicted in the order this process last used them, and outputs
+    already in the file count as used least recently.
+
+    Whether many processes may write the file at once depends on the
+    dbm implementation available.
+    """
+
+    def __init__(self, path, max_entries=100000):
+        super(DBMRenderStore, self).__init__(max_entries=max_entries)
+        self.path = path
+        self.db = dbm.open(path, 'c')
+        # Only the keys are kept in memory, in the order they were used.
+        for key in self.db.keys():
+            self.entries[key.decode('utf-8')] = None
+        while len(self.entries) > self.max_entries:
+            del self.db[self.entries.popitem(last=False)[0]]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get(self, key):
+        """Get the output stored under the key, or None."""
+        with self.lock:
+            data = self.db.get(key)
+            if data is None:
+                return None
+            # The output may have been stored by another process.
+            self.entries[key] = None
+            self.entries.move_to_end(key)
+        # Text is marked to be decoded, as the file holds bytes.
+        if data[:1] == b's':
+            return data[1:].decode('utf-8')
+        return data[1:]
+
+    def set(self, key, output):
+        """Store an output under the key, evicting the least recently used."""
+        if isinstance(output, str):
+            data = b's' + output.encode('utf-8')
+        else:
+            data = b'b' + output
+        with self.lock:
+            self.db[key] = data
+            self.entries[key] = None
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                evicted_key = self.entries.popitem(last=False)[0]
+                if evicted_key in self.db:
+                    del self.db[evicted_key]
+
+    def clear(self):
+        """Discard all outputs."""
+        with self.lock:
+            for key in list(self.db.keys()):
+                del self.db[key]
+            self.entries.clear()
+
+    def close(self):
+        """Close the dbm file."""
+        self.db.close()
+
+
+class RenderCache(object):
+    """Render the outputs of UNTL records, reusing those of unchanged
+    records.
+
+    store: A RenderStore. Defaults to a new in-memory store.
+    Any other kwargs are passed to the conversion of each output
+    format, as pyuntl.batch passes them. They are part of the keys,
+    except for verbose_vocabularies. If values or URLs are resolved,
+    the version of the vocabularies is part of the keys instead: a
+    hash of verbose_vocabularies if they are passed, or else the
+    version from the vocabulary store, or a hash of the vocabularies
+    get_vocabularies returns.
+    """
+
+    def __init__(self, store=None, **kwargs):
+        self.store = store if store is not None else RenderStore()
+        self.options = kwargs
+        self.options_hash = self.get_options_hash(kwargs)
+        # The vocabularies last hashed and their hash.
+        self.vocabularies_hash = (None, None)
+        self.hits = 0
+        self.misses = 0
+
+    def get_options_hash(self, options):
+        """Get a hash of the conversion options that change the output."""
+        return generate_hash(sorted(
+            (name, value) for name, value in options.items()
+            if name not in UNKEYED_OPTIONS
+        ))
+
+    def hash_vocabularies(self, vocabularies):
+        """Get a hash of the vocabularies, hashing each object once."""
+        if vocabularies is None:
+            return None
+        hashed_vocabularies, vocabularies_hash = self.vocabularies_hash
+        if hashed_vocabularies is not vocabularies:
+            if isinstance(vocabularies, VocabularyIndex):
+                vocabularies_hash = generate_hash(vocabularies.vocabularies)
+            else:
+                vocabularies_hash = generate_hash(vocabularies)
+            self.vocabularies_hash = (vocabularies, vocabularies_hash)
+        return vocabularies_hash
+
+    def get_vocabularies_version(self, options):
+        """Get the version of the vocabularies the options resolve
+        values with, or None if they resolve none.
+        """
+        if not any(options.get(name) for name in RESOLVE_OPTIONS):
+            return None
+        vocabularies = options.get('verbose_vocabularies')
+        if vocabularies:
+            return self.hash_vocabularies(vocabularies)
+        version = get_vocabularies_version()
+        if version is None:
+            # The conversion retrieves the same cached vocabularies.
+            version = self.hash_vocabularies(retrieve_vocab())
+        return version
+
+    def get_key(self, output_format, version, **kwargs):
+        """Get the key of an output of a record version.
+
+        kwargs are conversion options for this record only, such as
+        its ark.
+        """
+        options = self.options
+        options_hash = self.options_hash
+        if kwargs:
+            options = dict(options, **kwargs)
+            options_hash = self.get_options_hash(options)
+        vocabularies_version = self.get_vocabularies_version(options)
+        if vocabularies_version is not None:
+            options_hash = '%s:%s' % (options_hash, vocabularies_version)
+        return '%s:%s:%s' % (output_format, version, options_hash)
+
+    def render(self, untl_elements, output_format, version=None, **kwargs):
+        """Get an output of a UNTL Python object, rendering it if the
+        record's version has not been rendered in the format before.
+
+        version: The record's version from get_full_record_version, if
+        it is already known. Otherwise it is found here. Versions from
+        get_record_version must not be passed, as they do not change
+        with every value that is rendered.
+        Any other kwargs are conversion options for this record only.
+        """
+        if output_format not in CONVERSION_DISPATCH:
+            raise RenderCacheException(
+                'Output format "%s" is not supported.' % (output_format,)
+            )
+        if version is None:
+            version = get_full_record_version(untl_elements)
+        key = self.get_key(output_format, version, **kwargs)
+        output = self.store.get(key)
+        if output is not None:
+            self.hits += 1
+            return output
+        self.misses += 1
+        options = dict(self.options, **kwargs) if kwargs else self.options
+        output = CONVERSION_DISPATCH[output_format](untl_elements, **options)
+        self.store.set(key, output)
+        return output
@@ -0,0 +1,130 @@
+"""
+    Create Solr documents from UNTL records.
+
+    Records can be UNTL dictionaries, such as untlxml2pydict returns,
+    or UNTL Python objects:
+    from pyuntl.solr import SolrDocumentBuilder
+    from pyuntl.untldoc import iter_untl_records
+    builder = SolrDocumentBuilder()
+    for documents in builder.batches(iter_untl_records('collection.untl.xml')):
+        solr.add(documents)
+
+    Each document is a flat dictionary of Solr fields:
+    id: The last part of the record's ark, such as metapth38622.
+    ark: The record's ark.
+    untl_subject: The subjects, normalized for their qualifier.
+    untl_bs_facet: The UNTL-BS subjects, encoded for faceting.
+    dc_<element>: The values of a DC element, such as dc_title.
+    completeness: The completeness score of the record.
+    record_version: The version hash of get_record_version.
+    Fields the record has no values for are left out.
+"""
+from itertools import islice
+
+from pyuntl.quality import get_completeness_scorer
+from pyuntl.untldoc import DCConverter, dcpy2dict, get_record_version, untldict2py
+from pyuntl.util import ELEMENT_NORMALIZERS, UNTL_to_encodedUNTL
+
+
+# Elements and qualifiers normalized by default, as for untldict_normalizer.
+DEFAULT_NORMALIZATIONS = {
+    'subject': ['LCSH', 'UNTL-BS'],
+}
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class SolrDocumentBuilder(object):
+    """Create Solr documents from a stream of UNTL records.
+
+    normalizations: The qualifiers of each element to normalize, as
+    taken by untldict_normalizer.
+    completeness_profile: The registered completeness profile to score
+    the records with.
+    batch_size: The number of documents in each batch.
+
+    Any other keyword arguments are passed to DCConverter, such as
+    resolve_values and resolve_urls. The normalizers, the completeness
+    scorer and the DC converter are set up once and reused for every
+    record. If values or URLs are resolved, the vocabularies are
+    retrieved when the builder is created. If they cannot be
+    retrieved, no values are resolved, and retrieval is not tried
+    again for each record.
+    """
+
+    def __init__(self, normalizations=None, completeness_profile='default',
+                 batch_size=DEFAULT_BATCH_SIZE, **kwargs):
+        if normalizations is None:
+            normalizations = DEFAULT_NORMALIZATIONS
+        # Find the normalizer of each element and qualifier.
+        self.normalizers = {}
+        for element_type, qualifiers in normalizations.items():
+            element_normalizers = ELEMENT_NORMALIZERS.get(element_type, {})
+            for qualifier in qualifiers:
+                if qualifier in element_normalizers:
+                    self.normalizers[(element_type, qualifier)] = \
+                        element_normalizers[qualifier]
+        self.scorer = get_completeness_scorer(completeness_profile)
+        self.batch_size = batch_size
+        self.dc_converter = DCConverter(**kwargs)
+
+    def normalize(self, element_type, qualifier, content):
+        """Normalize the content of an element, if it needs it."""
+        normalizer = self.normalizers.get((element_type, qualifier))
+        if normalizer is None:
+            return content
+        return normalizer(content)
+
+    def document(self, record):
+        """Create the Solr document of a UNTL record."""
+        if isinstance(record, dict):
+            record = untldict2py(record)
+        document = {}
+        subjects = []
+        facets = []
+        for element in record.children:
+            if element.tag == 'subject' and element.content:
+                subjects.append(self.normalize('subject', element.qualifier, element.content))
+                if element.qualifier == 'UNTL-BS':
+                    facets.append(UNTL_to_encodedUNTL(element.content))
+            elif (element.tag == 'meta' and element.qualifier == 'ark'
+                  and element.content and 'ark' not in document):
+                document['id'] = element.content.rsplit('/', 1)[-1]
+                document['ark'] = element.content
+        if subjects:
+            document['untl_subject'] = subjects
+        if facets:
+            document['untl_bs_facet'] = facets
+        dc_dict = dcpy2dict(self.dc_converter.untlpy2dcpy(record))
+        for element_type, element_list in dc_dict.items():
+            if element_list:
+                document['dc_%s' % element_type] = [
+                    element['content'] for element in element_list
+                ]
+        document['completeness'] = self.scorer.score(record)
+        document['record_version'] = get_record_version(record)
+        return document
+
+    def documents(self, records):
+        """Create the Solr documents of a stream of records, one at a time."""
+        for record in records:
+            yield self.document(record)
+
+    def batches(self, records):
+        """Create the Solr documents of a stream of records, in lists of
+        batch_size documents.
+        """
+        documents = self.documents(records)
+        while True:
+            batch = list(islice(documents, self.batch_size))
+            if not batch:
+                return
+            yield batch
+
+
+def untl2solr(records, **kwargs):
+    """Create a list of Solr documents from UNTL records.
+
+    Takes the same keyword arguments as SolrDocumentBuilder.
+    """
+    return list(SolrDocumentBuilder(**kwargs).documents(records))
@@ -1,16 +1,29 @@
+import itertools
 import json
 import sys
+import threading
 import time
 import urllib.request
+from operator import attrgetter
 from lxml.etree import Element, SubElement, tostring
-from pyuntl import UNTL_XML_ORDER, VOCABULARIES_URL
+from pyuntl import UNTL_XML_ORDER, VOCABULARIES_URL, get_order_ranks
 from pyuntl.form_logic import UNTL_FORM_DISPATCH, UNTL_GROUP_DISPATCH
-from pyuntl.metadata_generator import py2dict
-from pyuntl.quality import determine_completeness
+from pyuntl.quality import (get_completeness_scorer, element_group_lengths,
+                            untl_dict_length)
+from pyuntl.vocabulary import SingleFlight, VocabularyException
 
 
 VOCAB_CACHE = dict()
 
+# Vocabulary store used by get_vocabularies instead of VOCAB_CACHE.
+VOCAB_STORE = None
+
+# Held while retrieving the vocabularies for VOCAB_CACHE.
+VOCAB_LOCK = threading.Lock()
+
+# Shares retrievals between concurrent get_vocabularies_async calls.
+VOCAB_SINGLE_FLIGHT = SingleFlight()
+
 
 class UNTLStructureException(Exception):
     """Base exception for the UNTL Python structure."""
@@ -35,6 +48,34 @@ def create_untl_xml_subelement(parent, element, prefix=''):
     return subelement
 
 
+def element_signature(element):
+    """Get the revisions of an element and its children.
+
+    The signature changes whenever the element or any of its children
+    is changed, added or removed.
+    """
+    return (element.revision, tuple(child.revision for child in element.children))
+
+
+get_revision = attrgetter('revision')
+get_children = attrgetter('children')
+
+
+def record_signature(record):
+    """Get the revisions of all the elements of a record.
+
+    The signature changes whenever any element of the record is
+    changed, added or removed.
+    """
+    children = record.children
+    grandchildren = list(map(get_children, children))
+    return (
+        tuple(map(get_revision, children)),
+        tuple(map(len, grandchildren)),
+        tuple(map(get_revision, itertools.chain.from_iterable(grandchildren))),
+    )
+
+
 def add_missing_children(required_children, element_children):
     """Determine if there are elements not in the children
     that need to be included as blank elements in the form.
@@ -53,21 +94,46 @@ def add_missing_children(required_children, element_children):
     return element_children
 
 
+# Source of element revision numbers. Every number is used once, so
+# equal revisions mean the same element in the same state.
+REVISION_COUNTER = itertools.count(1)
+
+
 class UNTLElement(object):
-    """A class for containing UNTL elements."""
+    """A class for containing UNTL elements.
+
+    The tag metadata is shared by all elements of a class, so
+    inheriting classes define it as class attributes. Instances only
+    hold their own qualifier, content, children and form.
+
+    Setting the content or qualifier gives the element a new revision
+    number, which get_record_version uses to tell which elements
+    changed since the version was last calculated. Setting the
+    qualifier also marks the tag index of the record that last indexed
+    the element to be rebuilt.
+    """
+    # The element's tag.
+    tag = None
+    # Ordered tuple of allowed child elements.
+    contained_children = ()
+    # Set of allowed child elements, built from contained_children.
+    allowed_children = frozenset()
+    # By default, objects have textual content.
+    allows_content = True
+    # By default, objects have qualifiers.
+    allows_qualifier = True
+
+    __slots__ = ('_qualifier', 'children', '_content', 'form', 'revision', 'indexed_by')
+
+    def __init_subclass__(cls, **kwargs):
+        super(UNTLElement, cls).__init_subclass__(**kwargs)
+        cls.allowed_children = frozenset(cls.contained_children)
 
     def __init__(self, **kwargs):
-        # Set all the defaults if inheriting class hasn't defined them.
-        # Set the element's tag to None if it isn't defined.
-        self.tag = getattr(self, 'tag', None)
-        # List of allowed child elements.
-        self.contained_children = getattr(self, 'contained_children', [])
-        # By default, objects have textual content.
-        self.allows_content = getattr(self, 'allows_content', True)
-        # By default, objects have qualifiers.
-        self.allows_qualifier = getattr(self, 'allows_qualifier', True)
+        # Record whose tag index holds the element, if any.
+        self.indexed_by = None
         # Element qualifier, None by default.
-        self.qualifier = getattr(self, 'qualifier', None)
+        self.qualifier = None
         # Child element wrappers go here.
         self.children = []
         # Textual content, if any.
@@ -82,6 +148,28 @@ class UNTLElement(object):
         if arg_qualifier is not None:
             self.set_qualifier(arg_qualifier)
 
+    @property
+    def qualifier(self):
+        """Element qualifier."""
+        return self._qualifier
+
+    @qualifier.setter
+    def qualifier(self, value):
+        self._qualifier = value
+        self.revision = next(REVISION_COUNTER)
+        if self.indexed_by is not None:
+            self.indexed_by.tag_index = None
+
+    @property
+    def content(self):
+        """Textual content of the element."""
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._content = value
+        self.revision = next(REVISION_COUNTER)
+
     def set_qualifier(self, value):
         """Set the qualifier for the element.
 
@@ -98,10 +186,10 @@ class UNTLElement(object):
     def add_child(self, child):
         """Add a child object to the current one.
 
-        Checks the contained_children list to make sure that the object
+        Checks the allowed children to make sure that the object
         is allowable, and throws an exception if not.
         """
-        if child.tag in self.contained_children:
+        if child.tag in self.allowed_children:
             self.children.append(child)
         else:
             raise UNTLStructureException(
@@ -131,8 +219,19 @@ class UNTLElement(object):
         content = kwargs.get('content', None)
         parent_tag = kwargs.get('parent_tag', None)
         superuser = kwargs.get('superuser', False)
+        form_cache = kwargs.get('form_cache', None)
+        # Make the form from a template, if a template cache is given.
+        if form_cache is not None:
+            self.form = form_cache.get_form(
+                UNTL_FORM_DISPATCH[self.tag],
+                vocabularies=vocabularies,
+                untl_object=self,
+                parent_tag=parent_tag,
+                superuser=superuser,
+                version=kwargs.get('vocabularies_version', None),
+            )
         # Element has both the qualifier and content.
-        if qualifier is not None and content is not None:
+        elif qualifier is not None and content is not None:
             # Create the form attribute.
             self.form = UNTL_FORM_DISPATCH[self.tag](
                 vocabularies=vocabularies,
@@ -193,19 +292,60 @@ class UNTLElement(object):
     @property
     def completeness(self):
         """Return completeness as double."""
-        return determine_completeness(self)
+        return self.get_completeness()
+
+    def get_completeness(self, profile='default'):
+        """Return completeness as double, scored with a registered profile."""
+        scorer = get_completeness_scorer(profile)
+        return self.get_metric(('completeness', scorer), scorer.score)
 
     @property
     def record_length(self):
         """Calculate full length of total record, including metadata."""
-        return len(str(py2dict(self)))
+        return untl_dict_length(self.get_metric('group_lengths', element_group_lengths))
 
     @property
     def record_content_length(self):
         """Calculate length of record, excluding metadata."""
-        untldict = py2dict(self)
-        untldict.pop('meta', None)
-        return len(str(untldict))
+        return untl_dict_length(
+            self.get_metric('group_lengths', element_group_lengths),
+            excluded_tags=('meta',),
+        )
+
+    def get_metric(self, name, calculate):
+        """Calculate a metric of the element by calling calculate with it.
+
+        Metadata elements keep the results until the record changes.
+        """
+        return calculate(self)
+
+    def get_tag_children(self, tag):
+        """Get a sequence of the children with a tag, not to be changed."""
+        return [child for child in self.children if child.tag == tag]
+
+    def get_qualified_children(self, tag, qualifier):
+        """Get a sequence of the children with a tag and qualifier,
+        not to be changed.
+        """
+        return [child for child in self.get_tag_children(tag) if child._qualifier == qualifier]
+
+    def find(self, tag, qualifier=None):
+        """Get a list of the children with a tag.
+
+        If a qualifier is given, only children with that qualifier
+        are included.
+        """
+        if qualifier is None:
+            return list(self.get_tag_children(tag))
+        return list(self.get_qualified_children(tag, qualifier))
+
+    def values(self, tag, qualifier=None):
+        """Get the content of the children with a tag that have content."""
+        if qualifier is None:
+            children = self.get_tag_children(tag)
+        else:
+            children = self.get_qualified_children(tag, qualifier)
+        return [child._content for child in children if child._content is not None]
 
 
 class FormGenerator(object):
@@ -220,8 +360,13 @@ class FormGenerator(object):
         sort_order = kwargs.get('sort_order', None)
         solr_response = kwargs.get('solr_response', None)
         superuser = kwargs.get('superuser', False)
+        # Cache of form templates, or None to build every form.
+        form_cache = kwargs.get('form_cache', None)
         # Get the vocabularies to pull the qualifiers from.
         vocabularies = self.get_vocabularies()
+        vocabularies_version = None
+        if form_cache is not None:
+            vocabularies_version = get_vocabularies_version()
         # Loop through all UNTL elements in the Python object.
         for element in children:
             # Add children that are missing from the form.
@@ -235,6 +380,8 @@ class FormGenerator(object):
                 qualifier=element.qualifier,
                 content=element.content,
                 superuser=superuser,
+                form_cache=form_cache,
+                vocabularies_version=vocabularies_version,
             )
             # Element can contain children.
             if element.form.has_children:
@@ -246,10 +393,9 @@ class FormGenerator(object):
                     )
                     # Add the parent to the list of child elements.
                     element.children.append(add_parent)
-                # Sort the elements by the index of child sort.
-                element.children.sort(
-                    key=lambda obj: element.form.child_sort.index(obj.tag)
-                )
+                # Sort the elements by their rank in child sort.
+                child_ranks = get_order_ranks(element.form.child_sort)
+                element.children.sort(key=lambda obj: child_ranks[obj.tag])
                 # Loop through the element's children (if it has any).
                 for child in element.children:
                     # Add the form attribute to the element.
@@ -259,6 +405,8 @@ class FormGenerator(object):
                         content=child.content,
                         parent_tag=element.tag,
                         superuser=superuser,
+                        form_cache=form_cache,
+                        vocabularies_version=vocabularies_version,
                     )
         element_group_dict = {}
         # Group related objects together.
@@ -282,6 +430,8 @@ class FormGenerator(object):
                 qualifier=hidden_element.qualifier,
                 content=hidden_element.content,
                 superuser=superuser,
+                form_cache=form_cache,
+                vocabularies_version=vocabularies_version,
             )
             element_group_dict['hidden'] = [hidden_element]
         # Create a list of group object elements.
@@ -319,8 +469,9 @@ class FormGenerator(object):
                         self.adjustable_items.append(adj_name)
             # Append the group to the element group list.
             element_list.append(element_group)
-        # Sort the elements by the index of sort_order pre-ordered list.
-        element_list.sort(key=lambda obj: sort_order.index(obj.group_name))
+        # Sort the elements by their rank in the sort_order pre-ordered list.
+        group_ranks = get_order_ranks(sort_order)
+        element_list.sort(key=lambda obj: group_ranks[obj.group_name])
         return element_list
 
     def get_vocabularies(self):
@@ -328,46 +479,201 @@ class FormGenerator(object):
         return get_vocabularies()
 
 
+def set_vocabulary_store(store):
+    """Set the store get_vocabularies retrieves the vocabularies through.
+
+    Takes a pyuntl.vocabulary store, such as a FileVocabularyStore.
+    Passing None goes back to caching the vocabularies in VOCAB_CACHE.
+    """
+    global VOCAB_STORE
+    VOCAB_STORE = store
+
+
 def get_vocabularies():
     """Get the vocabularies to pull the qualifiers from."""
     # Create the ordered vocabulary URL.
     vocab_url = VOCABULARIES_URL.replace('all', 'all-verbose')
+    # Use the vocabulary store if one has been set.
+    if VOCAB_STORE is not None:
+        try:
+            return VOCAB_STORE.get(vocab_url)
+        except VocabularyException as e:
+            raise UNTLStructureException(str(e))
     # Try to get the cached vocabs, only hitting the live vocabs when needed
     if vocab_url not in VOCAB_CACHE:
-        # Try to retrieve the fresh vocabs up to 3 times in case there are availability issues
-        attempt = 0
-        while True:
-            try:
-                VOCAB_CACHE[vocab_url] = json.loads(
-                    urllib.request.urlopen(vocab_url, timeout=15).read())
-            except Exception as e:
-                print('Exception caught while trying to retrieve vocabs: {}'.format(e))
-                if attempt < 3:
-                    attempt += 1
-                    time.sleep(3)
-                else:
-                    raise UNTLStructureException('Could not retrieve the vocabularies')
-            else:
-                break
+        with VOCAB_LOCK:
+            # Another thread may have retrieved them while this one waited.
+            if vocab_url not in VOCAB_CACHE:
+                # Try to retrieve the fresh vocabs up to 3 times in case there
+                # are availability issues
+                attempt = 0
+                while True:
+                    try:
+                        VOCAB_CACHE[vocab_url] = json.loads(
+                            urllib.request.urlopen(vocab_url, timeout=15).read())
+                    except Exception as e:
+                        print('Exception caught while trying to retrieve vocabs: {}'.format(e))
+                        if attempt < 3:
+                            attempt += 1
+                            time.sleep(3)
+                        else:
+                            raise UNTLStructureException(
+                                'Could not retrieve the vocabularies'
+                            )
+                    else:
+                        break
     return VOCAB_CACHE[vocab_url]
 
 
+def get_vocabularies_version():
+    """Get the version of the vocabularies from the vocabulary store.
+
+    Returns None if no store is set, or the store has no version for
+    the vocabularies.
+    """
+    if VOCAB_STORE is None:
+        return None
+    return VOCAB_STORE.get_version(VOCABULARIES_URL.replace('all', 'all-verbose'))
+
+
+async def get_vocabularies_async():
+    """Get the vocabularies without blocking the event loop.
+
+    Vocabularies already retrieved are returned right away. Otherwise
+    get_vocabularies is called in a thread, and concurrent calls share
+    that one retrieval.
+    """
+    vocab_url = VOCABULARIES_URL.replace('all', 'all-verbose')
+    if VOCAB_STORE is not None:
+        vocabularies = VOCAB_STORE.cached(vocab_url)
+    else:
+        vocabularies = VOCAB_CACHE.get(vocab_url)
+    if vocabularies is not None:
+        return vocabularies
+    return await VOCAB_SINGLE_FLIGHT.run(vocab_url, get_vocabularies)
+
+
 # Element Definitions #
 
+class ChildList(list):
+    """The children of a record.
+
+    Appended children are added to the record's tag index. Any other
+    change to the list marks the index to be rebuilt. Copies and
+    pickles of the list are plain lists.
+    """
+    __slots__ = ('record',)
+
+    def __init__(self, record, children=()):
+        super(ChildList, self).__init__(children)
+        self.record = record
+
+    def __reduce_ex__(self, protocol):
+        return (list, (list(self),))
+
+    def append(self, child):
+        super(ChildList, self).append(child)
+        if self.record.tag_index is not None:
+            self.record.index_child(child)
+
+
+def mark_index_changed(method):
+    """Wrap a list method to mark the record's tag index to be rebuilt."""
+    def change(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self.record.tag_index = None
+        return result
+    change.__name__ = method.__name__
+    change.__doc__ = method.__doc__
+    return change
+
+
+for method_name in ('extend', 'insert', 'remove', 'pop', 'clear', 'sort', 'reverse',
+                    '__setitem__', '__delitem__', '__iadd__', '__imul__'):
+    setattr(ChildList, method_name, mark_index_changed(getattr(list, method_name)))
+
+
 class Metadata(UNTLElement):
+    __slots__ = ('_children', 'hash_cache', 'metrics_cache', 'tag_index')
+    tag = 'metadata'
+    allows_content = False
+    allows_qualifier = False
+    contained_children = (
+        'title', 'identifier', 'note',
+        'institution', 'collection', 'subject', 'creator',
+        'primarySource', 'description', 'date', 'publisher',
+        'contributor', 'source', 'language', 'coverage',
+        'resourceType', 'relation', 'format', 'rights',
+        'degree', 'meta', 'citation',
+    )
+
     def __init__(self, **kwargs):
-        self.tag = 'metadata'
-        self.allows_content = False
-        self.allows_qualifier = False
-        self.contained_children = [
-            'title', 'identifier', 'note',
-            'institution', 'collection', 'subject', 'creator',
-            'primarySource', 'description', 'date', 'publisher',
-            'contributor', 'source', 'language', 'coverage',
-            'resourceType', 'relation', 'format', 'rights',
-            'degree', 'meta', 'citation',
-        ]
+        # The children by tag, and by tag and qualifier.
+        self.tag_index = None
         super(Metadata, self).__init__(**kwargs)
+        # Hashes of the element groups, kept by get_record_version.
+        self.hash_cache = {}
+        # Metrics of the record with the signature they were calculated for.
+        self.metrics_cache = {}
+
+    @property
+    def children(self):
+        """Child elements of the record, in a ChildList."""
+        return self._children
+
+    @children.setter
+    def children(self, value):
+        if not isinstance(value, ChildList) or value.record is not self:
+            value = ChildList(self, value)
+        self._children = value
+        self.tag_index = None
+
+    def get_metric(self, name, calculate):
+        """Calculate a metric of the record, or get it from the cache.
+
+        A cached metric is recalculated once any element of the record
+        is changed, added or removed.
+        """
+        signature = record_signature(self)
+        cached = self.metrics_cache.get(name)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        value = calculate(self)
+        self.metrics_cache[name] = (signature, value)
+        return value
+
+    def index_child(self, child):
+        """Add a child to the end of the tag index."""
+        children_by_tag, children_by_key = self.tag_index
+        children_by_tag.setdefault(child.tag, []).append(child)
+        children_by_key.setdefault((child.tag, child._qualifier), []).append(child)
+        child.indexed_by = self
+
+    def get_tag_index(self):
+        """Get the tag index, building it if it was marked changed.
+
+        Children appended to the record are added to the index. It is
+        marked to be rebuilt by any other change to the children, or to
+        the qualifier of a child. An element in more than one record
+        only marks the record that indexed it last.
+        """
+        if self.tag_index is None:
+            self.tag_index = ({}, {})
+            for child in self._children:
+                self.index_child(child)
+        return self.tag_index
+
+    def get_tag_children(self, tag):
+        """Get a sequence of the children with a tag from the tag
+        index, not to be changed.
+        """
+        return self.get_tag_index()[0].get(tag, ())
+
+    def get_qualified_children(self, tag, qualifier):
+        """Get a sequence of the children with a tag and qualifier
+        from the tag index, not to be changed.
+        """
+        return self.get_tag_index()[1].get((tag, qualifier), ())
 
     def create_xml_string(self):
         """Create a UNTL document in a string from a UNTL metadata
@@ -452,10 +758,11 @@ class Metadata(UNTLElement):
             )
 
     def sort_untl(self, sort_structure):
-        """Sort the UNTL Python object by the index
-        of a sort structure pre-ordered list.
+        """Sort the UNTL Python object by the rank
+        of each tag in a sort structure pre-ordered list.
         """
-        self.children.sort(key=lambda obj: sort_structure.index(obj.tag))
+        ranks = get_order_ranks(sort_structure)
+        self.children.sort(key=lambda obj: ranks[obj.tag])
 
     def validate(self):
         """ Validate all of the UNTL elements."""
@@ -475,232 +782,207 @@ class Metadata(UNTLElement):
         # Create the form object.
         return FormGenerator(**kwargs)
 
+    def get_hidden_element(self):
+        """Get the record's hidden meta element, or None."""
+        hidden_elements = self.find('meta', qualifier='hidden')
+        if hidden_elements:
+            return hidden_elements[0]
+        return None
+
     def make_hidden(self):
         """Make an unhidden record hidden."""
-        for element in self.children:
-            if element.tag == 'meta' and element.qualifier == 'hidden':
-                # Make the element hidden.
-                if element.content == 'False':
-                    element.content = 'True'
-                return None
+        hidden_element = self.get_hidden_element()
+        if hidden_element is not None:
+            # Make the element hidden.
+            if hidden_element.content == 'False':
+                hidden_element.content = 'True'
+            return None
         # Create a hidden meta element if it doesn't exist.
-        hidden_element = PYUNTL_DISPATCH['meta'](qualifier='hidden', content='True')
-        self.children.append(hidden_element)
+        self.add_child(PYUNTL_DISPATCH['meta'](qualifier='hidden', content='True'))
 
     def make_unhidden(self):
         """Make a hidden record unhidden."""
-        for element in self.children:
-            if element.tag == 'meta' and element.qualifier == 'hidden':
-                # Make the element unhidden.
-                if element.content == 'True':
-                    element.content = 'False'
-                return None
+        hidden_element = self.get_hidden_element()
+        if hidden_element is not None:
+            # Make the element unhidden.
+            if hidden_element.content == 'True':
+                hidden_element.content = 'False'
+            return None
         # Create a hidden meta element if it doesn't exist.
-        hidden_element = PYUNTL_DISPATCH['meta'](qualifier='hidden', content='False')
-        self.children.append(hidden_element)
+        self.add_child(PYUNTL_DISPATCH['meta'](qualifier='hidden', content='False'))
 
     @property
     def is_hidden(self):
         """Return True if a UNTL element is hidden."""
-        for element in self.children:
-            if element.tag == 'meta' and element.qualifier == 'hidden':
-                if element.content == 'True':
-                    return True
-                else:
-                    return False
+        hidden_element = self.get_hidden_element()
+        if hidden_element is not None:
+            return hidden_element.content == 'True'
         sys.stderr.write('A hidden meta element does not exist.')
         return False
 
 
 class Title(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'title'
-        super(Title, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'title'
 
 
 class Identifier(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'identifier'
-        super(Identifier, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'identifier'
 
 
 class Note(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'note'
-        super(Note, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'note'
 
 
 class Institution(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'institution'
-        self.allows_qualifier = False
-        super(Institution, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'institution'
+    allows_qualifier = False
 
 
 class Collection(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'collection'
-        self.allows_qualifier = False
-        super(Collection, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'collection'
+    allows_qualifier = False
 
 
 class Subject(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'subject'
-        super(Subject, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'subject'
 
 
 class Creator(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'creator'
-        self.allows_content = False
-        self.contained_children = [
-            'info',
-            'type',
-            'name',
-        ]
-        super(Creator, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'creator'
+    allows_content = False
+    contained_children = (
+        'info',
+        'type',
+        'name',
+    )
 
 
 class PrimarySource(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'primarySource'
-        self.allows_qualifier = False
-        super(PrimarySource, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'primarySource'
+    allows_qualifier = False
 
 
 class Description(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'description'
-        super(Description, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'description'
 
 
 class Date(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'date'
-        super(Date, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'date'
 
 
 class Publisher(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'publisher'
-        self.allows_content = False
-        self.allows_qualifier = False
-        self.contained_children = [
-            'info',
-            'name',
-            'location',
-        ]
-        super(Publisher, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'publisher'
+    allows_content = False
+    allows_qualifier = False
+    contained_children = (
+        'info',
+        'name',
+        'location',
+    )
 
 
 class Contributor(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'contributor'
-        self.allows_content = False
-        self.contained_children = [
-            'info',
-            'type',
-            'name',
-        ]
-        super(Contributor, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'contributor'
+    allows_content = False
+    contained_children = (
+        'info',
+        'type',
+        'name',
+    )
 
 
 class Source(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'source'
-        super(Source, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'source'
 
 
 class Language(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'language'
-        self.allows_qualifier = False
-        super(Language, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'language'
+    allows_qualifier = False
 
 
 class Coverage(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'coverage'
-        super(Coverage, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'coverage'
 
 
 class ResourceType(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'resourceType'
-        self.allows_qualifier = False
-        super(ResourceType, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'resourceType'
+    allows_qualifier = False
 
 
 class Relation(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'relation'
-        super(Relation, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'relation'
 
 
 class Format(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'format'
-        self.allows_qualifier = False
-        super(Format, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'format'
+    allows_qualifier = False
 
 
 class Rights(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'rights'
-        super(Rights, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'rights'
 
 
 class Degree(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'degree'
-        super(Degree, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'degree'
 
 
 class Meta(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'meta'
-        super(Meta, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'meta'
 
 
 class Citation(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'citation'
-        super(Citation, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'citation'
 
 
 class Info(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'info'
-        self.allows_qualifier = False
-        super(Info, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'info'
+    allows_qualifier = False
 
 
 class Type(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'type'
-        self.allows_qualifier = False
-        super(Type, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'type'
+    allows_qualifier = False
 
 
 class Name(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'name'
-        self.allows_qualifier = False
-        super(Name, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'name'
+    allows_qualifier = False
 
 
 class Location(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'location'
-        self.allows_qualifier = False
-        super(Location, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'location'
+    allows_qualifier = False
 
 
 class Role(UNTLElement):
-    def __init__(self, **kwargs):
-        self.tag = 'role'
-        super(Role, self).__init__(**kwargs)
+    __slots__ = ()
+    tag = 'role'
 
 
 PYUNTL_DISPATCH = {
@@ -10,23 +10,44 @@
 import json
 import re
 import hashlib
-from copy import deepcopy
+from io import StringIO
 from lxml.etree import iterparse
-from rdflib import Namespace, Literal, URIRef, ConjunctiveGraph
 
 from pyuntl import (UNTL_XML_ORDER, DC_ORDER,
                     HIGHWIRE_ORDER)
-from pyuntl.dc_structure import DC_CONVERSION_DISPATCH, DC_NAMESPACES, XSI
+from pyuntl.dc_structure import (DC_CONVERSION_DISPATCH, DC_NAMESPACES, XSI, determine_vocab,
+                                 identifier_director)
 from pyuntl.form_logic import REQUIRES_QUALIFIER
-from pyuntl.highwire_structure import HIGHWIRE_CONVERSION_DISPATCH
-from pyuntl.metadata_generator import (py2dict, pydict2xml, pydict2xmlstring,
-                                       writeANVLString, highwiredict2xmlstring)
+from pyuntl.highwire_structure import (HIGHWIRE_CONVERSION_DISPATCH, HIGHWIRE_VALUE_NAMES,
+                                       escape_content, format_online_date,
+                                       format_publication_date)
+from pyuntl.metadata_generator import (py2dict, element2dict, pydict2xml, pydict2xmlstring,
+                                       pydict2xmlelement, writeANVLString,
+                                       highwiredict2xmlstring, highwirevalues2xmlstring)
+from pyuntl.rdf_generator import dcdicts2rdfpy
 from pyuntl.untl_structure import (PYUNTL_DISPATCH, PARENT_FORM, get_vocabularies,
-                                   UNTLStructureException)
+                                   element_signature, UNTLStructureException)
+from pyuntl.vocabulary import get_vocabulary_index
 
 
 NAMESPACE_REGEX = re.compile(r'^{[^}]+}(.*)')
 
+# The key starting an ANVL element's line.
+ANVL_KEY_REGEX = re.compile(r'([^\s:]+):(?: |$)')
+
+# Arguments of pydict2xmlstring for creating DC XML.
+DC_XML_OPTIONS = {
+    'ordering': DC_ORDER,
+    'root_label': 'dc',
+    'root_namespace': '{%s}' % DC_NAMESPACES['oai_dc'],
+    'elements_namespace': '{%s}' % DC_NAMESPACES['dc'],
+    'namespace_map': DC_NAMESPACES,
+    'root_attributes': {
+        '{%s}schemaLocation' % XSI: ('http://www.openarchives.org/OAI/2.0/oai_dc/ '
+                                     'http://www.openarchives.org/OAI/2.0/oai_dc.xsd'),
+    },
+}
+
 
 class PyuntlException(Exception):
     """Base exception for UNTL."""
@@ -83,17 +104,133 @@ def untlxml2py(untl_filename):
             )
 
 
+def iter_untl_records(untl_source):
+    """Iterate over the UNTL records in a UNTL XML file object.
+
+    Yields a pyuntl element tree for every metadata record in the
+    source, so files holding many records (such as a collection
+    export wrapping records in a container element) are read in a
+    single pass. Parsed XML nodes are cleared as each record is
+    finished, keeping memory use flat regardless of the file size.
+
+    for untl_elements in iter_untl_records('collection.untl.xml'):
+        print(untlpy2dict(untl_elements))
+    """
+    # Create a stack to hold parents of the current record.
+    parent_stack = []
+    for event, element in iterparse(untl_source, events=('start', 'end')):
+        if NAMESPACE_REGEX.search(element.tag, 0):
+            element_tag = NAMESPACE_REGEX.search(element.tag, 0).group(1)
+        else:
+            element_tag = element.tag
+        # Outside of a record, skip everything until a record starts.
+        if not parent_stack:
+            if event == 'start' and element_tag == 'metadata':
+                parent_stack.append(PYUNTL_DISPATCH[element_tag]())
+            continue
+        if element_tag not in PYUNTL_DISPATCH:
+            raise PyuntlException(
+                'Element "%s" not in UNTL dispatch.' % (element_tag)
+            )
+        if event == 'start':
+            parent_stack.append(PYUNTL_DISPATCH[element_tag]())
+        elif event == 'end':
+            child = parent_stack.pop()
+            if element.text is not None:
+                content = element.text.strip()
+                if content != '':
+                    child.set_content(element.text)
+            if element.get('qualifier', False):
+                child.set_qualifier(element.get('qualifier'))
+            if len(parent_stack) > 0:
+                parent_stack[-1].add_child(child)
+            else:
+                # The record is complete, so free its XML nodes along
+                # with any already processed siblings before it.
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+                yield child
+
+
 def untlxml2pydict(untl_filename):
     """Convert a UNTL XML file to a Python dictionary.
 
+    The dictionary is built directly while the XML is parsed, without
+    creating a UNTL Python object first. Elements are validated with
+    the same rules, and the result is the same as
+    untlpy2dict(untlxml2py(untl_filename)).
+
     You can also pass input like so:
     from io import BytesIO
     untlxml2pydict(BytesIO(untl_xml_bytes))
     """
-    # Create a UNTL Python object from the XML file.
-    untl_elements = untlxml2py(untl_filename)
-    # Convert the Python object to a Python dictionary, and return it.
-    return untlpy2dict(untl_elements)
+    metadata_dict = {}
+    # Create a stack holding the element class, the dictionary of
+    # children with content and the number of children of each
+    # open element.
+    parent_stack = []
+    for event, element in iterparse(untl_filename, events=('start', 'end')):
+        match = NAMESPACE_REGEX.search(element.tag, 0)
+        element_tag = match.group(1) if match else element.tag
+        if element_tag not in PYUNTL_DISPATCH:
+            raise PyuntlException(
+                'Element "%s" not in UNTL dispatch.' % (element_tag)
+            )
+        if event == 'start':
+            parent_stack.append([PYUNTL_DISPATCH[element_tag], {}, 0])
+            continue
+        element_class, child_dict, child_count = parent_stack.pop()
+        # Check the content and qualifier are allowed, as the element
+        # classes do when they are set.
+        content = element.text.strip() if element.text is not None else ''
+        if content != '' and not element_class.allows_content:
+            raise UNTLStructureException(
+                'Element "%s" does not allow textual content' % (element_tag,)
+            )
+        qualifier = element.get('qualifier', None)
+        if qualifier:
+            if not element_class.allows_qualifier:
+                raise UNTLStructureException(
+                    'Element "%s" does not allow a qualifier' % (element_tag,)
+                )
+            qualifier = qualifier.strip()
+        else:
+            qualifier = None
+        # If it doesn't have a parent, it is the root element,
+        # so the dictionary is complete.
+        if not parent_stack:
+            return metadata_dict
+        parent = parent_stack[-1]
+        if element_tag not in parent[0].allowed_children:
+            raise UNTLStructureException(
+                'Invalid child "%s" for parent "%s"' % (
+                    element_tag,
+                    parent[0].tag
+                )
+            )
+        parent[2] += 1
+        if len(parent_stack) > 1:
+            # Only the content of a child is kept, keyed by its tag.
+            if content != '':
+                parent[1][element_tag] = content
+            continue
+        element_list = metadata_dict.setdefault(element_tag, [])
+        element_dict = {}
+        if qualifier is not None:
+            element_dict['qualifier'] = qualifier
+        # Children take the place of the element's textual content.
+        if child_count:
+            element_dict['content'] = child_dict
+        elif content != '':
+            element_dict['content'] = content
+        # Only keep the element if it has content or children.
+        if element_dict.get('content', False):
+            element_list.append(element_dict)
+        # Free the parsed element and any earlier siblings.
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
 
 
 def untlpy2dict(untl_elements):
@@ -277,87 +414,226 @@ def untlpy2dcpy(untl_elements, **kwargs):
     # Create a DC text string.
     generate_dc_txt(dc_dict)
     """
-    sDate = None
-    eDate = None
-    ark = kwargs.get('ark', None)
-    domain_name = kwargs.get('domain_name', None)
-    scheme = kwargs.get('scheme', 'http')
-    resolve_values = kwargs.get('resolve_values', None)
-    resolve_urls = kwargs.get('resolve_urls', None)
-    verbose_vocabularies = kwargs.get('verbose_vocabularies', None)
-    # If either resolvers were requested, get the vocabulary data.
-    if resolve_values or resolve_urls:
-        if verbose_vocabularies:
-            # If the vocabularies were passed to the function, use them.
-            vocab_data = verbose_vocabularies
-        else:
-            # Otherwise, retrieve them using the pyuntl method.
-            vocab_data = retrieve_vocab()
-    else:
-        vocab_data = None
-    # Create the DC parent element.
-    dc_root = DC_CONVERSION_DISPATCH['dc']()
-    for element in untl_elements.children:
-        # Check if the UNTL element should be converted to DC.
-        if element.tag in DC_CONVERSION_DISPATCH:
-            # Check if the element has its content stored in children nodes.
-            if element.children:
-                dc_element = DC_CONVERSION_DISPATCH[element.tag](
-                    qualifier=element.qualifier,
-                    children=element.children,
-                    resolve_values=resolve_values,
-                    resolve_urls=resolve_urls,
-                    vocab_data=vocab_data,
-                )
-            # It is a normal element.
+    converter = DCConverter(
+        domain_name=kwargs.get('domain_name', None),
+        scheme=kwargs.get('scheme', 'http'),
+        resolve_values=kwargs.get('resolve_values', None),
+        resolve_urls=kwargs.get('resolve_urls', None),
+        verbose_vocabularies=kwargs.get('verbose_vocabularies', None),
+    )
+    return converter.untlpy2dcpy(untl_elements, ark=kwargs.get('ark', None))
+
+
+# Tags of the DC elements created from UNTL elements of the same
+# content, for converting UNTL dictionaries directly.
+DC_ELEMENT_TAGS = {
+    'coverage': 'coverage',
+    'format': 'format',
+    'language': 'language',
+    'subject': 'subject',
+    'title': 'title',
+    'resourceType': 'type',
+    'source': 'source',
+    'relation': 'relation',
+    'rights': 'rights',
+}
+
+# UNTL elements whose DC content is the name of their children.
+DC_NAME_ELEMENTS = ('creator', 'publisher', 'contributor')
+
+
+class DCConverter(object):
+    """Convert many UNTL records to DC with the same configuration.
+
+    The configuration is bound once, and if values or URLs are
+    resolved, the vocabularies are retrieved and indexed once for
+    every record converted. Takes the keyword arguments of
+    untlpy2dcpy, except for the ark of each record, which is passed
+    when converting it:
+    converter = DCConverter(domain_name='example.com', resolve_values=True)
+    for untl_elements, ark in records:
+        dc_dict = dcpy2dict(converter.untlpy2dcpy(untl_elements, ark=ark))
+    """
+
+    def __init__(self, domain_name=None, scheme='http', resolve_values=None,
+                 resolve_urls=None, verbose_vocabularies=None):
+        self.domain_name = domain_name
+        self.scheme = scheme
+        self.resolve_values = resolve_values
+        self.resolve_urls = resolve_urls
+        # If either resolvers were requested, get the vocabulary data.
+        if resolve_values or resolve_urls:
+            if verbose_vocabularies:
+                # If the vocabularies were passed, use them.
+                vocab_data = verbose_vocabularies
             else:
-                dc_element = DC_CONVERSION_DISPATCH[element.tag](
-                    qualifier=element.qualifier,
-                    content=element.content,
-                    resolve_values=resolve_values,
-                    resolve_urls=resolve_urls,
-                    vocab_data=vocab_data,
-                )
-            if element.tag == 'coverage':
-                # Handle start and end dates.
-                if element.qualifier == 'sDate':
-                    sDate = dc_element
-                elif element.qualifier == 'eDate':
-                    eDate = dc_element
-                # Otherwise, add the coverage element to the structure.
+                # Otherwise, retrieve them using the pyuntl method.
+                vocab_data = retrieve_vocab()
+            # Index the vocabularies once for all the elements.
+            if vocab_data is not None:
+                vocab_data = get_vocabulary_index(vocab_data)
+        else:
+            vocab_data = None
+        self.vocab_data = vocab_data
+
+    def untlpy2dcpy(self, untl_elements, ark=None):
+        """Convert a UNTL Python object into a DC Python object."""
+        sDate = None
+        eDate = None
+        resolve_values = self.resolve_values
+        resolve_urls = self.resolve_urls
+        vocab_data = self.vocab_data
+        domain_name = self.domain_name
+        scheme = self.scheme
+        # Create the DC parent element.
+        dc_root = DC_CONVERSION_DISPATCH['dc']()
+        for element in untl_elements.children:
+            # Check if the UNTL element should be converted to DC.
+            if element.tag in DC_CONVERSION_DISPATCH:
+                # Check if the element has its content stored in children nodes.
+                if element.children:
+                    dc_element = DC_CONVERSION_DISPATCH[element.tag](
+                        qualifier=element.qualifier,
+                        children=element.children,
+                        resolve_values=resolve_values,
+                        resolve_urls=resolve_urls,
+                        vocab_data=vocab_data,
+                    )
+                # It is a normal element.
                 else:
+                    dc_element = DC_CONVERSION_DISPATCH[element.tag](
+                        qualifier=element.qualifier,
+                        content=element.content,
+                        resolve_values=resolve_values,
+                        resolve_urls=resolve_urls,
+                        vocab_data=vocab_data,
+                    )
+                if element.tag == 'coverage':
+                    # Handle start and end dates.
+                    if element.qualifier == 'sDate':
+                        sDate = dc_element
+                    elif element.qualifier == 'eDate':
+                        eDate = dc_element
+                    # Otherwise, add the coverage element to the structure.
+                    else:
+                        dc_root.add_child(dc_element)
+                # Add non coverage DC element to the structure.
+                elif dc_element:
                     dc_root.add_child(dc_element)
-            # Add non coverage DC element to the structure.
-            elif dc_element:
-                dc_root.add_child(dc_element)
-    # If the domain and ark were specified
-    # try to turn them into indentifier elements.
-    if ark and domain_name:
-        # Create and add the permalink identifier.
-        permalink_identifier = DC_CONVERSION_DISPATCH['identifier'](
-            qualifier='permalink',
-            domain_name=domain_name,
-            ark=ark,
-            scheme=scheme
-        )
-        dc_root.add_child(permalink_identifier)
-        # Create and add the ark identifier.
-        ark_identifier = DC_CONVERSION_DISPATCH['identifier'](
-            qualifier='ark',
-            content=ark,
-        )
-        dc_root.add_child(ark_identifier)
-    if sDate and eDate:
-        # If a start and end date exist, combine them into one element.
-        dc_element = DC_CONVERSION_DISPATCH['coverage'](
-            content='%s-%s' % (sDate.content, eDate.content),
-        )
-        dc_root.add_child(dc_element)
-    elif sDate:
-        dc_root.add_child(sDate)
-    elif eDate:
-        dc_root.add_child(eDate)
-    return dc_root
+        # If the domain and ark were specified
+        # try to turn them into indentifier elements.
+        if ark and domain_name:
+            # Create and add the permalink identifier.
+            permalink_identifier = DC_CONVERSION_DISPATCH['identifier'](
+                qualifier='permalink',
+                domain_name=domain_name,
+                ark=ark,
+                scheme=scheme
+            )
+            dc_root.add_child(permalink_identifier)
+            # Create and add the ark identifier.
+            ark_identifier = DC_CONVERSION_DISPATCH['identifier'](
+                qualifier='ark',
+                content=ark,
+            )
+            dc_root.add_child(ark_identifier)
+        if sDate and eDate:
+            # If a start and end date exist, combine them into one element.
+            dc_element = DC_CONVERSION_DISPATCH['coverage'](
+                content='%s-%s' % (sDate.content, eDate.content),
+            )
+            dc_root.add_child(dc_element)
+        elif sDate:
+            dc_root.add_child(sDate)
+        elif eDate:
+            dc_root.add_child(eDate)
+        return dc_root
+
+    def resolve(self, tag, qualifier, content):
+        """Resolve the content of a DC element, if it is requested and
+        the element has a vocabulary.
+        """
+        if self.vocab_data:
+            content_vocab = determine_vocab(tag, qualifier)
+            if content_vocab:
+                if self.resolve_values:
+                    return self.vocab_data.lookup(content_vocab, content, 'label', content)
+                elif self.resolve_urls:
+                    return self.vocab_data.lookup(content_vocab, content, 'url', content)
+        return content
+
+    def untlpydict2dcformatteddict(self, untl_dict, ark=None):
+        """Convert a UNTL dictionary directly into a formatted DC dictionary.
+
+        The result is the same as untlpydict2dcformatteddict's, without
+        creating the UNTL and DC Python objects in between. The
+        dictionary is not validated as untldict2py validates it.
+        """
+        formatted_dict = {}
+        # Content of the start and end dates, by qualifier.
+        coverage_dates = {}
+
+        def add_content(tag, content):
+            # Like py2dict, the element list is started even if the
+            # content is empty.
+            content_list = formatted_dict.setdefault(tag, [])
+            if content is not None and content.strip() != '':
+                content_list.append(content)
+
+        for element_name, element_list in untl_dict.items():
+            for element_dict in element_list:
+                qualifier = element_dict.get('qualifier', None)
+                if qualifier is not None:
+                    qualifier = qualifier.strip()
+                content = element_dict.get('content', None)
+                if isinstance(content, dict):
+                    # Content of children is the name of creators,
+                    # publishers and contributors.
+                    if element_name in DC_NAME_ELEMENTS:
+                        name = content.get('name', '')
+                        add_content(element_name, name.strip() if name is not None else name)
+                        continue
+                    # Other elements have no content of their own.
+                    content = None
+                elif content is not None:
+                    content = content.strip()
+                if element_name in DC_ELEMENT_TAGS:
+                    tag = DC_ELEMENT_TAGS[element_name]
+                    content = self.resolve(tag, qualifier, content)
+                    if element_name == 'coverage' and qualifier in ('sDate', 'eDate'):
+                        coverage_dates[qualifier] = content
+                    else:
+                        add_content(tag, content)
+                elif element_name in DC_NAME_ELEMENTS:
+                    # Without children, the element has no name.
+                    add_content(element_name, '')
+                elif element_name == 'description':
+                    add_content('format' if qualifier == 'physical' else 'description',
+                                content)
+                elif element_name == 'date':
+                    if qualifier == 'creation':
+                        add_content('date', content)
+                elif element_name == 'identifier':
+                    add_content('identifier', identifier_director(
+                        qualifier=qualifier,
+                        content=content,
+                    ).content)
+        if ark and self.domain_name:
+            add_content('identifier', identifier_director(
+                qualifier='permalink',
+                domain_name=self.domain_name,
+                ark=ark,
+                scheme=self.scheme,
+            ).content)
+            add_content('identifier', identifier_director(qualifier='ark', content=ark).content)
+        if 'sDate' in coverage_dates and 'eDate' in coverage_dates:
+            add_content('coverage', '%s-%s' % (coverage_dates['sDate'],
+                                               coverage_dates['eDate']))
+        elif 'sDate' in coverage_dates:
+            add_content('coverage', coverage_dates['sDate'])
+        elif 'eDate' in coverage_dates:
+            add_content('coverage', coverage_dates['eDate'])
+        return formatted_dict
 
 
 def untlpy2highwirepy(untl_elements, **kwargs):
@@ -405,6 +681,169 @@ def untlpy2highwirepy(untl_elements, **kwargs):
     return highwire_list
 
 
+# Output formats of HighwireConverter.
+HIGHWIRE_OUTPUT_FORMATS = ('dict', 'json', 'xml', 'text')
+
+
+def strip_content(content):
+    """Strip content as set_content does, leaving None as it is."""
+    return content.strip() if content is not None else None
+
+
+def iter_highwire_elements(record):
+    """Iterate over the tag, qualifier and content of the elements of a
+    UNTL Python object or UNTL dictionary that are converted to highwire.
+
+    The content of elements with children is a list of the tag and
+    content of each child. Qualifiers and content of dictionaries are
+    stripped as untldict2py strips them.
+    """
+    if isinstance(record, dict):
+        for tag, element_list in record.items():
+            if tag not in HIGHWIRE_CONVERSION_DISPATCH:
+                continue
+            for element_dict in element_list:
+                content = element_dict.get('content', None)
+                if isinstance(content, dict):
+                    content = [(child_tag, strip_content(child_content))
+                               for child_tag, child_content in content.items()]
+                else:
+                    content = strip_content(content)
+                yield tag, strip_content(element_dict.get('qualifier', None)), content
+    else:
+        for element in record.children:
+            if element.tag not in HIGHWIRE_CONVERSION_DISPATCH:
+                continue
+            if element.children:
+                content = [(child.tag, child._content) for child in element.children]
+            else:
+                content = element._content
+            yield element.tag, element._qualifier, content
+
+
+class HighwireConverter(object):
+    """Convert many UNTL records to highwire with the same configuration.
+
+    Each record is read in a single pass, looking up how each element
+    is converted in a table, and its values are written straight to
+    the output without creating highwire Python objects. The output
+    is the same as untlpy2highwirepy's elements give through
+    highwirepy2dict, generate_highwire_json, generate_highwire_xml or
+    generate_highwire_text. Records can be UNTL Python objects or
+    UNTL dictionaries:
+    converter = HighwireConverter(escape=True)
+    for highwire_xml in converter.convert_records(records, output_format='xml'):
+        print(highwire_xml)
+    """
+
+    def __init__(self, escape=False):
+        self.escape = escape
+
+    def get_highwire_values(self, record):
+        """Get a list of the highwire name and content of each value of
+        a record, in the order of untlpy2highwirepy's elements.
+        """
+        escape = self.escape
+        highwire_values = []
+        title = None
+        has_publisher = False
+        has_creation = False
+        for tag, qualifier, content in iter_highwire_elements(record):
+            if isinstance(content, list):
+                children = content
+                content = None
+            else:
+                children = ()
+            if tag == 'title':
+                # The last official title is used, or else the first title.
+                if qualifier == 'officialtitle' or title is None:
+                    if escape and content:
+                        content = escape_content(content)
+                    title = ('citation_title', content)
+            elif tag == 'creator':
+                if qualifier != 'aut' or ('type', 'per') not in children:
+                    continue
+                # The last name is the author.
+                name = None
+                for child_tag, child_content in children:
+                    if child_tag == 'name':
+                        name = child_content
+                if name:
+                    highwire_values.append(
+                        ('citation_author', escape_content(name) if escape else name)
+                    )
+            elif tag == 'publisher':
+                # Only the first publisher is used, with its first name.
+                if has_publisher:
+                    continue
+                has_publisher = True
+                name = next((child_content for child_tag, child_content in children
+                             if child_tag == 'name'), None)
+                if escape and name:
+                    name = escape_content(name)
+                highwire_values.append(('citation_publisher', name))
+            elif tag == 'date':
+                # Only the first creation date that is a date is used.
+                if has_creation or qualifier != 'creation' or content is None:
+                    continue
+                publication_date = format_publication_date(content)
+                if publication_date:
+                    has_creation = True
+                    highwire_values.append(('citation_publication_date', publication_date))
+            elif tag == 'meta':
+                if qualifier == 'metadataCreationDate' and content is not None:
+                    online_date = format_online_date(content)
+                    if online_date:
+                        highwire_values.append(('citation_online_date', online_date))
+            elif content:
+                value_name = HIGHWIRE_VALUE_NAMES.get((tag, qualifier))
+                if value_name is not None:
+                    name, escaped = value_name
+                    highwire_values.append(
+                        (name, escape_content(content) if escape and escaped else content)
+                    )
+        if title is not None:
+            highwire_values.append(title)
+        return highwire_values
+
+    def create_dict(self, record):
+        """Convert a record into a highwire dictionary."""
+        highwire_dict = {}
+        for name, content in self.get_highwire_values(record):
+            highwire_dict.setdefault(name, []).append({'content': content})
+        return highwire_dict
+
+    def create_json(self, record):
+        """Convert a record into a highwire JSON string."""
+        return json.dumps(self.create_dict(record), sort_keys=True, indent=4)
+
+    def create_xml(self, record):
+        """Convert a record into a highwire XML string."""
+        return highwirevalues2xmlstring(self.get_highwire_values(record))
+
+    def create_text(self, record):
+        """Convert a record into a highwire ANVL string."""
+        return writeANVLString(self.create_dict(record), HIGHWIRE_ORDER)
+
+    def convert(self, record, output_format='dict'):
+        """Convert a record into one of HIGHWIRE_OUTPUT_FORMATS."""
+        if output_format not in HIGHWIRE_OUTPUT_FORMATS:
+            raise PyuntlException(
+                'Highwire output format "%s" is not supported.' % (output_format,)
+            )
+        return getattr(self, 'create_%s' % (output_format,))(record)
+
+    def convert_records(self, records, output_format='dict'):
+        """Convert an iterable of records, yielding the output of each."""
+        if output_format not in HIGHWIRE_OUTPUT_FORMATS:
+            raise PyuntlException(
+                'Highwire output format "%s" is not supported.' % (output_format,)
+            )
+        create_output = getattr(self, 'create_%s' % (output_format,))
+        for record in records:
+            yield create_output(record)
+
+
 def untlpydict2dcformatteddict(untl_dict, **kwargs):
     """Convert a UNTL data dictionary to a formatted DC data dictionary."""
     ark = kwargs.get('ark', None)
@@ -449,38 +888,21 @@ def formatted_dc_dict(dc_dict):
     with a list of values for each element.
     i.e. {'publisher': ['someone', 'someone else'], 'title': ['a title'],}
     """
-    # Don't modify the unformatted dictionary in place.
-    dc_dict = deepcopy(dc_dict)
-    for key, element_list in dc_dict.items():
-        new_element_list = []
-        # Add the content for each element to the new element list.
-        for element in element_list:
-            new_element_list.append(element['content'])
-        dc_dict[key] = new_element_list
-    return dc_dict
+    # Build a new dictionary rather than modifying the unformatted one.
+    return {
+        key: [element['content'] for element in element_list]
+        for key, element_list in dc_dict.items()
+    }
 
 
 def generate_dc_xml(dc_dict):
     """Generate a DC XML string."""
-    # Define the root namespace.
-    root_namespace = '{%s}' % DC_NAMESPACES['oai_dc']
-    # Set the elements namespace URL.
-    elements_namespace = '{%s}' % DC_NAMESPACES['dc']
-    schema_location = ('http://www.openarchives.org/OAI/2.0/oai_dc/ '
-                       'http://www.openarchives.org/OAI/2.0/oai_dc.xsd')
-    root_attributes = {
-        '{%s}schemaLocation' % XSI: schema_location,
-    }
-    # Return the DC XML string.
-    return pydict2xmlstring(
-        dc_dict,
-        ordering=DC_ORDER,
-        root_label='dc',
-        root_namespace=root_namespace,
-        elements_namespace=elements_namespace,
-        namespace_map=DC_NAMESPACES,
-        root_attributes=root_attributes,
-    )
+    return pydict2xmlstring(dc_dict, **DC_XML_OPTIONS)
+
+
+def dcdict2xmlelement(dc_dict):
+    """Generate a DC XML element tree."""
+    return pydict2xmlelement(dc_dict, **DC_XML_OPTIONS)
 
 
 def generate_dc_json(dc_dict):
@@ -532,43 +954,75 @@ def generate_highwire_text(highwire_elements):
     return writeANVLString(highwire_dict, HIGHWIRE_ORDER)
 
 
+def iter_anvl_records(anvl_source):
+    """Iterate over the records in an ANVL file object or file name.
+
+    Reads records as ANVLWriter and writeANVLString write them, with
+    records separated by blank lines and long values continued on
+    lines starting with a space. Lines starting with # are comments.
+    Yields a dictionary of each record, with a list of content
+    dictionaries for each key, such as a DC or highwire dictionary. A
+    record of only comments, as ANVLWriter writes a record without
+    values, is yielded as an empty dictionary. Values holding line
+    breaks may not be read back as they were written.
+
+    for dc_dict in iter_anvl_records('collection.anvl'):
+        print(dc_dict['title'])
+    """
+    if isinstance(anvl_source, str):
+        with open(anvl_source, 'rb') as f:
+            yield from iter_anvl_records(f)
+        return
+    anvl_dict = {}
+    element = None
+    in_record = False
+    for line in anvl_source:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if line.endswith('\n'):
+            line = line[:-1]
+        if line.endswith('\r'):
+            line = line[:-1]
+        # A blank line ends the record.
+        if not line.strip():
+            if in_record:
+                yield anvl_dict
+            anvl_dict = {}
+            element = None
+            in_record = False
+            continue
+        in_record = True
+        if line.startswith('#'):
+            continue
+        if line[0].isspace() and element is not None:
+            # Lines were broken before a space, which starts the next line.
+            element['content'] += line
+            continue
+        match = ANVL_KEY_REGEX.match(line)
+        if match:
+            element = {'content': line[match.end():]}
+            anvl_dict.setdefault(match.group(1), []).append(element)
+        elif element is not None:
+            # The value held a line break.
+            element['content'] += '\n' + line
+        else:
+            raise PyuntlException('Line "%s" is not an ANVL element.' % (line,))
+    if in_record:
+        yield anvl_dict
+
+
+def anvlstring2pydict(anvl_string):
+    """Convert the ANVL string of a record into a dictionary.
+
+    Takes a string such as writeANVLString, generate_dc_txt or
+    generate_highwire_text returns.
+    """
+    return next(iter_anvl_records(StringIO(anvl_string)), {})
+
+
 def dcdict2rdfpy(dc_dict):
     """Convert a DC dictionary into an RDF Python object."""
-    ark_prefix = 'ark: ark:'
-    uri = URIRef('')
-    # Create the RDF Python object.
-    rdf_py = ConjunctiveGraph()
-    # Set DC namespace definition.
-    DC = Namespace('http://purl.org/dc/elements/1.1/')
-    # Get the ark for the subject URI from the ark identifier.
-    for element_value in dc_dict['identifier']:
-        if element_value['content'].startswith(ark_prefix):
-            uri = URIRef(
-                element_value['content'].replace(
-                    ark_prefix, 'info:ark'
-                )
-            )
-    # Bind the prefix/namespace pair.
-    rdf_py.bind('dc', DC)
-    # Get the values for each element in the ordered DC elements.
-    for element_name in DC_ORDER:
-        element_value_list = dc_dict.get(element_name, [])
-        # Add the values to the RDF object.
-        for element_value in element_value_list:
-            # Handle URL values differently.
-            if 'http' in element_value['content'] and ' ' not in element_value['content']:
-                rdf_py.add((
-                    uri,
-                    DC[element_name],
-                    URIRef(element_value['content'])
-                ))
-            else:
-                rdf_py.add((
-                    uri,
-                    DC[element_name],
-                    Literal(element_value['content'])
-                ))
-    return rdf_py
+    return dcdicts2rdfpy([dc_dict])
 
 
 def generate_rdf_xml(dc_dict):
@@ -661,16 +1115,18 @@ def find_untl_errors(untl_dict, **kwargs):
 
 def untl_dict_to_tuple(untl_dict):
     """Convert untl_dict values to list of lists of tuples."""
-    untl_dict = deepcopy(untl_dict)
     untl_tuple = {}
     for elem, value in untl_dict.items():
-        for i, v in enumerate(value):
+        element_tuples = []
+        for element_dict in value:
             # We are trying to get a consistent ordering of values
             # so reordering doesn't count as a change.
-            if isinstance(value[i]['content'], dict):
-                value[i]['content'] = sorted(list(value[i]['content'].items()))
-            value[i] = sorted(list(value[i].items()))
-        untl_tuple[elem] = value
+            if isinstance(element_dict['content'], dict):
+                # Build new lists rather than modifying the dictionary.
+                element_dict = dict(element_dict,
+                                    content=sorted(element_dict['content'].items()))
+            element_tuples.append(sorted(element_dict.items()))
+        untl_tuple[elem] = element_tuples
     return untl_tuple
 
 
@@ -686,18 +1142,74 @@ def untl_to_hash_dict(untl_elements, meaningfulMeta=True):
     the value is a hash of the sorted list of tuples of the elements'
     values. If meaningfulMeta is True, ignore metadata fields that
     show no meaningful change to metadata records.
+
+    The hashes are kept on a Metadata object, so only the element
+    groups that changed since the last call are hashed again.
     """
-    untl_dict = untlpy2dict(untl_elements)
-    if meaningfulMeta and untl_dict.get('meta') is not None:
-        unmeaningful = ('metadataModificationDate', 'metadataModifier')
-        untl_dict['meta'] = [
-            e for e in untl_dict['meta'] if e.get('qualifier') not in unmeaningful
-        ]
-    untl_tuple = untl_dict_to_tuple(untl_dict)
-    return {k: generate_hash(v) for k, v in untl_tuple.items()}
+    # Group the elements by tag, in order of first appearance.
+    element_groups = {}
+    for element in untl_elements.children:
+        element_groups.setdefault(element.tag, []).append(element)
+    hash_cache = getattr(untl_elements, 'hash_cache', None)
+    hash_dict = {}
+    for tag, elements in element_groups.items():
+        signature = tuple(element_signature(element) for element in elements)
+        cache_key = (tag, meaningfulMeta)
+        if hash_cache is not None and cache_key in hash_cache:
+            cached_signature, cached_hash = hash_cache[cache_key]
+            if cached_signature == signature:
+                hash_dict[tag] = cached_hash
+                continue
+        element_list = []
+        for element in elements:
+            element_dict = element2dict(element)
+            if element_dict is not None:
+                element_list.append(element_dict)
+        if meaningfulMeta and tag == 'meta':
+            unmeaningful = ('metadataModificationDate', 'metadataModifier')
+            element_list = [
+                e for e in element_list if e.get('qualifier') not in unmeaningful
+            ]
+        hash_dict[tag] = generate_hash(untl_dict_to_tuple({tag: element_list})[tag])
+        if hash_cache is not None:
+            hash_cache[cache_key] = (signature, hash_dict[tag])
+    return hash_dict
+
+
+def create_record_version(untl_elements):
+    """Produce a version hash from the hashed UNTL dictionary."""
+    hash_results = untl_to_hash_dict(untl_elements, True)
+    return generate_hash(hash_results)
 
 
 def get_record_version(untl_elements):
-    """Produce a version hash from the hashed UNTL dictionary."""
-    hash_results = untl_to_hash_dict(untl_elements, True)
+    """Produce a version hash from the hashed UNTL dictionary.
+
+    The version of a Metadata object is kept with its metrics until
+    any element of the record is changed, added or removed.
+    """
+    get_metric = getattr(untl_elements, 'get_metric', None)
+    if get_metric is None:
+        return create_record_version(untl_elements)
+    return get_metric('version', create_record_version)
+
+
+def create_full_record_version(untl_elements):
+    """Produce a version hash from the hashed UNTL dictionary, including
+    the meta values get_record_version ignores.
+    """
+    hash_results = untl_to_hash_dict(untl_elements, False)
     return generate_hash(hash_results)
+
+
+def get_full_record_version(untl_elements):
+    """Produce a version hash that changes with any value of the record.
+
+    Unlike get_record_version, the metadata modification date and
+    modifier are part of the version. The version of a Metadata object
+    is kept with its metrics until the record is changed.
+    """
+    get_metric = getattr(untl_elements, 'get_metric', None)
+    if get_metric is None:
+        return create_full_record_version(untl_elements)
+    return get_metric('full_version', create_full_record_version)
@@ -1,6 +1,9 @@
 import re
 
 
+WHITESPACE_REGEX = re.compile(r'[\s]+')
+
+
 def normalize_LCSH(subject):
     """Normalize a LCSH subject heading prior to indexing."""
     # Strip then divide on -- which is a delimiter for LCSH;
@@ -13,7 +16,7 @@ def normalize_LCSH(subject):
 def normalize_UNTL(subject):
     """Normalize a UNTL subject heading for consistency."""
     subject = subject.strip()
-    subject = re.sub(r'[\s]+', ' ', subject)
+    subject = WHITESPACE_REGEX.sub(' ', subject)
     return subject
 
 
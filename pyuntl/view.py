@@ -0,0 +1,175 @@
+"""
+    Read UNTL records without creating UNTL Python objects.
+
+    A view wraps the parsed lxml document of a record, and only creates
+    a wrapper for an element when it is asked for:
+    from pyuntl.view import untlxml2view
+    record = untlxml2view('metapth38622.untl.xml')
+    titles = record.values('title', qualifier='officialtitle')
+    if not record.is_hidden:
+        ...
+
+    Views have the tag, qualifier, content and children of UNTL
+    elements, so they can be passed to functions reading UNTL Python
+    objects, such as untlpy2dict and determine_completeness. A view is
+    read-only; create_metadata converts it into a UNTL Python object
+    that can be edited.
+"""
+import sys
+
+from lxml.etree import Element, QName, parse
+
+from pyuntl.untl_structure import PYUNTL_DISPATCH
+from pyuntl.untldoc import PyuntlException
+
+
+def get_element_tag(element):
+    """Get the tag of an lxml element without its namespace."""
+    return QName(element).localname
+
+
+def get_element_class(tag):
+    """Get the UNTL element class of a tag."""
+    try:
+        return PYUNTL_DISPATCH[tag]
+    except KeyError:
+        raise PyuntlException('Element "%s" not in UNTL dispatch.' % (tag,))
+
+
+class UNTLElementView(object):
+    """A read-only UNTL element over an lxml element.
+
+    The qualifier and content are read from the lxml element when they
+    are accessed, and stripped as a UNTL element strips them. The views
+    of the children are created on first access.
+    """
+
+    __slots__ = ('element', 'tag', '_children')
+
+    def __init__(self, element, tag=None):
+        self.element = element
+        self.tag = get_element_tag(element) if tag is None else tag
+        self._children = None
+
+    @property
+    def qualifier(self):
+        """Element qualifier, or None."""
+        qualifier = self.element.get('qualifier')
+        if not qualifier:
+            return None
+        return qualifier.strip()
+
+    @property
+    def content(self):
+        """Textual content of the element, or None if it has none."""
+        text = self.element.text
+        if text is None:
+            return None
+        return text.strip() or None
+
+    @property
+    def children(self):
+        """Views of the child elements, in document order."""
+        if self._children is None:
+            self._children = [UNTLElementView(child)
+                              for child in self.element.iterchildren(Element)]
+        return self._children
+
+    def iter_children(self, tag, qualifier=None):
+        """Iterate over the views of the children with a tag.
+
+        If a qualifier is given, only children with that qualifier
+        are included.
+        """
+        # Match the tag in any namespace, or none.
+        for child in self.element.iterchildren('{*}' + tag):
+            child_view = UNTLElementView(child, tag)
+            if qualifier is None or child_view.qualifier == qualifier:
+                yield child_view
+
+    def find(self, tag, qualifier=None):
+        """Get a list of the views of the children with a tag."""
+        return list(self.iter_children(tag, qualifier))
+
+    def values(self, tag, qualifier=None):
+        """Get the content of the children with a tag that have content."""
+        values = []
+        for child_view in self.iter_children(tag, qualifier):
+            content = child_view.content
+            if content is not None:
+                values.append(content)
+        return values
+
+    def create_element(self):
+        """Create a UNTL Python object of the element and its children.
+
+        The element is validated as untlxml2py validates it.
+        """
+        untl_element = get_element_class(self.tag)()
+        text = self.element.text
+        if text is not None and text.strip() != '':
+            untl_element.set_content(text)
+        qualifier = self.element.get('qualifier')
+        if qualifier:
+            untl_element.set_qualifier(qualifier)
+        for child_view in self.children:
+            untl_element.add_child(child_view.create_element())
+        return untl_element
+
+
+class UNTLRecordView(UNTLElementView):
+    """A read-only UNTL record over a parsed lxml document."""
+
+    __slots__ = ()
+
+    @property
+    def is_hidden(self):
+        """Return True if the record is hidden."""
+        for element in self.iter_children('meta', qualifier='hidden'):
+            return element.content == 'True'
+        sys.stderr.write('A hidden meta element does not exist.')
+        return False
+
+    def create_element_dict(self):
+        """Convert the record into a UNTL Python dictionary, as
+        Metadata.create_element_dict does.
+        """
+        untl_dict = {}
+        for element in self.children:
+            element_dict = {}
+            qualifier = element.qualifier
+            if qualifier is not None:
+                element_dict['qualifier'] = qualifier
+            # Elements that can have children are represented by the
+            # content of their children.
+            if get_element_class(element.tag).contained_children:
+                child_dict = {}
+                for child in element.children:
+                    content = child.content
+                    if content is not None:
+                        child_dict[child.tag] = content
+                element_dict['content'] = child_dict
+            else:
+                content = element.content
+                if content is not None:
+                    element_dict['content'] = content
+            untl_dict.setdefault(element.tag, []).append(element_dict)
+        return untl_dict
+
+    def create_metadata(self):
+        """Convert the record into a Metadata object that can be edited."""
+        return self.create_element()
+
+
+def untlxml2view(untl_filename):
+    """Parse a UNTL XML file object into a read-only UNTL record view.
+
+    You can also pass input like so:
+    from io import BytesIO
+    untlxml2view(BytesIO(untl_xml_bytes))
+    """
+    root = parse(untl_filename).getroot()
+    tag = get_element_tag(root)
+    if tag != 'metadata':
+        raise PyuntlException('Root element "%s" is not a UNTL record.' % (tag,))
+    return UNTLRecordView(root, tag)
@@ -0,0 +1,351 @@
+"""
+    Stores and indexes for the UNTL vocabularies.
+
+    By default get_vocabularies keeps the vocabularies in memory only.
+    To keep them in a file shared by many processes, set a store:
+    from pyuntl.untl_structure import set_vocabulary_store
+    from pyuntl.vocabulary import FileVocabularyStore
+    set_vocabulary_store(FileVocabularyStore('/var/cache/untl-vocabs.json'))
+
+    Stores are safe to share between threads, and AsyncVocabularyClient
+    gets the vocabularies from a store without blocking an event loop.
+"""
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+class VocabularyException(Exception):
+    """Base exception for the vocabulary stores."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return '%s' % (self.value,)
+
+
+class VocabularyStore(object):
+    """Retrieve vocabularies over HTTP and keep them in memory.
+
+    ttl: Seconds before the vocabularies are revalidated with the
+    server. None keeps them for the life of the store.
+    timeout: Seconds to wait for the server on each attempt.
+    retries: Number of additional attempts after a failed request.
+    retry_delay: Seconds to wait between attempts.
+
+    Subclasses may override load and save to keep the retrieved
+    vocabularies somewhere more permanent.
+
+    Threads needing the same URL while it is retrieved wait for the
+    one retrieval rather than making their own.
+    """
+
+    def __init__(self, ttl=None, timeout=15, retries=3, retry_delay=3):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.entries = {}
+        # Locks held while retrieving each URL.
+        self.url_locks = {}
+        self.url_locks_lock = threading.Lock()
+
+    def get(self, url):
+        """Get the vocabularies for the URL."""
+        vocabularies = self.cached(url)
+        if vocabularies is not None:
+            return vocabularies
+        with self.get_url_lock(url):
+            # Another thread may have retrieved them while this one waited.
+            entry = self.entries.get(url)
+            if entry is None:
+                entry = self.load(url)
+            if entry is None or self.is_stale(entry):
+                entry = self.refresh(url, entry)
+            self.entries[url] = entry
+        return entry['vocabularies']
+
+    def cached(self, url):
+        """Get the vocabularies for the URL if they are held in memory
+        and fresh, without retrieving them. Returns None otherwise.
+        """
+        entry = self.entries.get(url)
+        if entry is None or self.is_stale(entry):
+            return None
+        return entry['vocabularies']
+
+    def get_version(self, url):
+        """Get the version of the vocabularies held for the URL, from
+        their ETag or Last-Modified value. Returns None if neither is
+        known.
+        """
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        return entry.get('etag') or entry.get('last_modified')
+
+    def get_url_lock(self, url):
+        """Get the lock held while retrieving the URL."""
+        with self.url_locks_lock:
+            return self.url_locks.setdefault(url, threading.Lock())
+
+    def is_stale(self, entry):
+        """Determine if an entry has outlived the store's TTL."""
+        if self.ttl is None:
+            return False
+        return time.time() - entry['fetched'] >= self.ttl
+
+    def load(self, url):
+        """Load a previously saved entry for the URL, if there is one."""
+        return None
+
+    def save(self, url, entry):
+        """Save an entry retrieved for the URL."""
+        pass
+
+    def refresh(self, url, entry=None):
+        """Retrieve the vocabularies, falling back to a stale entry."""
+        try:
+            new_entry = self.fetch(url, entry)
+        except VocabularyException:
+            # A stale copy is better than none when the server is down.
+            if entry is not None:
+                return entry
+            raise
+        self.save(url, new_entry)
+        return new_entry
+
+    def fetch(self, url, entry=None):
+        """Request the vocabularies from the server.
+
+        If an entry is given, the request is made conditional on its
+        ETag and Last-Modified values, and the entry is reused when
+        the server reports it has not changed.
+        """
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        request = urllib.request.Request(url, headers=headers)
+        attempt = 0
+        while True:
+            try:
+                response = urllib.request.urlopen(request, timeout=self.timeout)
+                vocabularies = json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                if e.code == 304 and entry is not None:
+                    return dict(entry, fetched=time.time())
+                error = e
+            except Exception as e:
+                error = e
+            else:
+                response_headers = getattr(response, 'headers', None) or {}
+                return {
+                    'url': url,
+                    'vocabularies': vocabularies,
+                    'fetched': time.time(),
+                    'etag': response_headers.get('ETag'),
+                    'last_modified': response_headers.get('Last-Modified'),
+                }
+            print('Exception caught while trying to retrieve vocabs: {}'.format(error))
+            if attempt < self.retries:
+                attempt += 1
+                time.sleep(self.retry_delay)
+            else:
+                raise VocabularyException('Could not retrieve the vocabularies')
+
+
+class FileVocabularyStore(VocabularyStore):
+    """Keep the retrieved vocabularies in a cache file.
+
+    path: The cache file. It is written atomically, so it may be
+    shared by many processes.
+    ttl: Seconds before the cached vocabularies are revalidated with
+    the server. Defaults to a day.
+    offline: Never contact the server. The file at path is used as
+    is, and may also be a plain copy of the vocabularies JSON.
+    """
+
+    def __init__(self, path, ttl=86400, offline=False, **kwargs):
+        super(FileVocabularyStore, self).__init__(ttl=ttl, **kwargs)
+        self.path = path
+        self.offline = offline
+
+    def get(self, url):
+        """Get the vocabularies for the URL."""
+        if self.offline:
+            if url not in self.entries:
+                entry = self.load(url)
+                if entry is None:
+                    raise VocabularyException(
+                        'No vocabularies file found at "%s"' % (self.path)
+                    )
+                self.entries[url] = entry
+            return self.entries[url]['vocabularies']
+        return super(FileVocabularyStore, self).get(url)
+
+    def cached(self, url):
+        """Get the vocabularies for the URL if they are held in memory
+        and fresh, without retrieving them. Returns None otherwise.
+        """
+        if self.offline:
+            entry = self.entries.get(url)
+            return None if entry is None else entry['vocabularies']
+        return super(FileVocabularyStore, self).cached(url)
+
+    def load(self, url):
+        """Load the entry from the cache file."""
+        try:
+            with open(self.path, 'rb') as f:
+                data = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if isinstance(data, dict) and 'vocabularies' in data and 'fetched' in data:
+            if data.get('url') == url or self.offline:
+                return data
+            return None
+        # A plain vocabularies file can only be used offline, since
+        # there is no way to know how old it is.
+        if self.offline:
+            return {'url': url, 'vocabularies': data, 'fetched': 0}
+        return None
+
+    def save(self, url, entry):
+        """Write the entry to the cache file."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            with tempfile.NamedTemporaryFile('w', dir=directory, delete=False,
+                                             encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(f.name, self.path)
+        except OSError as e:
+            # The vocabularies are still usable from memory.
+            print('Exception caught while trying to save vocabs: {}'.format(e))
+
+
+class SingleFlight(object):
+    """Share one call of a blocking function between asyncio callers.
+
+    The function runs in a thread of the executor, the event loop's
+    default executor if none is given. Callers running with the same
+    key while a call is in progress wait for its result rather than
+    making another call. A caller being cancelled does not cancel the
+    call the others are waiting for.
+    """
+
+    def __init__(self, executor=None):
+        self.executor = executor
+        self.in_flight = {}
+
+    async def run(self, key, function, *args):
+        """Call function with args, or wait for the call with the same key."""
+        loop = asyncio.get_event_loop()
+        # Futures belong to a single event loop.
+        flight_key = (loop, key)
+        future = self.in_flight.get(flight_key)
+        if future is None:
+            future = loop.run_in_executor(self.executor, function, *args)
+            self.in_flight[flight_key] = future
+            future.add_done_callback(lambda done: self.in_flight.pop(flight_key, None))
+        return await asyncio.shield(future)
+
+
+class AsyncVocabularyClient(object):
+    """Get vocabularies from a store in asyncio code.
+
+    Vocabularies the store holds are returned right away. Otherwise
+    the store retrieves them in a thread, so the event loop is not
+    blocked, and concurrent calls for a URL share one retrieval.
+
+    client = AsyncVocabularyClient(FileVocabularyStore('/var/cache/untl-vocabs.json'))
+    vocabularies = await client.get(url)
+    """
+
+    def __init__(self, store=None, executor=None):
+        self.store = store if store is not None else VocabularyStore()
+        self.single_flight = SingleFlight(executor)
+
+    async def get(self, url):
+        """Get the vocabularies for the URL."""
+        vocabularies = self.store.cached(url)
+        if vocabularies is not None:
+            return vocabularies
+        return await self.single_flight.run(url, self.store.get, url)
+
+
+class VocabularyIndex(object):
+    """An index of the vocabulary terms by name.
+
+    Built once from the get_vocabularies() data, so a term is found
+    with a dictionary lookup rather than a scan of its vocabulary.
+    It can be passed anywhere the vocabularies dictionary is read
+    with get().
+    """
+
+    def __init__(self, vocabularies):
+        self.vocabularies = vocabularies
+        self.terms = {}
+        for vocab_name, term_list in vocabularies.items():
+            if not isinstance(term_list, list):
+                continue
+            vocab_terms = self.terms[vocab_name] = {}
+            for term_dict in term_list:
+                if isinstance(term_dict, dict) and 'name' in term_dict:
+                    # The first term with a name wins, as with a scan.
+                    vocab_terms.setdefault(term_dict['name'], term_dict)
+        self.json_cache = {}
+
+    def __len__(self):
+        return len(self.vocabularies)
+
+    def get(self, vocab_name, default=None):
+        """Get the term list of a vocabulary."""
+        return self.vocabularies.get(vocab_name, default)
+
+    def lookup(self, vocab_name, name, attribute, default=None):
+        """Get an attribute, such as label or url, of a vocabulary term.
+
+        Returns default if the vocabulary has no term with that name.
+        """
+        term_dict = self.terms.get(vocab_name, {}).get(name)
+        if term_dict is None:
+            return default
+        return term_dict[attribute]
+
+    def to_json(self, vocab_name):
+        """Get the term list of a vocabulary serialized as JSON."""
+        if vocab_name not in self.json_cache:
+            self.json_cache[vocab_name] = json.dumps(
+                self.vocabularies.get(vocab_name),
+                ensure_ascii=False,
+            )
+        return self.json_cache[vocab_name]
+
+
+# The most recently built index, with the vocabularies it was built from.
+VOCAB_INDEX_CACHE = (None, None)
+
+
+def get_vocabulary_index(vocabularies):
+    """Get a VocabularyIndex for the vocabularies data.
+
+    The index is shared for as long as the same vocabularies object
+    is passed in, which is the case for the cached get_vocabularies()
+    data. Passing an index returns it unchanged.
+    """
+    global VOCAB_INDEX_CACHE
+    if isinstance(vocabularies, VocabularyIndex):
+        return vocabularies
+    cached_vocabularies, index = VOCAB_INDEX_CACHE
+    if cached_vocabularies is not vocabularies:
+        index = VocabularyIndex(vocabularies)
+        VOCAB_INDEX_CACHE = (vocabularies, index)
+    return index
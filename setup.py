@@ -15,6 +15,14 @@ setup(
         'lxml>=3.4.4',
         'rdflib>=4.2.1',
     ],
+    extras_require={
+        'numpy': ['numpy'],
+    },
+    entry_points={
+        'console_scripts': [
+            'untl-convert=pyuntl.batch:main',
+        ],
+    },
     description='read, write and modify UNTL metadata records',
     long_description='See the home page for more information.',
     classifiers=[
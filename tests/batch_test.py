@@ -0,0 +1,104 @@
+import json
+import os
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+
+from pyuntl import batch, untldoc
+from tests import VOCAB
+
+
+TEST_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)))
+
+RECORDS_XML = (b'<?xml version="1.0" encoding="UTF-8"?>\n'
+               b'<records>\n'
+               b'  <metadata>\n'
+               b'    <title qualifier="officialtitle">Tres Actos</title>\n'
+               b'  </metadata>\n'
+               b'  <metadata>\n'
+               b'    <title qualifier="officialtitle">The Bronco</title>\n'
+               b'  </metadata>\n'
+               b'  <metadata>\n'
+               b'    <title qualifier="officialtitle">What Spins Away</title>\n'
+               b'  </metadata>\n'
+               b'</records>\n')
+
+
+@pytest.mark.parametrize('record', [
+    b'<metadata><title qualifier="officialtitle">Tres Actos</title></metadata>',
+    '<metadata><title qualifier="officialtitle">Tres Actos</title></metadata>',
+    {'title': [{'qualifier': 'officialtitle', 'content': 'Tres Actos'}]},
+])
+def test_convert_record(record):
+    output = batch.convert_record(record, formats=['dc-json', 'untl-json'])
+    assert json.loads(output['dc-json']) == {'title': ['Tres Actos']}
+    assert json.loads(output['untl-json']) == {
+        'title': [{'qualifier': 'officialtitle', 'content': 'Tres Actos'}]
+    }
+
+
+def test_convert_record_matches_untldoc():
+    untl_elements = untldoc.untlxml2py(os.path.join(TEST_DIR, 'metadc_complete.untl.xml'))
+    output = batch.convert_record(untl_elements, formats=list(batch.CONVERSION_DISPATCH))
+    dc_dict = untldoc.dcpy2dict(untldoc.untlpy2dcpy(untl_elements))
+    highwire = untldoc.untlpy2highwirepy(untl_elements)
+    assert output['dc-xml'] == untldoc.generate_dc_xml(dc_dict)
+    assert output['dc-txt'] == untldoc.generate_dc_txt(dc_dict)
+    assert output['highwire-xml'] == untldoc.generate_highwire_xml(highwire)
+    assert output['untl-json'] == untldoc.generate_untl_json(untl_elements)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_convert_records_keeps_input_order(workers):
+    records = untldoc.iter_untl_records(BytesIO(RECORDS_XML))
+    outputs = list(batch.convert_records(records, formats=['dc-json'],
+                                         workers=workers, chunk_size=1))
+    titles = [json.loads(output['dc-json'])['title'][0] for output in outputs]
+    assert titles == ['Tres Actos', 'The Bronco', 'What Spins Away']
+
+
+def test_convert_records_unknown_format():
+    # The formats are checked before any result is read.
+    with pytest.raises(untldoc.PyuntlException) as err:
+        batch.convert_records([], formats=['marc'])
+    assert 'Output format "marc" is not supported.' == err.value.args[0]
+
+
+@patch('pyuntl.batch.retrieve_vocab', return_value={})
+def test_convert_records_retrieves_vocabularies_once(mock_retrieve_vocab):
+    outputs = batch.convert_records([], resolve_values=True)
+    assert mock_retrieve_vocab.call_count == 1
+    assert list(outputs) == []
+    assert mock_retrieve_vocab.call_count == 1
+
+
+@patch('pyuntl.untldoc.get_vocabulary_index', wraps=untldoc.get_vocabulary_index)
+def test_convert_records_indexes_vocabularies_once(mock_index):
+    records = untldoc.iter_untl_records(BytesIO(RECORDS_XML))
+    outputs = list(batch.convert_records(records, formats=['dc-xml', 'dc-json', 'dc-txt'],
+                                         workers=1, resolve_values=True,
+                                         verbose_vocabularies=VOCAB))
+    assert len(outputs) == 3
+    mock_index.assert_called_once_with(VOCAB)
+
+
+def test_convert_worker_chunk():
+    records = list(untldoc.iter_untl_records(BytesIO(RECORDS_XML)))
+    batch.init_worker(['dc-json'], {'resolve_values': True, 'verbose_vocabularies': VOCAB})
+    try:
+        assert batch.WORKER_DC_CONVERTER.resolve_values
+        assert batch.convert_worker_chunk(records) == batch.convert_chunk(
+            records, ['dc-json'], resolve_values=True, verbose_vocabularies=VOCAB)
+    finally:
+        batch.init_worker(batch.DEFAULT_FORMATS, {})
+
+
+def test_main(capsys):
+    assert batch.main([os.path.join(TEST_DIR, 'metadc_complete.untl.xml'),
+                       '-f', 'dc-json', '-f', 'dc-xml', '-w', '1']) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    output = json.loads(lines[0])
+    assert sorted(output) == ['dc-json', 'dc-xml']
+    assert output['dc-xml'].startswith('<?xml version="1.0" encoding="UTF-8"?>')
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+from pyuntl import binary, untldoc
+from tests import UNTL_DICT
+
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+
+
+def test_UNTLBinaryException():
+    msg = 'msg about error'
+    exception = binary.UNTLBinaryException(msg)
+    assert str(exception) == msg
+
+
+@pytest.mark.parametrize('content, size', [
+    ('A title', 1),
+    ('A' * 300, 2),
+    ('A' * 70000, 4),
+])
+def test_untldict2binary_integer_size(content, size):
+    untl_dict = {'title': [{'content': content}]}
+    untl_bytes = binary.untldict2binary(untl_dict)
+    assert untl_bytes[len(binary.MAGIC) + 1] == size
+    assert binary.untlbinary2pydict(untl_bytes) == untl_dict
+
+
+def test_untldict2binary_round_trip():
+    untl_bytes = binary.untldict2binary(UNTL_DICT)
+    assert untl_bytes.startswith(binary.MAGIC + bytes([binary.FORMAT_VERSION]))
+    assert binary.untlbinary2pydict(untl_bytes) == UNTL_DICT
+
+
+def test_untldict2binary_interns_strings():
+    untl_dict = {'subject': [{'qualifier': 'KWD', 'content': 'yearbooks'},
+                             {'qualifier': 'KWD', 'content': 'yearbooks'}]}
+    untl_bytes = binary.untldict2binary(untl_dict)
+    assert untl_bytes.count(b'yearbooks') == 1
+    assert untl_bytes.count(b'KWD') == 1
+    assert binary.untlbinary2pydict(untl_bytes) == untl_dict
+
+
+def test_untldict2binary_unusual_elements():
+    untl_dict = {'title': [],
+                 'creator': [{'qualifier': 'aut', 'content': {}}],
+                 'note': [{'qualifier': 'display'}, {'content': 'Ünïcödé ' * 40}]}
+    untl_bytes = binary.untldict2binary(untl_dict)
+    assert binary.untlbinary2pydict(untl_bytes) == untl_dict
+
+
+@pytest.mark.parametrize('untl_dict', [
+    {'title': [{'content': 1944}]},
+    {'creator': [{'content': {'name': None}}]},
+    {'title': [{'content': 'A title', 'lang': 'eng'}]},
+    {'title': [{'content': 'A\x00title'}]},
+])
+def test_untldict2binary_invalid(untl_dict):
+    with pytest.raises(binary.UNTLBinaryException):
+        binary.untldict2binary(untl_dict)
+
+
+@pytest.mark.parametrize('filename', ['metadc_complete.untl.xml', 'metadc_utf8.untl.xml'])
+def test_untlpy2binary_round_trip(filename):
+    untl_elements = untldoc.untlxml2py(os.path.join(TEST_DIR, filename))
+    untl_bytes = binary.untlpy2binary(untl_elements)
+    decoded = binary.untlbinary2py(untl_bytes)
+    assert untldoc.untlpy2dict(decoded) == untldoc.untlpy2dict(untl_elements)
+    assert untldoc.get_record_version(decoded) == untldoc.get_record_version(untl_elements)
+    assert len(untl_bytes) < len(untldoc.generate_untl_json(untl_elements, None))
+
+
+def test_untldict2binary_empty():
+    for untl_dict in ({}, {'title': []}, {'title': [{'content': ''}]}):
+        assert binary.untlbinary2pydict(binary.untldict2binary(untl_dict)) == untl_dict
+
+
+def test_untlbinary2pydict_buffer():
+    untl_bytes = binary.untldict2binary(UNTL_DICT)
+    buffer = bytearray(b'..' + untl_bytes)
+    view = memoryview(buffer)[2:]
+    assert binary.untlbinary2pydict(view) == UNTL_DICT
+
+
+@pytest.mark.parametrize('untl_bytes, message', [
+    (b'<metadata/>', 'Data is not a binary UNTL record'),
+    (binary.MAGIC + b'\x63\x01', 'Binary UNTL format version 99 is not supported'),
+    (binary.MAGIC + bytes([binary.FORMAT_VERSION, 3]), 'Binary UNTL record is corrupt'),
+    (binary.untldict2binary(UNTL_DICT)[:-3], 'Binary UNTL record is corrupt'),
+    (binary.untldict2binary(UNTL_DICT)[:40], 'Binary UNTL record is corrupt'),
+    (binary.untldict2binary(UNTL_DICT) + b'\x00', 'Binary UNTL record is corrupt'),
+    (binary.untldict2binary({'title': [{'content': 'A title'}]}).replace(
+        b'A title', b'A\x00title'), 'Binary UNTL record is corrupt'),
+], ids=['not binary', 'version', 'integer size', 'truncated text', 'truncated', 'trailing',
+        'string count'])
+def test_untlbinary2pydict_invalid(untl_bytes, message):
+    with pytest.raises(binary.UNTLBinaryException) as err:
+        binary.untlbinary2pydict(untl_bytes)
+    assert str(err.value).startswith(message)
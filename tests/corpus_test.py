@@ -0,0 +1,115 @@
+import os
+from array import array
+from io import BytesIO
+
+import pytest
+
+from pyuntl.corpus import CorpusException, UNTLCorpus
+from pyuntl.metadata_generator import UNTLXMLWriter
+from pyuntl.untldoc import untldict2py, untlxml2pydict
+from tests import UNTL_DICT
+
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+
+RECORD_FILES = [
+    'metadc_complete.untl.xml',
+    'metadc_empty.untl.xml',
+    'metadc_blank_description.untl.xml',
+    'metadc_utf8.untl.xml',
+]
+
+
+@pytest.fixture
+def corpus():
+    corpus = UNTLCorpus()
+    for filename in RECORD_FILES:
+        corpus.add_xml(os.path.join(TEST_DIR, filename))
+    corpus.add(UNTL_DICT)
+    return corpus
+
+
+def test_add_xml_many_records():
+    output = BytesIO()
+    with UNTLXMLWriter(output) as writer:
+        writer.write(UNTL_DICT)
+        writer.write({'title': [{'content': 'A title'}]})
+    corpus = UNTLCorpus()
+    assert corpus.add_xml(BytesIO(output.getvalue())) == range(0, 2)
+    assert corpus.add(untldict2py(UNTL_DICT)) == 2
+    assert len(corpus) == 3
+
+
+def test_records_round_trip(corpus):
+    expected = [untlxml2pydict(os.path.join(TEST_DIR, filename))
+                for filename in RECORD_FILES] + [UNTL_DICT]
+    records = list(corpus.iter_records())
+    assert records == expected
+    # Element lists keep their order, including empty ones.
+    assert [list(record) for record in records] == [list(record) for record in expected]
+    assert [corpus.get_record(number) for number in range(len(corpus))] == expected
+
+
+def test_get_record_not_in_corpus(corpus):
+    with pytest.raises(CorpusException):
+        corpus.get_record(len(corpus))
+
+
+def test_strings_are_stored_once(corpus):
+    assert len(corpus.strings) == len(set(corpus.strings))
+    column = corpus.columns[('language', None)]
+    assert isinstance(column.contents, array)
+    assert corpus.strings[column.contents[0]] == 'eng'
+
+
+def test_having_and_missing(corpus):
+    assert corpus.missing('date', 'creation') == [1]
+    assert corpus.having('date', 'creation') == [0, 2, 3, 4]
+    assert corpus.having('language', value='spa') == [3]
+    assert corpus.having('language', value='not stored') == []
+    assert corpus.having('description') == [0, 3, 4]
+
+
+def test_having_child_content(corpus):
+    assert corpus.having('creator', child='type', value='org') == [4]
+    assert corpus.missing('publisher', child='location') == [1]
+
+
+def test_facet_counts_records(corpus):
+    counts = corpus.facet_counts('language')
+    assert counts == {'eng': 3, 'spa': 1}
+    # Records are counted once, however many elements hold a value.
+    corpus.add({'language': [{'content': 'eng'}, {'content': 'eng'}]})
+    assert corpus.facet_counts('language')['eng'] == 4
+
+
+def test_distinct(corpus):
+    assert corpus.distinct('resourceType') == {'text_etd', 'text_book'}
+    assert corpus.distinct('subject', 'LCSH') == {
+        element['content']
+        for record in corpus.iter_records()
+        for element in record.get('subject', [])
+        if element.get('qualifier') == 'LCSH'
+    }
+    assert corpus.distinct('creator', child='type') == {'per', 'org'}
+
+
+def test_add_not_a_string():
+    with pytest.raises(CorpusException):
+        UNTLCorpus().add({'title': [{'content': 1}]})
+
+
+def test_add_rejected_record_leaves_corpus_unchanged():
+    corpus = UNTLCorpus()
+    corpus.add({'title': [{'content': 'A'}]})
+    bad_record = {'title': [{'content': 'Bad'}],
+                  'creator': [{'content': {'name': 'X', 'type': None}}],
+                  'date': []}
+    with pytest.raises(CorpusException):
+        corpus.add(bad_record)
+    assert len(corpus) == 1
+    assert corpus.strings == [None, 'A']
+    assert corpus.empty_tags == {}
+    record = {'creator': [{'qualifier': 'aut', 'content': {'name': 'Y'}}]}
+    assert corpus.add(record) == 1
+    assert list(corpus.iter_records()) == [{'title': [{'content': 'A'}]}, record]
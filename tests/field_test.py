@@ -27,8 +27,9 @@ class FieldTest(unittest.TestCase):
         self.assertEqual(self.field.content, 'test')
 
     def test_add_unspecified_attribute(self):
-        self.field.name = 'Donald Ronald'
-        self.assertTrue(self.field.name)
+        # Elements use __slots__, so arbitrary attributes can't be set.
+        with self.assertRaises(AttributeError):
+            self.field.name = 'Donald Ronald'
 
     def test_add_content_non_ascii(self):
         self.field.set_content('test \xc2')
@@ -7,10 +7,11 @@ from pyuntl.highwire_structure import (format_date_string, HighwireElement,
                                        CitationPublisher,
                                        CitationPublicationDate,
                                        CitationOnlineDate, citation_director,
-                                       identifier_director)
+                                       identifier_director, format_publication_date)
 from pyuntl.untldoc import (untlpy2highwirepy, untldict2py, highwirepy2dict,
                             generate_highwire_xml, generate_highwire_json,
-                            generate_highwire_text)
+                            generate_highwire_text, HighwireConverter,
+                            PyuntlException)
 from tests import UNTL_DICT
 
 
@@ -210,6 +211,64 @@ class TestHighwire(unittest.TestCase):
         c = CitationTitle(qualifier='test')
         self.assertEqual(c.name, 'citation_title')
 
+    def testFormatPublicationDate(self):
+        """Test the date, month or year of a creation date is formatted."""
+        self.assertEqual(format_publication_date('1944-02-03'), '02/03/1944')
+        self.assertEqual(format_publication_date('1944/02'), '02/1944')
+        self.assertEqual(format_publication_date('1944-13'), '1944')
+        self.assertEqual(format_publication_date('1944-02-03x'), '1944')
+        self.assertEqual(format_publication_date('194x'), None)
+        # Dates that do not exist are not used.
+        self.assertEqual(format_publication_date('1944-02-30'), None)
+
+    def testHighwireConverter(self):
+        """Test the converter gives the output of the highwire elements."""
+        untlpy = untldict2py(UNTL_DICT)
+        highwire_elements = untlpy2highwirepy(untlpy)
+        converter = HighwireConverter()
+        for record in [UNTL_DICT, untlpy]:
+            highwire_dict = converter.create_dict(record)
+            self.assertEqual(highwire_dict, highwirepy2dict(highwire_elements))
+            self.assertEqual(list(highwire_dict), list(highwirepy2dict(highwire_elements)))
+            self.assertEqual(converter.create_json(record), HIGHWIRE_JSON)
+            self.assertEqual(converter.create_text(record), HIGHWIRE_TEXT)
+            self.assertEqual(converter.create_xml(record),
+                             generate_highwire_xml(list(highwire_elements)))
+
+    def testHighwireConverterTitlesAndEscape(self):
+        """Test the converter picks titles and escapes as untlpy2highwirepy."""
+        untl_dict = {
+            'title': [{'qualifier': 'serialtitle', 'content': 'Serial & Co'},
+                      {'qualifier': 'officialtitle', 'content': 'Caf\xe9 <1>'},
+                      {'qualifier': 'addedtitle', 'content': 'Added'}],
+            'publisher': [{'content': {'name': 'First & Sons'}},
+                          {'content': {'name': 'Second'}}],
+            'date': [{'qualifier': 'creation', 'content': 'unknown'},
+                     {'qualifier': 'creation', 'content': '1944-02'},
+                     {'qualifier': 'creation', 'content': '1945'}],
+            'identifier': [{'qualifier': 'DOI', 'content': '10.1/a&b'}],
+        }
+        for escape in [False, True]:
+            highwire_elements = untlpy2highwirepy(untldict2py(untl_dict), escape=escape)
+            self.assertEqual(HighwireConverter(escape=escape).create_dict(untl_dict),
+                             highwirepy2dict(highwire_elements))
+        self.assertEqual(HighwireConverter(escape=True).create_dict(untl_dict), {
+            'citation_publisher': [{'content': 'First &amp; Sons'}],
+            'citation_publication_date': [{'content': '02/1944'}],
+            'citation_doi': [{'content': '10.1/a&b'}],
+            'citation_title': [{'content': 'Caf&#233; &lt;1&gt;'}],
+        })
+
+    def testHighwireConverterRecords(self):
+        """Test many records are converted to the requested format."""
+        converter = HighwireConverter()
+        records = [UNTL_DICT, {'title': [{'content': 'Only a title'}]}]
+        outputs = list(converter.convert_records(records, output_format='text'))
+        self.assertEqual(outputs, [HIGHWIRE_TEXT, 'citation_title: Only a title'])
+        self.assertEqual(converter.convert(UNTL_DICT, 'json'), HIGHWIRE_JSON)
+        with self.assertRaises(PyuntlException):
+            list(converter.convert_records(records, output_format='marc'))
+
 
 def suite():
     test_suite = unittest.makeSuite(TestHighwire, 'test')
@@ -1,4 +1,5 @@
 import os
+from io import BytesIO
 from unittest.mock import patch
 
 import pytest
@@ -6,6 +7,8 @@ from lxml.etree import Element, tostring, fromstring
 
 from pyuntl import (metadata_generator as mg, untl_structure as us,
                     highwire_structure as hs)
+from pyuntl.untldoc import iter_untl_records, untldict2py
+from tests import UNTL_DICT
 
 
 def test_MetadataGeneratorException():
@@ -170,6 +173,48 @@ def test_create_dict_subelement_content_dict_not_degree():
         assert root[0].find(key).text == value
 
 
+def test_write_untl_xml_wrapped():
+    """Test records are written as children of one wrapper element."""
+    output = BytesIO()
+    records = [UNTL_DICT, untldict2py(UNTL_DICT)]
+    assert mg.write_untl_xml(output, iter(records)) == 2
+    xml = output.getvalue()
+    assert xml.startswith(b'<?xml version="1.0" encoding="UTF-8"?>\n<records>\n')
+    assert xml.endswith(b'</metadata>\n</records>\n')
+    root = fromstring(xml)
+    assert [child.tag for child in root] == ['metadata', 'metadata']
+    output.seek(0)
+    for untl_elements in iter_untl_records(output):
+        assert mg.py2dict(untl_elements) == mg.py2dict(untldict2py(UNTL_DICT))
+
+
+def test_write_untl_xml_unwrapped():
+    """Test records are written as documents of their own."""
+    output = BytesIO()
+    records = [UNTL_DICT, untldict2py(UNTL_DICT)]
+    assert mg.write_untl_xml(output, records, wrapper=None) == 2
+    assert output.getvalue() == (mg.pydict2xmlstring(UNTL_DICT)
+                                 + untldict2py(UNTL_DICT).create_xml_string())
+
+
+def test_UNTLXMLWriter_passes_dict_arguments():
+    output = BytesIO()
+    with mg.UNTLXMLWriter(output, wrapper='collection', root_label='record') as writer:
+        writer.write({'title': [{'content': 'Important Paper'}]})
+    assert output.getvalue() == (b'<?xml version="1.0" encoding="UTF-8"?>\n'
+                                 b'<collection>\n'
+                                 b'<record>\n'
+                                 b'  <title>Important Paper</title>\n'
+                                 b'</record>\n'
+                                 b'</collection>\n')
+
+
+def test_UNTLXMLWriter_outside_context_raises_exception():
+    writer = mg.UNTLXMLWriter(BytesIO())
+    with pytest.raises(mg.MetadataGeneratorException):
+        writer.write(UNTL_DICT)
+
+
 def test_highwiredict2xmlstring():
     issue = hs.CitationIssue(content='1')
     title = hs.CitationTitle(content='Important paper')
@@ -225,6 +270,21 @@ def test_breakString_multiple_consecutive_space_chars():
     assert line == 'Hello\n  world'
 
 
+def test_breakString_many_lines():
+    text = ' '.join(['word'] * 50000)
+    # Breaking into more lines than the recursion limit.
+    lines = mg.breakString(text, width=20, firstLineOffset=6).split('\n')
+    assert len(lines) > 10000
+    assert len(lines[0]) <= 14
+    assert all(len(line) <= 20 and line.startswith(' ') for line in lines[1:])
+    assert ''.join(lines) == text
+
+
+def test_breakString_space_at_end():
+    text = 'a' * 10 + ' '
+    assert mg.breakString(text, width=10) == text
+
+
 def test_writeANVLString():
     elements = {'issue': [{'content': '1'}],
                 'title': [{'content': 'Important Paper'},
@@ -233,3 +293,26 @@ def test_writeANVLString():
     assert anvl == ('title: Important Paper\n'
                     'title: Another Paper\n'
                     'issue: 1')
+
+
+def test_ANVLWriter():
+    records = [{'title': [{'content': 'Tres Actos'}], 'date': [{'content': '1944'}]},
+               untldict2py({'title': [{'content': 'The Bronco'}]})]
+    output = BytesIO()
+    assert mg.write_anvl(output, records, ordering=['title', 'date']) == 2
+    assert output.getvalue() == (b'title: Tres Actos\n'
+                                 b'date: 1944\n'
+                                 b'\n'
+                                 b'title: The Bronco\n')
+
+
+def test_ANVLWriter_empty_record():
+    output = BytesIO()
+    assert mg.write_anvl(output, [{}, {'title': []}], ordering=['title']) == 2
+    assert output.getvalue() == b'# empty record\n\n# empty record\n'
+
+
+def test_ANVLWriter_outside_context():
+    writer = mg.ANVLWriter(BytesIO())
+    with pytest.raises(mg.MetadataGeneratorException):
+        writer.write({'title': [{'content': 'Tres Actos'}]})
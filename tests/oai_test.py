@@ -0,0 +1,215 @@
+import datetime
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+from lxml.etree import fromstring
+
+from pyuntl import oai
+from pyuntl.dc_structure import DC_NAMESPACES
+from pyuntl.untldoc import untldict2py
+from tests import UNTL_DICT, VOCAB
+
+
+OAI = oai.OAI
+RESPONSE_DATE = datetime.datetime(2020, 1, 2, 3, 4, 5)
+
+
+def make_record(number):
+    """Create a copy of UNTL_DICT with its own ark."""
+    record = dict(UNTL_DICT)
+    record['meta'] = [
+        {'qualifier': 'ark', 'content': 'ark:/67531/metapth%d' % number},
+        {'qualifier': 'metadataCreationDate', 'content': '2008-06-29, 00:31:14'},
+    ]
+    return record
+
+
+def identifiers(root):
+    return [element.text for element in root.iter(OAI + 'identifier')]
+
+
+def test_OAIException():
+    err = oai.OAIException('Bad token', 'badResumptionToken')
+    assert str(err) == 'Bad token'
+    assert err.code == 'badResumptionToken'
+
+
+def test_record_header():
+    assert oai.record_header(UNTL_DICT) == (
+        'info:ark/67531/metapth38622',
+        '2008-06-29T00:31:14Z',
+        ['partner:HSUL', 'collection:HSUY'],
+    )
+    # The header is the same from a UNTL Python object.
+    assert oai.record_header(untldict2py(UNTL_DICT)) == oai.record_header(UNTL_DICT)
+
+
+def test_record_header_modification_date():
+    record = make_record(1)
+    record['meta'].append({'qualifier': 'metadataModificationDate', 'content': '2012-01-31'})
+    assert oai.record_header(record)[1] == '2012-01-31T00:00:00Z'
+
+
+def test_record_header_no_ark():
+    with pytest.raises(oai.OAIException):
+        oai.record_header({'title': [{'content': 'A title'}]})
+
+
+def test_resumption_token_round_trip():
+    arguments = {'cursor': 200, 'metadataPrefix': 'untl', 'set': 'collection:HSUY'}
+    token = oai.encode_resumption_token(arguments)
+    assert '=' not in token
+    assert oai.decode_resumption_token(token) == arguments
+
+
+@pytest.mark.parametrize('token', [
+    'not a token',
+    oai.encode_resumption_token({'cursor': -1, 'metadataPrefix': 'oai_dc'}),
+    oai.encode_resumption_token({'cursor': 10, 'metadataPrefix': 'mods'}),
+    oai.encode_resumption_token(['cursor', 10]),
+])
+def test_decode_resumption_token_invalid(token):
+    with pytest.raises(oai.OAIException) as err:
+        oai.decode_resumption_token(token)
+    assert err.value.code == 'badResumptionToken'
+
+
+def test_list_records_pages():
+    """Test a list is split into pages linked by resumption tokens."""
+    records = [make_record(number) for number in range(5)]
+    builder = oai.OAIResponseBuilder('https://example.com/oai/', page_size=2)
+    pages = []
+    output = BytesIO()
+    token = builder.list_records(output, iter(records), 'oai_dc',
+                                 request_arguments={'set': 'collection:HSUY'},
+                                 response_date=RESPONSE_DATE)
+    pages.append(fromstring(output.getvalue()))
+    while token is not None:
+        assert oai.decode_resumption_token(token)['set'] == 'collection:HSUY'
+        output = BytesIO()
+        token = builder.list_records(output, iter(records), resumption_token=token)
+        pages.append(fromstring(output.getvalue()))
+    assert [identifiers(page) for page in pages] == [
+        ['info:ark/67531/metapth0', 'info:ark/67531/metapth1'],
+        ['info:ark/67531/metapth2', 'info:ark/67531/metapth3'],
+        ['info:ark/67531/metapth4'],
+    ]
+    first_request = pages[0].find(OAI + 'request')
+    assert first_request.text == 'https://example.com/oai/'
+    assert dict(first_request.attrib) == {'verb': 'ListRecords', 'metadataPrefix': 'oai_dc',
+                                          'set': 'collection:HSUY'}
+    assert pages[0].findtext(OAI + 'responseDate') == '2020-01-02T03:04:05Z'
+    # The last page ends with an empty resumption token.
+    last_token = pages[-1].find('%sListRecords/%sresumptionToken' % (OAI, OAI))
+    assert last_token.text is None
+    assert last_token.get('cursor') == '4'
+
+
+def test_list_records_single_page():
+    """Test a list that fits in one page has no resumption token."""
+    builder = oai.OAIResponseBuilder('https://example.com/oai/')
+    output = BytesIO()
+    assert builder.list_records(output, [make_record(1)], 'oai_dc') is None
+    root = fromstring(output.getvalue())
+    assert root.find('.//%sresumptionToken' % OAI) is None
+    dc = root.find('%sListRecords/%srecord/%smetadata/{%s}dc' % (
+        OAI, OAI, OAI, DC_NAMESPACES['oai_dc']))
+    assert dc.findtext('{%s}title' % DC_NAMESPACES['dc']) == UNTL_DICT['title'][0]['content']
+
+
+def test_list_records_offset_and_complete_list_size():
+    """Test records starting at an offset, with a known list size."""
+    builder = oai.OAIResponseBuilder('https://example.com/oai/', page_size=2)
+    token = oai.encode_resumption_token({'cursor': 2, 'metadataPrefix': 'untl'})
+    # Only records from position 2 onward are given.
+    records = [make_record(number) for number in range(2, 4)]
+    output = BytesIO()
+    next_token = builder.list_records(output, records, resumption_token=token,
+                                      complete_list_size=6, offset=2)
+    root = fromstring(output.getvalue())
+    assert identifiers(root) == ['info:ark/67531/metapth2', 'info:ark/67531/metapth3']
+    assert root.find('.//{http://digital2.library.unt.edu/untl/}metadata') is not None
+    resumption_token = root.find('.//%sresumptionToken' % OAI)
+    assert resumption_token.text == next_token
+    assert dict(resumption_token.attrib) == {'cursor': '2', 'completeListSize': '6'}
+    assert oai.decode_resumption_token(next_token)['cursor'] == 4
+
+
+@pytest.mark.parametrize('arguments, code', [
+    ({'records': [], 'metadata_prefix': 'oai_dc'}, 'noRecordsMatch'),
+    ({'records': [UNTL_DICT], 'metadata_prefix': 'mods'}, 'cannotDisseminateFormat'),
+    ({'records': [UNTL_DICT],
+      'resumption_token': oai.encode_resumption_token({'cursor': 5, 'metadataPrefix': 'untl'})},
+     'badResumptionToken'),
+])
+def test_list_records_errors(arguments, code):
+    """Test errors are raised before anything is written."""
+    builder = oai.OAIResponseBuilder('https://example.com/oai/')
+    output = BytesIO()
+    with pytest.raises(oai.OAIException) as err:
+        builder.list_records(output, **arguments)
+    assert err.value.code == code
+    assert output.getvalue() == b''
+
+
+@pytest.mark.parametrize('bad_meta', [
+    [{'qualifier': 'metadataCreationDate', 'content': '2008-06-29, 00:31:14'}],
+    [{'qualifier': 'ark', 'content': 'ark:/67531/metapth2'},
+     {'qualifier': 'metadataCreationDate', 'content': 'not a date'}],
+])
+def test_list_records_bad_record_in_page(bad_meta):
+    """Test a record without a header in the middle of a page is
+    raised before anything is written.
+    """
+    bad_record = dict(UNTL_DICT, meta=bad_meta)
+    records = [make_record(1), bad_record, make_record(3)]
+    builder = oai.OAIResponseBuilder('https://example.com/oai/', page_size=3)
+    output = BytesIO()
+    with pytest.raises(oai.OAIException):
+        builder.list_records(output, records, 'oai_dc')
+    assert output.getvalue() == b''
+    # The pages before the bad record can still be written.
+    builder = oai.OAIResponseBuilder('https://example.com/oai/', page_size=1)
+    token = builder.list_records(output, records, 'oai_dc')
+    assert identifiers(fromstring(output.getvalue())) == ['info:ark/67531/metapth1']
+    with pytest.raises(oai.OAIException):
+        builder.list_records(BytesIO(), records, resumption_token=token)
+
+
+def test_get_record_no_header():
+    builder = oai.OAIResponseBuilder('https://example.com/oai/')
+    output = BytesIO()
+    with pytest.raises(oai.OAIException):
+        builder.get_record(output, {'title': [{'content': 'A title'}]}, 'oai_dc')
+    assert output.getvalue() == b''
+
+
+def test_get_record():
+    builder = oai.OAIResponseBuilder('https://example.com/oai/')
+    output = BytesIO()
+    builder.get_record(output, untldict2py(UNTL_DICT), 'oai_dc')
+    root = fromstring(output.getvalue())
+    assert root.find(OAI + 'request').get('identifier') == 'info:ark/67531/metapth38622'
+    assert identifiers(root) == ['info:ark/67531/metapth38622']
+    assert root.find('%sGetRecord/%srecord/%smetadata' % (OAI, OAI, OAI)) is not None
+
+
+@patch('pyuntl.untldoc.retrieve_vocab')
+def test_list_records_retrieves_vocabularies_once(mock_retrieve):
+    mock_retrieve.return_value = VOCAB
+    builder = oai.OAIResponseBuilder('https://example.com/oai/', page_size=3,
+                                     resolve_values=True)
+    builder.get_record(BytesIO(), make_record(1), 'oai_dc')
+    builder.list_records(BytesIO(), [make_record(number) for number in range(3)], 'oai_dc')
+    mock_retrieve.assert_called_once_with()
+
+
+def test_write_error():
+    builder = oai.OAIResponseBuilder('https://example.com/oai/')
+    output = BytesIO()
+    builder.write_error(output, 'badVerb', 'Illegal verb', response_date=RESPONSE_DATE)
+    assert output.getvalue().startswith(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+    error = fromstring(output.getvalue()).find(OAI + 'error')
+    assert error.get('code') == 'badVerb'
+    assert error.text == 'Illegal verb'
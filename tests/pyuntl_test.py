@@ -3,7 +3,7 @@ import os
 from io import BytesIO
 import unittest
 
-from pyuntl import UNTL_XML_ORDER
+from pyuntl import MAX_ORDER_RANKS, ORDER_RANKS, UNTL_XML_ORDER, get_order_ranks
 from pyuntl.quality import determine_completeness
 from pyuntl.metadata_generator import pydict2xmlstring
 from pyuntl.untldoc import (untldict2py, py2dict, untlxml2py, post2pydict,
@@ -151,6 +151,37 @@ class TestUNTLDictionaryToPythonObject(unittest.TestCase):
             py2dict(untlxml2py(BytesIO(
                     pydict2xmlstring(UNTL_DICT)))), UNTL_DICT)
 
+    def testOrderRanks(self):
+        """Test ranks match the index of each name in the ordering."""
+        ranks = get_order_ranks(UNTL_XML_ORDER)
+        self.assertIs(ranks, ORDER_RANKS[tuple(UNTL_XML_ORDER)])
+        self.assertEqual(ranks, {name: UNTL_XML_ORDER.index(name)
+                                 for name in UNTL_XML_ORDER})
+
+    def testOrderRanksRepeatedName(self):
+        """Test a repeated name keeps its first position."""
+        ordering = ['title', 'meta', 'title', 'note']
+        self.assertEqual(get_order_ranks(ordering), {'title': 0, 'meta': 1, 'note': 3})
+        self.assertIs(get_order_ranks(list(ordering)), get_order_ranks(ordering))
+
+    def testOrderRanksChangedInPlace(self):
+        """Test a list changed in place gets the ranks of its new names."""
+        ordering = ['title', 'meta']
+        self.assertEqual(get_order_ranks(ordering), {'title': 0, 'meta': 1})
+        ordering.reverse()
+        self.assertEqual(get_order_ranks(ordering), {'meta': 0, 'title': 1})
+        ordering.append('note')
+        self.assertEqual(get_order_ranks(ordering)['note'], 2)
+
+    def testOrderRanksBounded(self):
+        """Test the rank dictionaries kept are limited in number."""
+        for i in range(MAX_ORDER_RANKS * 2):
+            name = 'name%d' % i
+            self.assertEqual(get_order_ranks(('title', name)), {'title': 0, name: 1})
+        self.assertLessEqual(len(ORDER_RANKS), MAX_ORDER_RANKS)
+        # The orderings of the module are kept.
+        self.assertIs(get_order_ranks(list(UNTL_XML_ORDER)), ORDER_RANKS[tuple(UNTL_XML_ORDER)])
+
 
 def suite():
     test_suite = unittest.makeSuite(TestUNTLDictionaryToPythonObject, 'test')
@@ -0,0 +1,120 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from pyuntl import quality
+from pyuntl.untldoc import untldict2py, untlpy2dict, untlxml2py
+
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+
+RECORD_FILES = [
+    'metadc_complete.untl.xml',
+    'metadc_empty.untl.xml',
+    'metadc_legacy_defaults.untl.xml',
+    'metadc_no_description.untl.xml',
+]
+
+
+@pytest.fixture
+def records():
+    return [untlxml2py(os.path.join(TEST_DIR, filename)) for filename in RECORD_FILES]
+
+
+@pytest.mark.parametrize('content, placeholder', [
+    ('change as necessary', True),
+    ('Change Template Values When Appropriate', True),
+    ('change as necessary, then save', False),
+    ('{{{ title }}}', True),
+    ('A title\n{{{ title }}}', True),
+    ('{{{\n}}}', False),
+    ('A title', False),
+])
+def test_PLACEHOLDER_REGEX(content, placeholder):
+    assert bool(quality.PLACEHOLDER_REGEX.match(content)) == placeholder
+
+
+def test_CompletenessScorer_presence():
+    scorer = quality.CompletenessScorer()
+    record = untldict2py({
+        'title': [{'qualifier': 'officialtitle', 'content': 'A title'}],
+        'description': [{'qualifier': 'content', 'content': 'change as necessary'}],
+        'meta': [{'qualifier': 'ark', 'content': 'ark:/67531/metapth1'},
+                 {'qualifier': 'system', 'content': 'PTH'}],
+    })
+    assert dict(zip(scorer.fields, scorer.presence(record))) == {
+        'title': True,
+        'description': False,
+        'language': False,
+        'collection': False,
+        'institution': False,
+        'resourceType': False,
+        'format': False,
+        'subject': False,
+        'meta': True,
+    }
+    assert scorer.score(record) == 30 / 59
+
+
+def test_score_completeness_matches_determine_completeness(records):
+    expected = [quality.determine_completeness(record) for record in records]
+    assert expected == [1.0, 0.0, 48 / 59, 58 / 59]
+    assert list(quality.score_completeness(records)) == expected
+    # UNTL dictionaries score the same as UNTL Python objects.
+    untl_dicts = [untlpy2dict(record) for record in records]
+    assert list(quality.score_completeness(iter(untl_dicts))) == expected
+
+
+def test_score_completeness_strips_dictionary_content():
+    untl_dict = {'title': [{'content': ' change as necessary '}]}
+    assert quality.score_completeness([untl_dict])[0] == 0.0
+
+
+def test_score_completeness_with_presence(records):
+    scores, columns = quality.score_completeness(records, with_presence=True)
+    assert list(columns) == list(quality.COMPLETENESS_WEIGHTS)
+    assert list(columns['title']) == [1, 0, 0, 1]
+    assert list(columns['description']) == [1, 0, 0, 0]
+
+
+def test_score_completeness_weights(records):
+    scores = quality.score_completeness(records, weights={'title': 1, 'description': 3})
+    assert list(scores) == [1.0, 0.0, 0.0, 0.25]
+
+
+def test_score_completeness_numpy(records):
+    numpy = pytest.importorskip('numpy')
+    scores, presence = quality.score_completeness(records, use_numpy=True,
+                                                  with_presence=True)
+    assert isinstance(scores, numpy.ndarray)
+    assert scores.tolist() == list(quality.score_completeness(records))
+    assert presence.dtype == bool
+    assert presence.shape == (len(records), len(quality.COMPLETENESS_WEIGHTS))
+    assert presence[:, 0].tolist() == [True, False, False, True]
+
+
+@patch('pyuntl.quality.numpy', None)
+def test_score_completeness_numpy_missing(records):
+    with pytest.raises(quality.QualityException):
+        quality.score_completeness(records, use_numpy=True)
+
+
+@patch.dict(quality.COMPLETENESS_PROFILES)
+def test_register_completeness_profile():
+    scorer = quality.register_completeness_profile('titles', {'title': 1})
+    assert quality.get_completeness_scorer('titles') is scorer
+    assert scorer.fields == ('title',)
+
+
+def test_get_completeness_scorer_not_registered():
+    with pytest.raises(quality.QualityException):
+        quality.get_completeness_scorer('not registered')
+
+
+def test_record_length(records):
+    for record in records:
+        untl_dict = untlpy2dict(record)
+        assert quality.record_length(record) == len(str(untl_dict))
+        untl_dict.pop('meta', None)
+        assert quality.record_content_length(record) == len(str(untl_dict))
@@ -0,0 +1,90 @@
+from io import BytesIO
+
+import pytest
+from rdflib import ConjunctiveGraph, Graph, Literal, URIRef
+
+from pyuntl import rdf_generator
+from pyuntl.untldoc import dcdict2rdfpy, dcpy2dict, untldict2py, untlpy2dcpy
+from tests import UNTL_DICT
+
+
+def make_dc_dict(number):
+    """Create the DC dictionary of a copy of UNTL_DICT with its own ark."""
+    untl_dict = dict(UNTL_DICT)
+    untl_dict['title'] = [{'qualifier': 'officialtitle',
+                           'content': 'Title %d with "quotes" \\ and\nlines' % number}]
+    return dcpy2dict(untlpy2dcpy(untldict2py(untl_dict), ark='ark:/67531/metapth%d' % number,
+                                 domain_name='example.com'))
+
+
+@pytest.fixture
+def dc_dicts():
+    return [make_dc_dict(number) for number in range(3)]
+
+
+def graph_triples(graph):
+    return set(graph.triples((None, None, None)))
+
+
+def test_dcdict2triples(dc_dicts):
+    uri, triples = rdf_generator.dcdict2triples(dc_dicts[0])
+    assert uri == 'info:ark/67531/metapth0'
+    assert ('title', 'Title 0 with "quotes" \\ and\nlines', False) in triples
+
+
+def test_dcdicts2rdfpy_shared_graph(dc_dicts):
+    rdf_py = rdf_generator.dcdicts2rdfpy(dc_dicts)
+    assert isinstance(rdf_py, ConjunctiveGraph)
+    expected = set()
+    for dc_dict in dc_dicts:
+        expected |= graph_triples(dcdict2rdfpy(dc_dict))
+    assert graph_triples(rdf_py) == expected
+    # Records can be added to an existing graph.
+    graph = Graph()
+    rdf_generator.dcdicts2rdfpy(dc_dicts[:1], graph)
+    assert graph_triples(graph) == graph_triples(dcdict2rdfpy(dc_dicts[0]))
+
+
+@pytest.mark.parametrize('rdf_format', rdf_generator.RDF_FORMATS)
+def test_write_rdf_matches_rdflib(dc_dicts, rdf_format):
+    output = BytesIO()
+    assert rdf_generator.write_rdf(output, dc_dicts, rdf_format=rdf_format) == 3
+    graph = Graph().parse(data=output.getvalue(), format=rdf_format)
+    assert graph_triples(graph) == graph_triples(rdf_generator.dcdicts2rdfpy(dc_dicts))
+
+
+def test_write_rdf_n_triples_lines(dc_dicts):
+    output = BytesIO()
+    rdf_generator.write_rdf(output, dc_dicts[:1])
+    lines = output.getvalue().decode('utf-8').splitlines()
+    assert len(lines) == len(dcdict2rdfpy(dc_dicts[0]))
+    assert ('<info:ark/67531/metapth0> <http://purl.org/dc/elements/1.1/title> '
+            '"Title 0 with \\"quotes\\" \\\\ and\\nlines" .') in lines
+
+
+def test_escape_iri():
+    assert rdf_generator.escape_iri('http://example.com/a b<c>') == \
+        '<http://example.com/a\\u0020b\\u003Cc\\u003E>'
+
+
+def test_write_rdf_uri_values():
+    dc_dict = {'identifier': [{'content': 'ark: ark:/67531/metapth1'},
+                              {'content': 'http://example.com/ark:/67531/metapth1/'}]}
+    output = BytesIO()
+    rdf_generator.write_rdf(output, [dc_dict], rdf_format='xml')
+    graph = Graph().parse(data=output.getvalue(), format='xml')
+    assert (URIRef('info:ark/67531/metapth1'),
+            URIRef('http://purl.org/dc/elements/1.1/identifier'),
+            URIRef('http://example.com/ark:/67531/metapth1/')) in graph
+    assert (None, None, Literal('ark: ark:/67531/metapth1')) in graph
+
+
+def test_RDFWriter_format_not_supported():
+    with pytest.raises(rdf_generator.RDFGeneratorException):
+        rdf_generator.RDFWriter(BytesIO(), rdf_format='json-ld')
+
+
+def test_RDFWriter_outside_context():
+    writer = rdf_generator.RDFWriter(BytesIO())
+    with pytest.raises(rdf_generator.RDFGeneratorException):
+        writer.write({'identifier': []})
@@ -0,0 +1,150 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from pyuntl import batch, untl_structure as us
+from pyuntl.render_cache import (DBMRenderStore, RenderCache, RenderCacheException,
+                                 RenderStore)
+from pyuntl.untldoc import get_full_record_version, get_record_version, untldict2py
+from tests import UNTL_DICT
+
+
+@pytest.fixture
+def untl_elements():
+    return untldict2py(UNTL_DICT)
+
+
+def test_render_matches_batch(untl_elements):
+    render_cache = RenderCache(escape=True)
+    for output_format in batch.CONVERSION_DISPATCH:
+        expected = batch.CONVERSION_DISPATCH[output_format](untl_elements, escape=True)
+        assert render_cache.render(untl_elements, output_format) == expected
+        assert render_cache.render(untl_elements, output_format) == expected
+    assert render_cache.misses == len(batch.CONVERSION_DISPATCH)
+    assert render_cache.hits == len(batch.CONVERSION_DISPATCH)
+
+
+def test_render_new_version(untl_elements):
+    render_cache = RenderCache()
+    first_output = render_cache.render(untl_elements, 'highwire-txt')
+    untl_elements.get_tag_children('title')[0].set_content('A new title')
+    output = render_cache.render(untl_elements, 'highwire-txt')
+    assert output != first_output
+    assert 'A new title' in output
+    assert render_cache.misses == 2
+    # The version can be passed instead of found again.
+    version = get_full_record_version(untl_elements)
+    assert render_cache.render(untl_elements, 'highwire-txt', version=version) == output
+    assert render_cache.hits == 1
+
+
+def test_render_modification_meta_changes(untl_elements):
+    untl_elements.add_child(us.Meta(qualifier='metadataModificationDate',
+                                    content='2008-06-30, 10:00:00'))
+    render_cache = RenderCache()
+    first_output = render_cache.render(untl_elements, 'untl-json')
+    modification_date = next(element for element in untl_elements.get_tag_children('meta')
+                             if element.qualifier == 'metadataModificationDate')
+    modification_date.set_content('2020-01-01, 10:00:00')
+    # The meta value is ignored by get_record_version, but not by the cache.
+    output = render_cache.render(untl_elements, 'untl-json')
+    assert render_cache.misses == 2
+    assert '2020-01-01, 10:00:00' in output
+    assert output != first_output
+    # A record differing only in its modifier gets its own output.
+    other_elements = untldict2py(UNTL_DICT)
+    other_elements.add_child(us.Meta(qualifier='metadataModifier', content='someone'))
+    assert get_record_version(other_elements) == get_record_version(untldict2py(UNTL_DICT))
+    assert 'someone' in render_cache.render(other_elements, 'untl-json')
+    assert render_cache.misses == 3
+
+
+def test_render_options_are_keyed(untl_elements):
+    render_cache = RenderCache()
+    dc_txt = render_cache.render(untl_elements, 'dc-txt')
+    ark = 'ark:/67531/metapth1'
+    dc_txt_ark = render_cache.render(untl_elements, 'dc-txt', ark=ark, domain_name='example.com')
+    assert dc_txt_ark != dc_txt
+    assert ark in dc_txt_ark
+    assert RenderCache(escape=True).get_key('dc-txt', 'v') != render_cache.get_key('dc-txt', 'v')
+
+
+def make_languages(label):
+    return {'languages': [{'url': 'http://example.com/languages/#eng', 'name': 'eng',
+                           'label': label}]}
+
+
+def test_render_new_vocabularies(untl_elements):
+    store = RenderStore()
+    english = RenderCache(store, resolve_values=True,
+                          verbose_vocabularies=make_languages('English'))
+    assert 'English' in english.render(untl_elements, 'dc-json')
+    # Another process resolving with changed vocabularies misses the cache.
+    anglais = RenderCache(store, resolve_values=True,
+                          verbose_vocabularies=make_languages('Anglais'))
+    assert 'Anglais' in anglais.render(untl_elements, 'dc-json')
+    assert anglais.misses == 1
+    # Equal vocabularies hit it.
+    english = RenderCache(store, resolve_values=True,
+                          verbose_vocabularies=make_languages('English'))
+    assert 'English' in english.render(untl_elements, 'dc-json')
+    assert english.hits == 1
+
+
+@patch('pyuntl.render_cache.retrieve_vocab')
+@patch('pyuntl.render_cache.get_vocabularies_version')
+def test_render_vocabularies_version(mock_version, mock_retrieve_vocab, untl_elements):
+    render_cache = RenderCache(resolve_urls=True)
+    mock_version.return_value = '"v1"'
+    key = render_cache.get_key('dc-txt', 'v')
+    assert '"v1"' in key
+    mock_version.return_value = '"v2"'
+    assert render_cache.get_key('dc-txt', 'v') != key
+    mock_retrieve_vocab.assert_not_called()
+    # Without a store version, the retrieved vocabularies are hashed.
+    mock_version.return_value = None
+    mock_retrieve_vocab.return_value = make_languages('English')
+    key = render_cache.get_key('dc-txt', 'v')
+    mock_retrieve_vocab.return_value = make_languages('Anglais')
+    assert render_cache.get_key('dc-txt', 'v') != key
+    # Outputs without resolved values are not keyed by the vocabularies.
+    assert RenderCache().get_key('dc-txt', 'v').count(':') == 2
+
+
+def test_render_format_not_supported(untl_elements):
+    with pytest.raises(RenderCacheException):
+        RenderCache().render(untl_elements, 'marc')
+
+
+def test_RenderStore_evicts_least_recently_used():
+    store = RenderStore(max_entries=2)
+    store.set('a', 'A')
+    store.set('b', 'B')
+    assert store.get('a') == 'A'
+    store.set('c', 'C')
+    assert store.get('b') is None
+    assert store.get('a') == 'A'
+    assert len(store) == 2
+    with pytest.raises(RenderCacheException):
+        RenderStore(max_entries=0)
+
+
+def test_DBMRenderStore(tmpdir, untl_elements):
+    path = os.path.join(str(tmpdir), 'render')
+    with DBMRenderStore(path, max_entries=2) as store:
+        render_cache = RenderCache(store)
+        highwire_xml = render_cache.render(untl_elements, 'highwire-xml')
+        highwire_txt = render_cache.render(untl_elements, 'highwire-txt')
+    # Outputs are kept between processes, as bytes or text.
+    with DBMRenderStore(path, max_entries=2) as store:
+        render_cache = RenderCache(store)
+        assert render_cache.render(untl_elements, 'highwire-xml') == highwire_xml
+        assert render_cache.render(untl_elements, 'highwire-txt') == highwire_txt
+        assert render_cache.hits == 2
+        render_cache.render(untl_elements, 'dc-txt')
+        assert len(store) == 2
+        assert store.get(render_cache.get_key('highwire-xml', get_full_record_version(
+            untl_elements))) is None
+        store.clear()
+        assert len(store) == 0
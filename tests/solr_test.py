@@ -0,0 +1,74 @@
+from unittest.mock import patch
+
+from pyuntl import solr
+from pyuntl.untldoc import get_record_version, untldict2py
+from tests import UNTL_DICT
+
+
+LANGUAGES = {'languages': [{'url': 'http://example.com/languages/#eng',
+                            'name': 'eng',
+                            'label': 'English'}]}
+
+
+def test_SolrDocumentBuilder_document():
+    document = solr.SolrDocumentBuilder().document(UNTL_DICT)
+    assert document['id'] == 'metapth38622'
+    assert document['ark'] == 'ark:/67531/metapth38622'
+    assert document['dc_title'] == [
+        'The Bronco, Yearbook of Hardin-Simmons University, 1944',
+        'The Bronco',
+        'The Bronco 1944',
+    ]
+    assert 'Education/Colleges_and_Universities' in document['untl_bs_facet']
+    assert len(document['untl_bs_facet']) == 6
+    assert len(document['untl_subject']) == len(UNTL_DICT['subject'])
+    assert document['completeness'] == 1.0
+    assert document['record_version'] == get_record_version(untldict2py(UNTL_DICT))
+    # A UNTL Python object gives the same document.
+    assert solr.SolrDocumentBuilder().document(untldict2py(UNTL_DICT)) == document
+
+
+def test_SolrDocumentBuilder_normalizes_subjects():
+    record = {
+        'subject': [
+            {'qualifier': 'LCSH', 'content': 'Texas--History'},
+            {'qualifier': 'UNTL-BS', 'content': 'Places  -  Texas'},
+            {'qualifier': 'KWD', 'content': 'Texas--History'},
+        ],
+    }
+    document = solr.SolrDocumentBuilder().document(record)
+    assert document['untl_subject'] == ['Texas -- History', 'Places - Texas',
+                                        'Texas--History']
+    assert document['untl_bs_facet'] == ['Places/Texas']
+    assert 'id' not in document
+    # Only the requested normalizations are made.
+    document = solr.SolrDocumentBuilder(normalizations={'subject': ['UNTL-BS']}).document(record)
+    assert document['untl_subject'][0] == 'Texas--History'
+
+
+@patch('pyuntl.untldoc.retrieve_vocab', return_value=LANGUAGES)
+def test_SolrDocumentBuilder_indexes_vocabularies_once(mock_retrieve_vocab):
+    builder = solr.SolrDocumentBuilder(resolve_values=True)
+    documents = list(builder.documents([UNTL_DICT, UNTL_DICT]))
+    assert mock_retrieve_vocab.call_count == 1
+    assert documents[0]['dc_language'] == ['English']
+
+
+@patch('pyuntl.untldoc.retrieve_vocab', return_value=None)
+def test_SolrDocumentBuilder_vocabularies_not_retrieved(mock_retrieve_vocab):
+    """Test a failed retrieval is not tried again for each record."""
+    builder = solr.SolrDocumentBuilder(resolve_values=True)
+    documents = list(builder.documents([UNTL_DICT, UNTL_DICT]))
+    assert mock_retrieve_vocab.call_count == 1
+    # The values are not resolved.
+    assert documents[0]['dc_language'] == ['eng']
+
+
+def test_SolrDocumentBuilder_batches():
+    builder = solr.SolrDocumentBuilder(batch_size=2)
+    batches = list(builder.batches(iter([UNTL_DICT] * 5)))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+
+
+def test_untl2solr():
+    assert solr.untl2solr([UNTL_DICT]) == [solr.SolrDocumentBuilder().document(UNTL_DICT)]
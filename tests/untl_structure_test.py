@@ -2,15 +2,25 @@
 """Unit tests for untl_structure."""
 
 import pytest
+import copy
 import io
 import json
-from unittest.mock import patch
+import pickle
+from unittest.mock import Mock, patch
 from lxml.etree import Element
 from pyuntl import untl_structure as us, UNTL_PTH_ORDER, VOCABULARIES_URL
-from pyuntl.form_logic import FormGroup, HiddenGroup, FormElement
+from pyuntl.form_logic import FormGroup, HiddenGroup, FormElement, FormTemplateCache
+from pyuntl.metadata_generator import py2dict
+from pyuntl import quality
 from tests import VOCAB
 
 
+def untl_element_class(tag, **attributes):
+    """Create an element class, since tag metadata is set per class."""
+    attributes.update(tag=tag, __slots__=())
+    return type('TestElement', (us.UNTLElement,), attributes)
+
+
 def test_UNTLStructureException():
     """Check the error string."""
     msg = 'msg about error'
@@ -21,9 +31,8 @@ def test_UNTLStructureException():
 def test_create_untl_xml_subelement_no_children():
     """Test subelement is added to tree with content and qualifier."""
     parent = Element('metadata')
-    title = us.UNTLElement(content='A title',
-                           qualifier='officialtitle')
-    title.tag = 'title'
+    title = untl_element_class('title')(content='A title',
+                                        qualifier='officialtitle')
     subelement = us.create_untl_xml_subelement(parent, title, prefix='')
     assert subelement.text == title.content
     assert subelement.attrib['qualifier'] == title.qualifier
@@ -32,11 +41,10 @@ def test_create_untl_xml_subelement_no_children():
 def test_create_untl_xml_subelement_children():
     """Test children are added as subelements to initial subelement."""
     parent = Element('metadata')
-    contributor = us.UNTLElement(qualifier='cmp')
-    contributor.tag = 'contributor'
-    contributor.contained_children = ['name']
-    name = us.UNTLElement(content='Bob, A.')
-    name.tag = 'name'
+    contributor_class = untl_element_class('contributor',
+                                           contained_children=('name',))
+    contributor = contributor_class(qualifier='cmp')
+    name = untl_element_class('name')(content='Bob, A.')
     contributor.add_child(name)
     subelement = us.create_untl_xml_subelement(parent, contributor)
     assert subelement.attrib['qualifier'] == contributor.qualifier
@@ -47,8 +55,7 @@ def test_create_untl_xml_subelement_children():
 def test_add_missing_children():
     """Test adding expected children that don't exist for a form."""
     required = ['title', 'format', 'publisher']
-    parent = us.UNTLElement()
-    parent.contained_children = required
+    parent = untl_element_class('metadata', contained_children=required)()
     title_child = us.Title(content='A title',
                            qualifier='officialtitle')
     children = [title_child]
@@ -65,7 +72,8 @@ def test_UNTLElement_init():
     element = us.UNTLElement(content='test_content',
                              qualifier='test_qualifier')
     assert element.tag is None
-    assert element.contained_children == []
+    assert element.contained_children == ()
+    assert element.allowed_children == frozenset()
     assert element.allows_content
     assert element.allows_qualifier
     assert element.qualifier == 'test_qualifier'
@@ -73,6 +81,20 @@ def test_UNTLElement_init():
     assert element.content == 'test_content'
 
 
+def test_UNTLElement_revision():
+    """Test setting content or a qualifier gives a new revision."""
+    element = us.UNTLElement()
+    revisions = [element.revision]
+    element.set_content('test_content')
+    revisions.append(element.revision)
+    element.qualifier = 'test_qualifier'
+    revisions.append(element.revision)
+    element.content = 'test_content'
+    revisions.append(element.revision)
+    assert revisions == sorted(set(revisions))
+    assert us.UNTLElement().revision > element.revision
+
+
 def test_UNTLElement_set_qualifier():
     """Test setting and stripping of qualifier value."""
     element = us.UNTLElement()
@@ -82,27 +104,23 @@ def test_UNTLElement_set_qualifier():
 
 def test_UNTLElement_set_qualifier_exception():
     """Test a qualifier must be allowed to set one."""
-    element = us.UNTLElement()
-    element.allows_qualifier = False
+    element = untl_element_class('test', allows_qualifier=False)()
     with pytest.raises(us.UNTLStructureException):
         element.set_qualifier('test_qualifier')
 
 
 def test_UNTLElement_add_child():
     """Test children in contained_children are allowed for adding."""
-    child_element = us.UNTLElement()
     child_tag = 'child1'
-    child_element.tag = child_tag
-    element = us.UNTLElement()
-    element.contained_children.append(child_tag)
+    child_element = untl_element_class(child_tag)()
+    element = untl_element_class('parent', contained_children=(child_tag,))()
     element.add_child(child_element)
     assert child_element in element.children
 
 
 def test_UNTLElement_add_child_exception():
     """Test random children are not allowed."""
-    child_element = us.UNTLElement()
-    child_element.tag = 'child1'
+    child_element = untl_element_class('child1')()
     element = us.UNTLElement()
     with pytest.raises(us.UNTLStructureException):
         element.add_child(child_element)
@@ -117,16 +135,14 @@ def test_UNTLElement_set_content():
 
 def test_UNTLElement_set_content_exception():
     """Test content must be allowed to set it."""
-    element = us.UNTLElement()
-    element.allows_content = False
+    element = untl_element_class('test', allows_content=False)()
     with pytest.raises(us.UNTLStructureException):
         element.set_content('test_content')
 
 
 def test_UNTLElement_add_form_qualifier_and_content():
     """Test form is created with qualifier and content passed."""
-    element = us.UNTLElement()
-    element.tag = 'title'
+    element = untl_element_class('title')()
     qualifiers = ['test']
     element.add_form(vocabularies={'title-qualifiers': qualifiers},
                      qualifier='test_qualifier',
@@ -139,8 +155,7 @@ def test_UNTLElement_add_form_qualifier_and_content():
 @patch('pyuntl.form_logic.Title.__init__', return_value=None)
 def test_UNTLElement_add_form_qualifier_and_content_mocked(mock_title):
     """Verify FormElement subclass call with qualifier and content passed."""
-    element = us.UNTLElement()
-    element.tag = 'title'
+    element = untl_element_class('title')()
     vocabularies = {'title-qualifiers': ['test']}
     qualifier = 'test_qualifier'
     content = 'test_content'
@@ -156,8 +171,7 @@ def test_UNTLElement_add_form_qualifier_and_content_mocked(mock_title):
 
 def test_UNTLElement_add_form_qualifier_only():
     """Test form is created with qualifier but not content passed."""
-    element = us.UNTLElement()
-    element.tag = 'creator'
+    element = untl_element_class('creator')()
     element.add_form(qualifier='test_qualifier')
     assert isinstance(element.form, FormElement)
     assert element.form.untl_object == element
@@ -166,8 +180,7 @@ def test_UNTLElement_add_form_qualifier_only():
 @patch('pyuntl.form_logic.Creator.__init__', return_value=None)
 def test_UNTLElement_add_form_qualifier_only_mocked(mock_creator):
     """Verify FormElement subclass call with qualifier but not content passed."""
-    element = us.UNTLElement()
-    element.tag = 'creator'
+    element = untl_element_class('creator')()
     qualifier = 'test_qualifier'
     element.add_form(qualifier=qualifier)
     mock_creator.assert_called_once_with(vocabularies=None,
@@ -178,8 +191,7 @@ def test_UNTLElement_add_form_qualifier_only_mocked(mock_creator):
 
 def test_UNTLElement_add_form_content_only_no_parent_tag():
     """Test form is created with content but no qualifier nor parent tag."""
-    element = us.UNTLElement()
-    element.tag = 'primarySource'
+    element = untl_element_class('primarySource')()
     element.add_form(content='test_content')
     assert isinstance(element.form, FormElement)
     assert element.form.untl_object == element
@@ -188,8 +200,7 @@ def test_UNTLElement_add_form_content_only_no_parent_tag():
 @patch('pyuntl.form_logic.PrimarySource.__init__', return_value=None)
 def test_UNTLElement_add_form_content_only_no_parent_tag_mocked(mock_ps):
     """Verify FormElement subclass call with content but no qualifier nor parent tag."""
-    element = us.UNTLElement()
-    element.tag = 'primarySource'
+    element = untl_element_class('primarySource')()
     content = 'test_content'
     element.add_form(content=content)
     mock_ps.assert_called_once_with(vocabularies=None,
@@ -200,8 +211,7 @@ def test_UNTLElement_add_form_content_only_no_parent_tag_mocked(mock_ps):
 
 def test_UNTLElement_add_form_content_and_parent_tag():
     """Test form is created with content and parent tag passed."""
-    element = us.UNTLElement()
-    element.tag = 'type'
+    element = untl_element_class('type')()
     qualifiers = ['test']
     element.add_form(vocabularies={'agent-type': qualifiers},
                      content='test_content',
@@ -215,8 +225,7 @@ def test_UNTLElement_add_form_content_and_parent_tag():
 @patch('pyuntl.form_logic.Type.__init__', return_value=None)
 def test_UNTLElement_add_form_content_and_parent_tag_mocked(mock_type):
     """Verify FormElement subclass call with content and parent tag passed."""
-    element = us.UNTLElement()
-    element.tag = 'type'
+    element = untl_element_class('type')()
     vocabularies = {'agent-type': ['test']}
     content = 'test_content'
     parent_tag = 'test_parent'
@@ -232,8 +241,7 @@ def test_UNTLElement_add_form_content_and_parent_tag_mocked(mock_type):
 
 def test_UNTLElement_add_form_no_qualifier_no_content_no_parent_tag():
     """Test form is created with no parent tag, no content, no qualifier."""
-    element = us.UNTLElement()
-    element.tag = 'publisher'
+    element = untl_element_class('publisher')()
     element.add_form()
     assert isinstance(element.form, FormElement)
     assert element.form.untl_object == element
@@ -242,8 +250,7 @@ def test_UNTLElement_add_form_no_qualifier_no_content_no_parent_tag():
 @patch('pyuntl.form_logic.Publisher.__init__', return_value=None)
 def test_UNTLElement_add_form_no_qualifier_no_content_no_parent_tag_mocked(mock_pub):
     """Verify FormElement subclass call with no parent tag, no content, no qualifier."""
-    element = us.UNTLElement()
-    element.tag = 'publisher'
+    element = untl_element_class('publisher')()
     element.add_form()
     mock_pub.assert_called_once_with(vocabularies=None,
                                      untl_object=element,
@@ -252,8 +259,7 @@ def test_UNTLElement_add_form_no_qualifier_no_content_no_parent_tag_mocked(mock_
 
 def test_UNTLElement_add_form_no_qualifier_no_content_parent_tag():
     """Test form is created with parent tag, no content nor qualifier."""
-    element = us.UNTLElement()
-    element.tag = 'type'
+    element = untl_element_class('type')()
     qualifiers = ['test']
     element.add_form(vocabularies={'agent-type': qualifiers},
                      parent_tag='test_parent')
@@ -265,8 +271,7 @@ def test_UNTLElement_add_form_no_qualifier_no_content_parent_tag():
 @patch('pyuntl.form_logic.Type.__init__', return_value=None)
 def test_UNTLElement_add_form_no_qualifier_no_content_parent_tag_mocked(mock_type):
     """Verify FormElement subclass call with parent tag, no content nor qualifier."""
-    element = us.UNTLElement()
-    element.tag = 'type'
+    element = untl_element_class('type')()
     vocabularies = {'agent-type': ['test']}
     parent_tag = 'test_parent'
     element.add_form(vocabularies=vocabularies,
@@ -286,15 +291,12 @@ def test_UNTLElement_completeness():
 def test_UNTLElement_record_length():
     """Check the record_length with meta field included."""
     # Create an element with collection and meta fields.
-    root = us.UNTLElement()
-    root.tag = 'metadata'
-    root.contained_children = ['collection', 'meta']
-    collection = us.UNTLElement(content=u'Colección')
-    collection.tag = 'collection'
+    root = untl_element_class('metadata',
+                              contained_children=('collection', 'meta'))()
+    collection = untl_element_class('collection')(content=u'Colección')
     root.add_child(collection)
-    meta = us.UNTLElement(content='fake',
-                          qualifier='ark')
-    meta.tag = 'meta'
+    meta = untl_element_class('meta')(content='fake',
+                                      qualifier='ark')
     root.add_child(meta)
     assert root.record_length == 93
 
@@ -302,15 +304,12 @@ def test_UNTLElement_record_length():
 def test_UNTLElement_record_content_length():
     """Check the record_length with meta field excluded."""
     # Create an element with collection and meta fields.
-    root = us.UNTLElement()
-    root.tag = 'metadata'
-    root.contained_children = ['collection', 'meta']
-    collection = us.UNTLElement(content=u'Colección')
-    collection.tag = 'collection'
+    root = untl_element_class('metadata',
+                              contained_children=('collection', 'meta'))()
+    collection = untl_element_class('collection')(content=u'Colección')
     root.add_child(collection)
-    meta = us.UNTLElement(content='fake',
-                          qualifier='ark')
-    meta.tag = 'meta'
+    meta = untl_element_class('meta')(content='fake',
+                                      qualifier='ark')
     root.add_child(meta)
     assert root.record_content_length == 42
 
@@ -373,6 +372,108 @@ def test_FormGenerator_adjustable_items(_):
     assert 'access' in fg.adjustable_items
 
 
+@patch('pyuntl.untl_structure.FormGenerator.get_vocabularies', return_value=VOCAB)
+def test_FormGenerator_form_cache(_):
+    """Forms are made from templates kept in the form cache."""
+    form_cache = FormTemplateCache()
+    records = []
+    for i in range(2):
+        title = us.Title(content='A Title %s' % i, qualifier='officialtitle')
+        creator = us.Creator(qualifier='aut')
+        creator.add_child(us.Name(content='Bob, A.'))
+        records.append([title, creator])
+        us.FormGenerator(children=records[-1], form_cache=form_cache,
+                         sort_order=['title', 'creator', 'hidden'])
+    # Templates for the title, creator, its children and hidden meta.
+    assert len(form_cache.templates) == 7
+    for first, second in zip(*records):
+        assert isinstance(second.form, type(first.form))
+        assert second.form.untl_object is second
+        first_attributes = dict(vars(first.form), untl_object=None)
+        assert first_attributes == dict(vars(second.form), untl_object=None)
+    assert records[1][1].children[0].form.untl_object is records[1][1].children[0]
+
+
+def test_FormTemplateCache_qualifier_dependent():
+    """Forms that depend on the qualifier get a template per qualifier."""
+    form_cache = FormTemplateCache()
+    created = us.Date(content='2020', qualifier='creation')
+    digitized = us.Date(content='2020', qualifier='digitized')
+    created.add_form(vocabularies=VOCAB, form_cache=form_cache)
+    digitized.add_form(vocabularies=VOCAB, form_cache=form_cache)
+    assert created.form.editable
+    assert not digitized.form.editable
+    assert len(form_cache.templates) == 2
+    titles = [us.Title(content='Title', qualifier=q) for q in ('officialtitle', 'serialtitle')]
+    for title in titles:
+        title.add_form(vocabularies=VOCAB, form_cache=form_cache)
+    assert len(form_cache.templates) == 3
+
+
+def test_FormTemplateCache_new_vocabularies():
+    """Templates are discarded when the vocabularies change."""
+    form_cache = FormTemplateCache()
+    title = us.Title(content='Title', qualifier='officialtitle')
+    title.add_form(vocabularies=VOCAB, form_cache=form_cache)
+    new_vocabularies = dict(VOCAB, **{'title-qualifiers': [{'name': 'officialtitle'}]})
+    title.add_form(vocabularies=new_vocabularies, form_cache=form_cache)
+    assert form_cache.vocabularies is new_vocabularies
+    assert len(form_cache.templates) == 1
+    assert title.form.qualifier_dd == [{'name': 'officialtitle'}]
+
+
+def test_FormTemplateCache_version():
+    """Templates are kept while the vocabularies version is unchanged."""
+    form_cache = FormTemplateCache()
+    title = us.Title(content='Title', qualifier='officialtitle')
+    title.add_form(vocabularies=VOCAB, form_cache=form_cache, vocabularies_version='"v1"')
+    # An equal copy of the vocabularies with the same version.
+    same_vocabularies = dict(VOCAB)
+    title.add_form(vocabularies=same_vocabularies, form_cache=form_cache,
+                   vocabularies_version='"v1"')
+    assert len(form_cache.templates) == 1
+    assert title.form.vocabularies is same_vocabularies
+    new_vocabularies = dict(VOCAB, **{'title-qualifiers': [{'name': 'officialtitle'}]})
+    title.add_form(vocabularies=new_vocabularies, form_cache=form_cache,
+                   vocabularies_version='"v2"')
+    assert title.form.qualifier_dd == [{'name': 'officialtitle'}]
+
+
+def test_FormTemplateCache_forms_are_copies():
+    """Changing a form's lists does not change other forms."""
+    form_cache = FormTemplateCache()
+    titles = [us.Title(content='Title', qualifier='officialtitle') for _ in range(3)]
+    for title in titles:
+        title.add_form(vocabularies=VOCAB, form_cache=form_cache)
+    titles[1].form.qualifier_dd.append({'name': 'added'})
+    assert titles[2].form.qualifier_dd == titles[0].form.qualifier_dd
+    assert {'name': 'added'} not in titles[2].form.qualifier_dd
+    assert VOCAB['title-qualifiers'] == titles[2].form.qualifier_dd
+
+
+def test_FormTemplateCache_first_form_is_a_copy():
+    """Changing the first form made for a template does not change later forms."""
+    vocabularies = copy.deepcopy(VOCAB)
+    form_cache = FormTemplateCache()
+    titles = [us.Title(content='Title', qualifier='officialtitle') for _ in range(2)]
+    titles[0].add_form(vocabularies=vocabularies, form_cache=form_cache)
+    expected = list(titles[0].form.qualifier_dd)
+    titles[0].form.qualifier_dd.append({'name': 'added'})
+    titles[1].add_form(vocabularies=vocabularies, form_cache=form_cache)
+    assert titles[1].form.qualifier_dd == expected
+    assert {'name': 'added'} not in titles[1].form.qualifier_dd
+
+
+@patch('pyuntl.untl_structure.FormGenerator.get_vocabularies', return_value=VOCAB)
+@patch('pyuntl.form_logic.FormTemplateCache.get_form')
+def test_FormGenerator_no_form_cache_by_default(mock_get_form, _):
+    """Forms are only made from templates when a cache is passed."""
+    title = us.Title(content='A Title', qualifier='officialtitle')
+    us.FormGenerator(children=[title], sort_order=['title', 'hidden'])
+    mock_get_form.assert_not_called()
+    assert title.form.untl_object is title
+
+
 @patch('pyuntl.untl_structure.get_vocabularies', return_value=VOCAB)
 def test_FormGenerator_get_vocabularies(mock_get_vocabularies):
     """Tests the get_vocabularies method just uses the get_vocabularies function."""
@@ -574,18 +675,131 @@ def test_Metadata_create_xml_file_exception_raised():
 def test_Metadata_sort_untl():
     """Test that elements are sorted correctly."""
     metadata = us.Metadata()
-    child1 = us.UNTLElement()
-    child1.tag = 'ziggy'
-    child2 = us.UNTLElement()
-    child2.tag = 'apple'
-    child3 = us.UNTLElement()
-    child3.tag = 'dash'
+    child1 = untl_element_class('ziggy')()
+    child2 = untl_element_class('apple')()
+    child3 = untl_element_class('dash')()
     metadata.children = [child1, child2, child3]
     # Sort by the tags in this order.
     metadata.sort_untl(['dash', 'ziggy', 'apple'])
     assert metadata.children == [child3, child1, child2]
 
 
+def test_Metadata_metrics_cached():
+    """Test metrics are kept until an element of the record changes."""
+    metadata = us.Metadata()
+    title = us.Title(content='A title', qualifier='officialtitle')
+    metadata.add_child(title)
+    metadata.add_child(us.Meta(content='PTH', qualifier='system'))
+    calculate = Mock(return_value=1)
+    assert metadata.get_metric('metric', calculate) == 1
+    assert metadata.get_metric('metric', calculate) == 1
+    assert calculate.call_count == 1
+    # Changing, adding or removing elements calculates it again.
+    title.set_content('Another title')
+    metadata.get_metric('metric', calculate)
+    assert calculate.call_count == 2
+    creator = us.Creator(qualifier='aut')
+    metadata.add_child(creator)
+    metadata.get_metric('metric', calculate)
+    assert calculate.call_count == 3
+    creator.add_child(us.Name(content='Someone'))
+    metadata.get_metric('metric', calculate)
+    assert calculate.call_count == 4
+    creator.children[0].set_content('Someone else')
+    metadata.get_metric('metric', calculate)
+    assert calculate.call_count == 5
+    del metadata.children[0]
+    metadata.get_metric('metric', calculate)
+    assert calculate.call_count == 6
+
+
+@patch.dict(quality.COMPLETENESS_PROFILES)
+def test_Metadata_metrics_match_uncached():
+    metadata = us.Metadata()
+    metadata.add_child(us.Collection(content='Colección'))
+    meta = us.Meta(content='fake', qualifier='ark')
+    metadata.add_child(meta)
+    assert (metadata.record_length, metadata.record_content_length) == (93, 42)
+    meta.set_content('PTH')
+    meta.set_qualifier('system')
+    assert metadata.record_length == len(str(py2dict(metadata)))
+    assert metadata.completeness == 30 / 59
+    # Custom profiles are cached separately.
+    quality.register_completeness_profile('collection-only', {'collection': 1})
+    assert metadata.get_completeness('collection-only') == 1.0
+    assert metadata.completeness == 30 / 59
+
+
+def test_UNTLElement_find_and_values():
+    creator = us.Creator(qualifier='aut')
+    creator.add_child(us.Type(content='per'))
+    creator.add_child(us.Name(content='Bob, A.'))
+    assert [child.tag for child in creator.find('name')] == ['name']
+    assert creator.values('name') == ['Bob, A.']
+    assert creator.values('info') == []
+
+
+def test_Metadata_find_and_values():
+    metadata = us.Metadata()
+    lcsh = us.Subject(content='Texas', qualifier='LCSH')
+    keyword = us.Subject(content='cats', qualifier='KWD')
+    metadata.add_child(lcsh)
+    metadata.add_child(us.Title(content='A title'))
+    assert metadata.find('subject') == [lcsh]
+    # The index is kept up to date by add_child.
+    metadata.add_child(keyword)
+    assert metadata.find('subject') == [lcsh, keyword]
+    assert metadata.find('subject', qualifier='KWD') == [keyword]
+    assert metadata.values('subject', 'LCSH') == ['Texas']
+    assert metadata.values('meta') == []
+    # A changed qualifier marks the index to be rebuilt.
+    keyword.set_qualifier('LCSH')
+    assert metadata.values('subject', 'LCSH') == ['Texas', 'cats']
+    assert metadata.find('subject', qualifier='KWD') == []
+
+
+def test_Metadata_find_children_changed_directly():
+    """Check the tag index is rebuilt when children are changed
+    without add_child.
+    """
+    metadata = us.Metadata()
+    metadata.add_child(us.Subject(content='Texas', qualifier='LCSH'))
+    assert metadata.values('subject') == ['Texas']
+    metadata.children.append(us.Subject(content='cats', qualifier='KWD'))
+    assert metadata.values('subject') == ['Texas', 'cats']
+    metadata.children[0] = us.Subject(content='Dallas', qualifier='LCSH')
+    assert metadata.values('subject') == ['Dallas', 'cats']
+    metadata.children = []
+    assert metadata.find('subject') == []
+    # Adding to a list changed directly is found as well.
+    metadata.children.append(us.Title(content='A title'))
+    metadata.add_child(us.Title(content='Another title'))
+    assert metadata.values('title') == ['A title', 'Another title']
+    metadata.children.reverse()
+    assert metadata.values('title') == ['Another title', 'A title']
+    del metadata.children[0]
+    assert metadata.values('title') == ['A title']
+    metadata.children += [us.Title(content='A third title', qualifier='serialtitle')]
+    assert metadata.values('title', 'serialtitle') == ['A third title']
+    metadata.sort_untl(['title'])
+    assert metadata.values('title') == ['A title', 'A third title']
+
+
+def test_Metadata_find_copies():
+    metadata = us.Metadata()
+    metadata.add_child(us.Subject(content='Texas', qualifier='LCSH'))
+    assert metadata.values('subject') == ['Texas']
+    for metadata_copy in (copy.deepcopy(metadata), pickle.loads(pickle.dumps(metadata))):
+        assert metadata_copy.children.record is metadata_copy
+        metadata_copy.children[0].set_qualifier('KWD')
+        assert metadata_copy.values('subject', 'KWD') == ['Texas']
+        metadata_copy.add_child(us.Subject(content='cats', qualifier='KWD'))
+        assert metadata_copy.values('subject', 'KWD') == ['Texas', 'cats']
+    # The original record is unchanged.
+    assert metadata.values('subject', 'LCSH') == ['Texas']
+    assert metadata.values('subject', 'KWD') == []
+
+
 def test_Metadata_validate():
     """Nothing is implemented in validate().
 
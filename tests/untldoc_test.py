@@ -7,7 +7,8 @@ import pytest
 from lxml.etree import fromstring
 from rdflib import ConjunctiveGraph
 
-from pyuntl import untldoc, untl_structure as us, dc_structure as dc
+from pyuntl import untldoc, untl_structure as us, dc_structure as dc, metadata_generator as mg
+from pyuntl.vocabulary import VocabularyIndex
 
 
 TEST_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)))
@@ -97,12 +98,110 @@ def test_untlxml2py_non_UNTL_tag_raises_exception():
     assert 'Element "dog" not in UNTL dispatch.' == err.value.args[0]
 
 
+def test_iter_untl_records():
+    """Verify every record in a multi-record file is yielded in order."""
+    xml = BytesIO(b'<?xml version="1.0" encoding="UTF-8"?>\n'
+                  b'<records>\n'
+                  b'  <metadata>\n'
+                  b'    <title qualifier="officialtitle">Tres Actos</title>\n'
+                  b'  </metadata>\n'
+                  b'  <metadata>\n'
+                  b'    <title qualifier="officialtitle">The Bronco</title>\n'
+                  b'    <creator qualifier="aut">\n'
+                  b'      <name>Last, Furston, 1807-1865.</name>\n'
+                  b'    </creator>\n'
+                  b'  </metadata>\n'
+                  b'</records>\n')
+    records = list(untldoc.iter_untl_records(xml))
+    assert len(records) == 2
+    for record in records:
+        assert isinstance(record, us.Metadata)
+    assert records[0].children[0].content == 'Tres Actos'
+    assert records[1].children[0].content == 'The Bronco'
+    assert records[1].children[1].children[0].content == 'Last, Furston, 1807-1865.'
+
+
+def test_iter_untl_records_single_record():
+    records = list(untldoc.iter_untl_records(
+        os.path.join(TEST_DIR, 'metadc_complete.untl.xml')))
+    assert len(records) == 1
+    expected = untldoc.untlxml2pydict(os.path.join(TEST_DIR, 'metadc_complete.untl.xml'))
+    assert untldoc.untlpy2dict(records[0]) == expected
+
+
+def test_iter_untl_records_namespace():
+    xml = BytesIO(b'<?xml version="1.0" encoding="UTF-8"?>\n'
+                  b'<untl:records xmlns:untl="http://digital2.library.unt.edu/untl/">\n'
+                  b'  <untl:metadata>\n'
+                  b'    <untl:title qualifier="officialtitle">Tres Actos</untl:title>\n'
+                  b'  </untl:metadata>\n'
+                  b'</untl:records>\n')
+    records = list(untldoc.iter_untl_records(xml))
+    assert len(records) == 1
+    assert records[0].children[0].tag == 'title'
+
+
+def test_iter_untl_records_non_UNTL_tag_raises_exception():
+    xml = BytesIO(b'<?xml version="1.0" encoding="UTF-8"?>\n'
+                  b'<records>\n'
+                  b'  <metadata>\n'
+                  b'    <dog>Bezos</dog>\n'
+                  b'  </metadata>\n'
+                  b'</records>\n')
+    with pytest.raises(untldoc.PyuntlException) as err:
+        list(untldoc.iter_untl_records(xml))
+    assert 'Element "dog" not in UNTL dispatch.' == err.value.args[0]
+
+
 def test_untlxml2pydict():
     xml = BytesIO(UNTL_STRING.encode('utf-8'))
     untl_dict = untldoc.untlxml2pydict(xml)
     assert untl_dict == UNTL_DICTIONARY
 
 
+@pytest.mark.parametrize('filename', ['metadc_complete.untl.xml',
+                                      'metadc_utf8.untl.xml',
+                                      'metadc_empty.untl.xml',
+                                      'metadc_blank_description.untl.xml'])
+def test_untlxml2pydict_matches_untlpy2dict(filename):
+    filename = os.path.join(TEST_DIR, filename)
+    expected = untldoc.untlpy2dict(untldoc.untlxml2py(filename))
+    assert untldoc.untlxml2pydict(filename) == expected
+
+
+def test_untlxml2pydict_children_and_empty_elements():
+    xml = BytesIO(b'<metadata>\n'
+                  b'  <title qualifier="officialtitle">  </title>\n'
+                  b'  <creator qualifier=" aut ">\n'
+                  b'    <type>per</type>\n'
+                  b'    <name> Bob, A. </name>\n'
+                  b'    <info></info>\n'
+                  b'  </creator>\n'
+                  b'  <publisher><name/></publisher>\n'
+                  b'</metadata>')
+    untl_dict = untldoc.untlxml2pydict(xml)
+    assert untl_dict == {'title': [],
+                         'creator': [{'qualifier': 'aut',
+                                      'content': {'type': 'per', 'name': 'Bob, A.'}}],
+                         'publisher': []}
+
+
+@pytest.mark.parametrize('xml, message', [
+    (b'<metadata><dog>Rover</dog></metadata>',
+     'Element "dog" not in UNTL dispatch.'),
+    (b'<metadata><title><name>Bob</name></title></metadata>',
+     'Invalid child "name" for parent "title"'),
+    (b'<metadata><collection qualifier="x">ABC</collection></metadata>',
+     'Element "collection" does not allow a qualifier'),
+    (b'<metadata>Text<title>A title</title></metadata>',
+     'Element "metadata" does not allow textual content'),
+])
+def test_untlxml2pydict_invalid(xml, message):
+    with pytest.raises((untldoc.PyuntlException, us.UNTLStructureException)) as err:
+        untldoc.untlxml2pydict(BytesIO(xml))
+    assert str(err.value) == message
+
+
 def test_untlpy2dict():
     title = us.Title(qualifier='serialtitle', content='The Bronco')
     elements = us.Metadata()
@@ -282,6 +381,19 @@ def test_untlpy2dcpy_resolve_values_verbose_vocabularies():
     assert root.children[0].content == 'Spanish'
 
 
+def test_untlpy2dcpy_resolve_values_vocabulary_index():
+    verbose_vocab = VocabularyIndex({'languages': [{'url': 'http://example.com/languages/#spa',
+                                                    'name': 'spa',
+                                                    'label': 'Spanish'}]})
+    untl_dict = {'language': [{'content': 'spa'}, {'content': 'unknown'}]}
+    untl_elements = untldoc.untldict2py(untl_dict)
+    root = untldoc.untlpy2dcpy(untl_elements,
+                               resolve_urls=True,
+                               verbose_vocabularies=verbose_vocab)
+    assert root.children[0].content == 'http://example.com/languages/#spa'
+    assert root.children[1].content == 'unknown'
+
+
 @patch('pyuntl.untldoc.retrieve_vocab')
 def test_untlpy2dcpy_resolve_values_retrieve_vocab(mock_vocab):
     mock_vocab.return_value = {'languages': [{'url': 'http://example.com/languages/#spa',
@@ -383,6 +495,55 @@ def test_untlpydict2dcformatteddict():
                                       'ark: ark:/67531/metatest1']}
 
 
+@patch('pyuntl.untldoc.retrieve_vocab')
+def test_DCConverter_retrieves_vocabularies_once(mock_vocab):
+    mock_vocab.return_value = {'languages': [{'url': 'http://example.com/languages/#spa',
+                                              'name': 'spa',
+                                              'label': 'Spanish'}]}
+    converter = untldoc.DCConverter(resolve_values=True)
+    untl_elements = untldoc.untldict2py({'language': [{'content': 'spa'}]})
+    for _ in range(3):
+        dc_dict = untldoc.dcpy2dict(converter.untlpy2dcpy(untl_elements))
+        assert dc_dict == {'language': [{'content': 'Spanish'}]}
+    mock_vocab.assert_called_once_with()
+
+
+@pytest.mark.parametrize('untl_dict', [
+    UNTL_DICTIONARY,
+    {'coverage': [{'qualifier': 'sDate', 'content': ' 1900 '},
+                  {'qualifier': 'eDate', 'content': '1910'},
+                  {'qualifier': 'timePeriod', 'content': 'progressive-era'},
+                  {'content': ''}],
+     'description': [{'qualifier': 'physical', 'content': '2 p.'},
+                     {'qualifier': 'content', 'content': 'A description'}],
+     'identifier': [{'content': 'abc'}, {'qualifier': 'LCCN'},
+                    {'qualifier': 'OCLC', 'content': '1'}],
+     'creator': [{'qualifier': 'aut', 'content': {}}, {'content': {'type': 'per'}}],
+     'date': [{'qualifier': 'creation', 'content': ''},
+              {'qualifier': 'digitized', 'content': '2000'}],
+     'language': [{'content': 'spa'}, {'content': 'unknown'}],
+     'note': [{'content': 'Not in DC'}]},
+    {'coverage': [{'qualifier': 'eDate', 'content': '2000'}], 'title': [{'content': ' '}]},
+    {},
+])
+@pytest.mark.parametrize('resolve', [{}, {'resolve_values': True}, {'resolve_urls': True}])
+def test_DCConverter_untlpydict2dcformatteddict(untl_dict, resolve):
+    """Check the direct conversion matches converting through objects."""
+    kwargs = dict(resolve, domain_name='example.com', scheme='https',
+                  verbose_vocabularies={'languages': [{'url': 'http://example.com/#spa',
+                                                       'name': 'spa',
+                                                       'label': 'Spanish'}],
+                                        'coverage-eras': [{'url': 'http://example.com/#pe',
+                                                           'name': 'progressive-era',
+                                                           'label': 'Progressive Era'}]})
+    expected = untldoc.untlpydict2dcformatteddict(untl_dict, ark='ark:/67531/metatest1',
+                                                  **kwargs)
+    converter = untldoc.DCConverter(**kwargs)
+    dc_dict = converter.untlpydict2dcformatteddict(untl_dict, ark='ark:/67531/metatest1')
+    assert dc_dict == expected
+    assert list(dc_dict) == list(expected)
+
+
 def test_dcpy2formatteddcdict():
     root = dc.DC()
     name = us.Name(content='Case, Justin')
@@ -455,6 +616,42 @@ def test_generate_dc_txt():
                       'date: 1944')
 
 
+def test_anvlstring2pydict():
+    dc_txt = untldoc.generate_dc_txt(DC_DICTIONARY)
+    assert untldoc.anvlstring2pydict(dc_txt) == DC_DICTIONARY
+    assert untldoc.anvlstring2pydict('') == {}
+
+
+def test_iter_anvl_records():
+    description = ' '.join(['A long description'] * 20)
+    anvl = ('title: Tres Actos\n'
+            'description: %s\n'
+            '\n'
+            'title: The Bronco\n'
+            'date:\n' % (mg.breakString(description, 79, 12),)).encode('utf-8')
+    records = list(untldoc.iter_anvl_records(BytesIO(anvl)))
+    assert records == [
+        {'title': [{'content': 'Tres Actos'}], 'description': [{'content': description}]},
+        {'title': [{'content': 'The Bronco'}], 'date': [{'content': ''}]},
+    ]
+
+
+def test_iter_anvl_records_round_trip_empty_records():
+    records = [{}, {'title': [{'content': 'Tres Actos'}]}, {}, {}, {'date': [{'content': '1944'}]},
+               {}]
+    output = BytesIO()
+    assert mg.write_anvl(output, records, ordering=['title', 'date']) == 6
+    assert list(untldoc.iter_anvl_records(BytesIO(output.getvalue()))) == records
+    # Comments are skipped.
+    anvl = b'# A comment\ntitle: Tres Actos\n# Another comment\n'
+    assert list(untldoc.iter_anvl_records(BytesIO(anvl))) == [records[1]]
+
+
+def test_iter_anvl_records_not_anvl():
+    with pytest.raises(untldoc.PyuntlException):
+        list(untldoc.iter_anvl_records(BytesIO(b'Tres Actos\n')))
+
+
 def test_highwirepy2dict():
     untl_elements = untldoc.untldict2py(UNTL_DICTIONARY)
     highwire_list = untldoc.untlpy2highwirepy(untl_elements)
@@ -614,48 +811,31 @@ def test_add_empty_fields():
                          'meta': [{'content': '', 'qualifier': ''}]}
 
 
-@patch('pyuntl.untl_structure.Title', side_effect=Exception)
-def test_add_empty_fields_raise_PyuntlException(mock_title):
+@patch.object(us.Title, '__init__', side_effect=Exception)
+def test_add_empty_fields_raise_PyuntlException(mock_init):
     with pytest.raises(untldoc.PyuntlException) as err:
         untldoc.add_empty_fields({})
     assert 'Could not add empty element field.' == err.value.args[0]
 
 
-@patch('pyuntl.untl_structure.getattr')
-def test_add_empty_fields_allows_content_no_qualifier_has_children(mock_getattr):
+@patch.object(us.Collection, 'contained_children', ('fake child',))
+def test_add_empty_fields_allows_content_no_qualifier_has_children():
     # In practice we don't have a case where the element has a content
     # value and children (though the code allows it), as the children
     # are represented in the dict as the content value and would
     # overwrite an initial content value.
     # Pretend Collection element contains a child to trigger the targeted code.
-
-    def side_effect(*args, **kwargs):
-        if args[0].tag == 'collection' and args[1] == 'contained_children':
-            return ['fake child']
-        else:
-            return getattr(*args, **kwargs)
-
-    mock_getattr.side_effect = side_effect
     untl_dict = untldoc.add_empty_fields({})
     assert untl_dict['collection'] == [{'content': {'fake child': ''}}]
 
 
-@patch('pyuntl.untl_structure.getattr')
-def test_add_empty_fields_allows_content_and_qualifier_has_children(mock_getattr):
-    untl_dict = untldoc.add_empty_fields({})
+@patch.object(us.Subject, 'contained_children', ('fake child',))
+def test_add_empty_fields_allows_content_and_qualifier_has_children():
     # In practice we don't have a case where the element has a content
     # value, qualifier, and children (though the code allows it), as the
     # children are represented in the dict as the content value and would
     # overwrite an initial content value.
     # Pretend Subject element contains a child to trigger the targeted code.
-
-    def side_effect(*args, **kwargs):
-        if args[0].tag == 'subject' and args[1] == 'contained_children':
-            return ['fake child']
-        else:
-            return getattr(*args, **kwargs)
-
-    mock_getattr.side_effect = side_effect
     untl_dict = untldoc.add_empty_fields({})
     assert untl_dict['subject'] == [{'content': {'fake child': ''}, 'qualifier': ''}]
 
@@ -787,3 +967,49 @@ def test_record_version_did_not_change():
     new_untl_element = untldoc.untldict2py(untl_dict)
     new_record_version = untldoc.get_record_version(new_untl_element)
     assert new_record_version == original_record_version
+
+
+def fresh_record_version(untl_elements):
+    """Get the record version of an uncached copy of the elements."""
+    return untldoc.get_record_version(untldoc.untldict2py(untldoc.untlpy2dict(untl_elements)))
+
+
+def test_record_version_after_edits_in_place():
+    untl_elements = untldoc.untlxml2py('tests/metadc_complete.untl.xml')
+    versions = [untldoc.get_record_version(untl_elements)]
+    # Change content, qualifiers, children and the order of elements.
+    untl_elements.children[0].set_content('What Spins Far Away')
+    assert untldoc.get_record_version(untl_elements) == fresh_record_version(untl_elements)
+    subject = next(e for e in untl_elements.children if e.tag == 'subject')
+    subject.qualifier = 'KWD'
+    assert untldoc.get_record_version(untl_elements) == fresh_record_version(untl_elements)
+    creator = next(e for e in untl_elements.children if e.tag == 'creator')
+    creator.children[0].content = 'Someone Else'
+    versions.append(untldoc.get_record_version(untl_elements))
+    assert versions[-1] == fresh_record_version(untl_elements)
+    untl_elements.make_hidden()
+    assert untldoc.get_record_version(untl_elements) == fresh_record_version(untl_elements)
+    untl_elements.add_child(us.Subject(qualifier='KWD', content='spinning'))
+    assert untldoc.get_record_version(untl_elements) == fresh_record_version(untl_elements)
+    untl_elements.children.reverse()
+    assert untldoc.get_record_version(untl_elements) == fresh_record_version(untl_elements)
+    del untl_elements.children[-1]
+    assert untldoc.get_record_version(untl_elements) == fresh_record_version(untl_elements)
+    assert versions[0] != versions[-1]
+
+
+def test_untl_to_hash_dict_only_rehashes_changed_groups():
+    untl_elements = untldoc.untlxml2py('tests/metadc_complete.untl.xml')
+    untldoc.untl_to_hash_dict(untl_elements)
+    with patch('pyuntl.untldoc.untl_dict_to_tuple',
+               wraps=untldoc.untl_dict_to_tuple) as mock_to_tuple:
+        untldoc.untl_to_hash_dict(untl_elements)
+        assert mock_to_tuple.call_count == 0
+        title = next(e for e in untl_elements.children if e.tag == 'title')
+        title.set_content('What Spins Far Away')
+        untldoc.untl_to_hash_dict(untl_elements)
+        mock_to_tuple.assert_called_once()
+        assert list(mock_to_tuple.call_args[0][0]) == ['title']
+        # Each setting of meaningfulMeta is cached separately.
+        untldoc.untl_to_hash_dict(untl_elements, False)
+        assert mock_to_tuple.call_count > 1
@@ -0,0 +1,96 @@
+import os
+from io import BytesIO
+
+import pytest
+from lxml.etree import tostring
+
+from pyuntl import untl_structure as us
+from pyuntl.metadata_generator import pydict2xmlstring
+from pyuntl.quality import determine_completeness
+from pyuntl.untldoc import PyuntlException, untlpy2dict, untlxml2py
+from pyuntl.view import UNTLElementView, untlxml2view
+from tests import UNTL_DICT
+
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+
+RECORD_FILES = [
+    'metadc_complete.untl.xml',
+    'metadc_empty.untl.xml',
+    'metadc_legacy_defaults.untl.xml',
+    'metadc_utf8.untl.xml',
+]
+
+
+@pytest.fixture
+def record():
+    return untlxml2view(BytesIO(pydict2xmlstring(UNTL_DICT)))
+
+
+@pytest.mark.parametrize('filename', RECORD_FILES)
+def test_view_matches_untlxml2py(filename):
+    path = os.path.join(TEST_DIR, filename)
+    record = untlxml2view(path)
+    untl_elements = untlxml2py(path)
+    assert untlpy2dict(record) == untlpy2dict(untl_elements)
+    assert record.create_element_dict() == untl_elements.create_element_dict()
+    assert determine_completeness(record) == determine_completeness(untl_elements)
+
+
+def test_view_namespaced_xml():
+    untl_elements = untlxml2py(os.path.join(TEST_DIR, 'metadc_complete.untl.xml'))
+    xml = tostring(untl_elements.create_xml(useNamespace=True))
+    record = untlxml2view(BytesIO(xml))
+    assert record.create_element_dict() == untl_elements.create_element_dict()
+    assert record.values('title') == ['What Spins Away']
+
+
+def test_find(record):
+    creators = record.find('creator')
+    assert len(creators) == len(UNTL_DICT['creator'])
+    assert all(isinstance(creator, UNTLElementView) for creator in creators)
+    assert creators[0].qualifier == UNTL_DICT['creator'][0]['qualifier']
+    assert creators[0].values('name') == [UNTL_DICT['creator'][0]['content']['name']]
+    assert record.find('meta', qualifier='not a qualifier') == []
+
+
+def test_values(record):
+    assert record.values('title', 'officialtitle') == [
+        element['content'] for element in UNTL_DICT['title']
+        if element.get('qualifier') == 'officialtitle'
+    ]
+    assert record.values('meta', 'ark') == ['ark:/67531/metapth38622']
+
+
+def test_children_are_created_on_demand(record):
+    assert record._children is None
+    assert [child.tag for child in record.children][:1] == ['title']
+    assert record.children is record.children
+
+
+def test_is_hidden(record):
+    assert record.is_hidden is False
+    hidden = untlxml2view(BytesIO(
+        b'<metadata><meta qualifier="hidden">True</meta></metadata>'
+    ))
+    assert hidden.is_hidden is True
+
+
+def test_create_metadata(record):
+    untl_elements = record.create_metadata()
+    assert isinstance(untl_elements, us.Metadata)
+    assert untlpy2dict(untl_elements) == UNTL_DICT
+    # The Metadata object can be edited.
+    untl_elements.make_hidden()
+    assert untl_elements.is_hidden
+
+
+def test_create_metadata_validates():
+    record = untlxml2view(BytesIO(b'<metadata><title><name>A</name></title></metadata>'))
+    with pytest.raises(us.UNTLStructureException):
+        record.create_metadata()
+
+
+def test_untlxml2view_not_a_record():
+    with pytest.raises(PyuntlException):
+        untlxml2view(BytesIO(b'<records><metadata/></records>'))
@@ -0,0 +1,299 @@
+import asyncio
+import io
+import json
+import os
+import threading
+import time
+import urllib.error
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pyuntl import untl_structure as us, vocabulary, VOCABULARIES_URL
+from tests import VOCAB
+
+
+VOCAB_URL = VOCABULARIES_URL.replace('all', 'all-verbose')
+
+
+def make_response(data, etag=None, last_modified=None):
+    response = io.BytesIO(json.dumps(data).encode('utf-8'))
+    response.headers = {}
+    if etag:
+        response.headers['ETag'] = etag
+    if last_modified:
+        response.headers['Last-Modified'] = last_modified
+    return response
+
+
+def test_VocabularyException():
+    msg = 'msg about error'
+    assert str(vocabulary.VocabularyException(msg)) == msg
+
+
+@patch('urllib.request.urlopen')
+def test_VocabularyStore_get_caches_in_memory(mock_urlopen):
+    mock_urlopen.return_value = make_response(VOCAB)
+    store = vocabulary.VocabularyStore()
+    assert store.get(VOCAB_URL) == VOCAB
+    assert store.get(VOCAB_URL) == VOCAB
+    assert mock_urlopen.call_count == 1
+
+
+@patch('urllib.request.urlopen')
+def test_VocabularyStore_fetch_retries(mock_urlopen, capsys):
+    mock_urlopen.side_effect = [Exception('down'), make_response(VOCAB)]
+    store = vocabulary.VocabularyStore(retry_delay=0)
+    assert store.get(VOCAB_URL) == VOCAB
+    assert mock_urlopen.call_count == 2
+    assert 'Exception caught while trying to retrieve vocabs: down' in capsys.readouterr().out
+
+
+@patch('urllib.request.urlopen', side_effect=Exception)
+def test_VocabularyStore_fetch_raises_after_retries(mock_urlopen):
+    store = vocabulary.VocabularyStore(retries=2, retry_delay=0)
+    with pytest.raises(vocabulary.VocabularyException):
+        store.get(VOCAB_URL)
+    assert mock_urlopen.call_count == 3
+
+
+@patch('urllib.request.urlopen')
+def test_VocabularyStore_revalidates_stale_entry(mock_urlopen):
+    store = vocabulary.VocabularyStore(ttl=60)
+    store.entries[VOCAB_URL] = {'url': VOCAB_URL, 'vocabularies': {'old': []},
+                                'fetched': time.time() - 120, 'etag': '"abc"',
+                                'last_modified': 'Wed, 21 Oct 2015 07:28:00 GMT'}
+    mock_urlopen.side_effect = urllib.error.HTTPError(VOCAB_URL, 304, 'Not Modified',
+                                                      {}, None)
+    assert store.get(VOCAB_URL) == {'old': []}
+    request = mock_urlopen.call_args[0][0]
+    assert request.get_header('If-none-match') == '"abc"'
+    assert request.get_header('If-modified-since') == 'Wed, 21 Oct 2015 07:28:00 GMT'
+    # The entry is fresh again.
+    assert not store.is_stale(store.entries[VOCAB_URL])
+
+
+@patch('urllib.request.urlopen', side_effect=Exception)
+def test_VocabularyStore_serves_stale_entry_when_server_is_down(mock_urlopen):
+    store = vocabulary.VocabularyStore(ttl=60, retries=0)
+    store.entries[VOCAB_URL] = {'url': VOCAB_URL, 'vocabularies': {'old': []},
+                                'fetched': time.time() - 120}
+    assert store.get(VOCAB_URL) == {'old': []}
+
+
+@patch('urllib.request.urlopen')
+def test_FileVocabularyStore_saves_and_loads(mock_urlopen, tmpdir):
+    path = os.path.join(tmpdir, 'vocabs.json')
+    mock_urlopen.return_value = make_response(VOCAB, etag='"abc"')
+    assert vocabulary.FileVocabularyStore(path).get(VOCAB_URL) == VOCAB
+    with open(path) as f:
+        saved = json.load(f)
+    assert saved['url'] == VOCAB_URL
+    assert saved['etag'] == '"abc"'
+    # A new store, as in another process, uses the file.
+    assert vocabulary.FileVocabularyStore(path).get(VOCAB_URL) == VOCAB
+    assert mock_urlopen.call_count == 1
+
+
+@patch('urllib.request.urlopen')
+def test_FileVocabularyStore_offline(mock_urlopen, tmpdir):
+    path = os.path.join(tmpdir, 'vocabs.json')
+    with open(path, 'w') as f:
+        json.dump(VOCAB, f)
+    store = vocabulary.FileVocabularyStore(path, offline=True)
+    assert store.get(VOCAB_URL) == VOCAB
+    assert mock_urlopen.call_count == 0
+
+
+def test_FileVocabularyStore_offline_without_file(tmpdir):
+    store = vocabulary.FileVocabularyStore(os.path.join(tmpdir, 'none.json'),
+                                           offline=True)
+    with pytest.raises(vocabulary.VocabularyException):
+        store.get(VOCAB_URL)
+
+
+def test_get_vocabularies_uses_store():
+    store = MagicMock(spec=vocabulary.VocabularyStore)
+    store.get.return_value = VOCAB
+    us.set_vocabulary_store(store)
+    try:
+        assert us.get_vocabularies() == VOCAB
+    finally:
+        us.set_vocabulary_store(None)
+    store.get.assert_called_once_with(VOCAB_URL)
+
+
+def test_get_vocabularies_store_failure():
+    store = MagicMock(spec=vocabulary.VocabularyStore)
+    store.get.side_effect = vocabulary.VocabularyException('fail')
+    us.set_vocabulary_store(store)
+    try:
+        with pytest.raises(us.UNTLStructureException):
+            us.get_vocabularies()
+    finally:
+        us.set_vocabulary_store(None)
+
+
+LANGUAGES = {'languages': [{'name': 'spa', 'label': 'Spanish',
+                            'url': 'http://example.com/languages/#spa'},
+                           {'name': 'eng', 'label': 'English',
+                            'url': 'http://example.com/languages/#eng'},
+                           {'name': 'spa', 'label': 'Duplicate',
+                            'url': 'http://example.com/duplicate'}],
+             'unindexed': 'not a term list'}
+
+
+def test_VocabularyIndex_lookup():
+    index = vocabulary.VocabularyIndex(LANGUAGES)
+    assert index.lookup('languages', 'eng', 'label') == 'English'
+    assert index.lookup('languages', 'eng', 'url') == 'http://example.com/languages/#eng'
+    # The first term with a name is used.
+    assert index.lookup('languages', 'spa', 'label') == 'Spanish'
+    assert index.lookup('languages', 'fre', 'label', 'fre') == 'fre'
+    assert index.lookup('formats', 'text', 'label') is None
+
+
+def test_VocabularyIndex_get():
+    index = vocabulary.VocabularyIndex(LANGUAGES)
+    assert index.get('languages') is LANGUAGES['languages']
+    assert index.get('formats', []) == []
+    assert len(index) == 2
+
+
+def test_VocabularyIndex_to_json():
+    index = vocabulary.VocabularyIndex({'formats': [{'name': 'text', 'label': 'Tëxt'}]})
+    assert index.to_json('formats') == '[{"name": "text", "label": "Tëxt"}]'
+    assert index.to_json('formats') is index.to_json('formats')
+
+
+def test_get_vocabulary_index_is_shared():
+    index = vocabulary.get_vocabulary_index(LANGUAGES)
+    assert isinstance(index, vocabulary.VocabularyIndex)
+    assert vocabulary.get_vocabulary_index(LANGUAGES) is index
+    assert vocabulary.get_vocabulary_index(index) is index
+    assert vocabulary.get_vocabulary_index(dict(LANGUAGES)) is not index
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def slow_fetch(calls):
+    """Make a fetch that takes a while, counting its calls."""
+    def fetch(url, entry=None):
+        calls.append(url)
+        time.sleep(0.05)
+        return {'url': url, 'vocabularies': VOCAB, 'fetched': time.time()}
+    return fetch
+
+
+def test_VocabularyStore_cached():
+    store = vocabulary.VocabularyStore(ttl=60)
+    assert store.cached(VOCAB_URL) is None
+    store.entries[VOCAB_URL] = {'vocabularies': VOCAB, 'fetched': time.time()}
+    assert store.cached(VOCAB_URL) == VOCAB
+    store.entries[VOCAB_URL]['fetched'] -= 120
+    assert store.cached(VOCAB_URL) is None
+
+
+def test_VocabularyStore_get_version():
+    store = vocabulary.VocabularyStore()
+    assert store.get_version(VOCAB_URL) is None
+    store.entries[VOCAB_URL] = {'vocabularies': VOCAB, 'fetched': time.time(),
+                                'etag': None, 'last_modified': 'Wed, 01 Jan 2020 00:00:00 GMT'}
+    assert store.get_version(VOCAB_URL) == 'Wed, 01 Jan 2020 00:00:00 GMT'
+    store.entries[VOCAB_URL]['etag'] = '"v2"'
+    assert store.get_version(VOCAB_URL) == '"v2"'
+    us.set_vocabulary_store(store)
+    try:
+        assert us.get_vocabularies_version() == '"v2"'
+    finally:
+        us.set_vocabulary_store(None)
+    assert us.get_vocabularies_version() is None
+
+
+def test_VocabularyStore_threads_share_retrieval():
+    store = vocabulary.VocabularyStore()
+    calls = []
+    results = []
+    with patch.object(store, 'fetch', side_effect=slow_fetch(calls)):
+        threads = [threading.Thread(target=lambda: results.append(store.get(VOCAB_URL)))
+                   for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert calls == [VOCAB_URL]
+    assert results == [VOCAB] * 10
+
+
+def test_AsyncVocabularyClient_shares_retrieval():
+    store = vocabulary.VocabularyStore()
+    client = vocabulary.AsyncVocabularyClient(store)
+    calls = []
+
+    async def get_all():
+        return await asyncio.gather(*[client.get(VOCAB_URL) for i in range(10)])
+
+    with patch.object(store, 'fetch', side_effect=slow_fetch(calls)):
+        assert run(get_all()) == [VOCAB] * 10
+        # Held vocabularies are returned without another retrieval.
+        assert run(client.get(VOCAB_URL)) == VOCAB
+    assert calls == [VOCAB_URL]
+    assert client.single_flight.in_flight == {}
+
+
+def test_AsyncVocabularyClient_raises_store_errors():
+    store = MagicMock(spec=vocabulary.VocabularyStore)
+    store.cached.return_value = None
+    store.get.side_effect = vocabulary.VocabularyException('fail')
+    client = vocabulary.AsyncVocabularyClient(store)
+    with pytest.raises(vocabulary.VocabularyException):
+        run(client.get(VOCAB_URL))
+
+
+def test_SingleFlight_cancelled_caller_does_not_cancel_call():
+    single_flight = vocabulary.SingleFlight()
+    calls = []
+
+    def call():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'done'
+
+    async def run_both():
+        first = asyncio.ensure_future(single_flight.run('key', call))
+        second = asyncio.ensure_future(single_flight.run('key', call))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert run(run_both()) == 'done'
+    assert calls == [1]
+
+
+@patch('urllib.request.urlopen')
+def test_get_vocabularies_async(mock_urlopen):
+    mock_urlopen.return_value = io.StringIO(json.dumps(VOCAB))
+    us.VOCAB_CACHE = {}
+
+    async def get_all():
+        return await asyncio.gather(*[us.get_vocabularies_async() for i in range(5)])
+
+    assert run(get_all()) == [VOCAB] * 5
+    assert mock_urlopen.call_count == 1
+    assert us.VOCAB_CACHE == {VOCAB_URL: VOCAB}
+
+
+def test_get_vocabularies_async_uses_store():
+    store = vocabulary.VocabularyStore()
+    store.entries[VOCAB_URL] = {'vocabularies': VOCAB, 'fetched': time.time()}
+    us.set_vocabulary_store(store)
+    try:
+        assert run(us.get_vocabularies_async()) == VOCAB
+    finally:
+        us.set_vocabulary_store(None)